@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+SHOPEE BENCHMARK - Latência por Etapa
+Mede separadamente preprocessamento, extração de entidades, embedding,
+pontuação e a busca completa (p50/p95/p99 e vazão) sobre os dados reais
+de dados/training/ e sobre corpora sintéticos gerados a partir deles,
+comparando cada execução com uma baseline salva
+"""
+
+import sys
+import json
+import time
+import random
+import platform
+from pathlib import Path
+from datetime import datetime
+from collections import defaultdict
+from typing import List, Dict, Optional, Any, Callable, Iterable, Iterator
+
+import numpy as np
+
+from shopee_index_storage import encode_strings, StringTable, PatternTable
+from shopee_pattern_index import PatternIndex
+from shopee_response_cache import ResponseCache
+from shopee_sessions import ConversationSession
+
+# Tamanhos dos corpora sintéticos
+DEFAULT_SCALES = (10_000, 100_000, 1_000_000)
+
+# Aumento relativo de p50/p95 considerado regressão
+REGRESSION_TOLERANCE = 0.25
+
+# Diferenças abaixo disso (ms) são ruído de medição
+NOISE_FLOOR_MS = 0.02
+
+# Padrões processados por lote ao construir corpora sintéticos
+BUILD_BATCH_SIZE = 1024
+
+# Palavras acrescentadas às variações sintéticas
+FILLER_WORDS = ['por favor', 'urgente', 'hoje', 'ainda', 'já', 'agora', 'moço', 'oi',
+                'bom dia', 'boa tarde', 'shopee', 'app', 'celular', 'fone', 'tênis',
+                'vestido', 'notebook', 'capinha', 'carregador', 'relógio']
+
+# Etapas medidas
+STAGES = ('preprocess', 'entities', 'embedding', 'scoring', 'search')
+
+
+def load_templates(directory: Path) -> List[Dict[str, Any]]:
+    """Padrões reais de todos os arquivos JSON do diretório (ordem estável)"""
+    templates = []
+    for path in sorted(Path(directory).glob('*.json')):
+        with open(path, 'r', encoding='utf-8') as f:
+            templates.extend(json.load(f))
+    return templates
+
+
+def synthetic_patterns(templates: List[Dict[str, Any]], count: int,
+                       seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Gera `count` padrões variando os reais: troca ou remove palavras e
+    acrescenta palavras comuns ou números de pedido (vocabulário limitado)
+    """
+    rng = random.Random(seed)
+    for i in range(count):
+        template = templates[i % len(templates)]
+        tokens = template['question'].split()
+
+        variation = rng.random()
+        if variation < 0.3 and len(tokens) > 2:
+            del tokens[rng.randrange(len(tokens))]
+        elif variation < 0.6 and len(tokens) > 1:
+            position = rng.randrange(len(tokens) - 1)
+            tokens[position], tokens[position + 1] = tokens[position + 1], tokens[position]
+
+        for _ in range(rng.randrange(3)):
+            tokens.append(rng.choice(FILLER_WORDS))
+        if rng.random() < 0.2:
+            tokens.append(f"pedido {rng.randrange(1000)}")
+
+        yield {
+            'question': ' '.join(tokens),
+            'response': template['response'],
+            'confidence': template.get('confidence', 0.8),
+            'category': template.get('category', 'geral')
+        }
+
+
+def build_benchmark_system(patterns: Iterable[Dict[str, Any]], count: int,
+                           batch_size: int = BUILD_BATCH_SIZE):
+    """
+    ShopeeNeuralAI indexado com os padrões dados, sem manter o
+    preprocessamento de cada um (corpora de milhões de padrões cabem em memória)
+    """
+    from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    processor = ai_system.processor
+    index = PatternIndex(processor.embedding_dim)
+    index.reserve(count)
+
+    questions, responses = [], []
+
+    def flush(batch: List[Dict[str, Any]]):
+        processed = [processor.advanced_preprocess(item['question']) for item in batch]
+        embeddings = processor.create_advanced_embeddings(processed)
+        for item, processed_question, embedding in zip(batch, processed, embeddings):
+            index.add(dict(item, processed=processed_question, embedding=embedding))
+            questions.append(item['question'])
+            responses.append(item['response'])
+
+    batch = []
+    for pattern in patterns:
+        batch.append(pattern)
+        if len(batch) == batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    ai_system.pattern_index = index
+    ai_system.training_patterns = PatternTable(
+        processor,
+        StringTable(*encode_strings(questions)),
+        StringTable(*encode_strings(responses)),
+        index.categories,
+        index.category_ids,
+        index.confidences,
+        index.embeddings,
+        index.embedding_scales
+    )
+    ai_system.semantic_clusters = defaultdict(list, ai_system.training_patterns.group_by_category())
+
+    # Busca completa medida sem cache de respostas
+    ai_system.response_cache = ResponseCache(max_entries=0)
+    return ai_system
+
+
+def summarize(times: List[float]) -> Dict[str, float]:
+    """Percentis (ms) e vazão (chamadas/s) de uma série de tempos em segundos"""
+    values = np.array(times) * 1000
+    total = float(values.sum())
+    return {
+        'calls': len(values),
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean()),
+        'throughput': len(values) / (total / 1000) if total > 0 else 0.0
+    }
+
+
+def time_calls(function: Callable[[Any], Any], inputs: List[Any]) -> Dict[str, float]:
+    """Chama function(x) para cada entrada medindo cada chamada"""
+    times = []
+    for value in inputs:
+        start_time = time.perf_counter()
+        function(value)
+        times.append(time.perf_counter() - start_time)
+    return summarize(times)
+
+
+def benchmark_text_stages(ai_system, queries: List[str]) -> Dict[str, Dict[str, float]]:
+    """Etapas que não dependem do tamanho do corpus"""
+    processor = ai_system.processor
+    processed = [processor.advanced_preprocess(query) for query in queries]
+    return {
+        'preprocess': time_calls(processor.advanced_preprocess, queries),
+        'entities': time_calls(processor.extract_entities, [query.lower() for query in queries]),
+        'embedding': time_calls(processor.create_advanced_embedding, processed)
+    }
+
+
+def benchmark_search_stages(ai_system, queries: List[str]) -> Dict[str, Dict[str, float]]:
+    """Pontuação de todos os padrões e busca completa (sessão limpa a cada consulta)"""
+    processor = ai_system.processor
+    session = ConversationSession('benchmark', processor.embedding_dim, processor.context_window)
+    inputs = []
+    for query in queries:
+        processed = processor.advanced_preprocess(query)
+        inputs.append((processed, processor.create_advanced_embedding(processed),
+                       ai_system.detect_primary_intent(processed)))
+
+    def search(query: str):
+        session.reset()
+        ai_system.advanced_similarity_search(query, session)
+
+    return {
+        'scoring': time_calls(lambda item: ai_system.score_all_patterns(*item, session), inputs),
+        'search': time_calls(search, queries)
+    }
+
+
+def run_benchmark(templates: List[Dict[str, Any]], queries: List[str],
+                  scales: Iterable[int] = DEFAULT_SCALES,
+                  log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Executa o benchmark completo
+    Resultado: {'metadata': ..., 'results': {'real': {...}, '10000': {...}, ...}}
+    """
+    results = {}
+
+    start_time = time.perf_counter()
+    ai_system = build_benchmark_system(templates, len(templates))
+    real = {'patterns': len(templates), 'build_s': time.perf_counter() - start_time}
+    real.update(benchmark_text_stages(ai_system, queries))
+    real.update(benchmark_search_stages(ai_system, queries))
+    results['real'] = real
+    log(f"📊 Corpus real: {len(templates)} padrões")
+    del ai_system
+
+    for scale in scales:
+        start_time = time.perf_counter()
+        ai_system = build_benchmark_system(synthetic_patterns(templates, scale), scale)
+        build_time = time.perf_counter() - start_time
+        log(f"📊 Corpus sintético: {scale} padrões (construído em {build_time:.1f}s)")
+
+        result = {'patterns': scale, 'build_s': build_time}
+        result.update(benchmark_search_stages(ai_system, queries))
+        results[str(scale)] = result
+        del ai_system
+
+    return {
+        'metadata': {
+            'created_at': datetime.now().isoformat(),
+            'python': sys.version.split()[0],
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'queries': len(queries)
+        },
+        'results': results
+    }
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any],
+                     tolerance: float = REGRESSION_TOLERANCE) -> List[Dict[str, Any]]:
+    """Etapas cujo p50 ou p95 piorou mais que `tolerance` em relação à baseline"""
+    regressions = []
+    for corpus, stages in report['results'].items():
+        baseline_stages = baseline.get('results', {}).get(corpus, {})
+        for stage in STAGES:
+            if stage not in stages or stage not in baseline_stages:
+                continue
+            for metric in ('p50_ms', 'p95_ms'):
+                current = stages[stage][metric]
+                previous = baseline_stages[stage][metric]
+                if current > previous * (1 + tolerance) and current - previous > NOISE_FLOOR_MS:
+                    regressions.append({
+                        'corpus': corpus,
+                        'stage': stage,
+                        'metric': metric,
+                        'baseline': previous,
+                        'current': current,
+                        'change': current / previous - 1 if previous > 0 else float('inf')
+                    })
+    return regressions
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """Baseline salva, ou None se não existir"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, report: Dict[str, Any]):
+    """Grava o resultado como nova baseline"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def format_report(report: Dict[str, Any]) -> List[str]:
+    """Tabela de texto com os resultados"""
+    lines = [f"{'corpus':>10} {'etapa':>11} {'p50':>9} {'p95':>9} {'p99':>9} {'vazão/s':>10}"]
+    for corpus, stages in report['results'].items():
+        for stage in STAGES:
+            if stage in stages:
+                result = stages[stage]
+                lines.append(f"{corpus:>10} {stage:>11} {result['p50_ms']:>7.3f}ms "
+                             f"{result['p95_ms']:>7.3f}ms {result['p99_ms']:>7.3f}ms "
+                             f"{result['throughput']:>10.0f}")
+    return lines
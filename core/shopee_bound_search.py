@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+SHOPEE BOUND SEARCH - Busca Exata por Branch-and-Bound
+O score é uma soma ponderada de termos limitados; com um limite superior
+por padrão (termos baratos exatos + termos caros no seu máximo) os padrões
+são pontuados em ordem decrescente de limite e a busca para quando nenhum
+limite restante alcança o melhor score. O argmax é o mesmo da busca exaustiva
+"""
+
+import numpy as np
+from typing import Callable, Tuple
+
+# Padrões pontuados no primeiro lote (os lotes seguintes dobram)
+BOUND_BATCH = 64
+
+# Folga para diferenças de arredondamento entre o limite e o score
+# (mesmos termos somados em outra ordem)
+BOUND_EPSILON = 1e-9
+
+
+def branch_and_bound(bounds: np.ndarray, score: Callable[[np.ndarray], np.ndarray],
+                     batch: int = BOUND_BATCH) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pontua os padrões em lotes de limite decrescente enquanto algum limite
+    ainda alcança o melhor score; score(ids ordenados) -> scores exatos
+    Retorna (ids pontuados em ordem crescente, scores); todo padrão fora
+    da lista tem score estritamente menor que o melhor
+    """
+    remaining = np.arange(len(bounds))
+    scored_ids = []
+    scored = []
+    best = -np.inf
+
+    while remaining.size:
+        # Próximo lote: os maiores limites entre os padrões restantes
+        if remaining.size > batch:
+            selected = np.argpartition(-bounds[remaining], batch - 1)[:batch]
+        else:
+            selected = np.arange(remaining.size)
+        ids = np.sort(remaining[selected])
+        scores = score(ids)
+        scored_ids.append(ids)
+        scored.append(scores)
+        best = max(best, float(scores.max()))
+
+        keep = np.ones(remaining.size, dtype=bool)
+        keep[selected] = False
+        remaining = remaining[keep]
+        remaining = remaining[bounds[remaining] + BOUND_EPSILON >= best]
+        batch *= 2
+
+    if not scored_ids:
+        return np.zeros(0, dtype=np.int64), np.zeros(0)
+
+    # Ordem crescente de id: empates resolvidos como no argmax da busca exaustiva
+    ids = np.concatenate(scored_ids)
+    order = np.argsort(ids)
+    return ids[order], np.concatenate(scored)[order]
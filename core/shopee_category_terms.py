@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+SHOPEE CATEGORY TERMS - Termos de Score por Categoria
+Contexto, relevância por palavras-chave e alinhamento de intenção dependem
+só da mensagem e da categoria do padrão. As tabelas de palavras-chave são
+montadas uma vez; por mensagem, os termos são calculados uma vez por
+categoria e distribuídos aos padrões via category_ids. Frases de intenção
+e indicadores fortes são buscados juntos por um único autômato
+"""
+
+from functools import lru_cache
+from typing import List, Dict, Tuple, Optional, Any, Iterable, FrozenSet, Hashable
+
+import numpy as np
+
+from shopee_phrase_automaton import PhraseAutomaton
+
+CATEGORY_KEYWORDS = {
+    'reenvio_produto': ['não quero devolver', 'sem devolver', 'pode mandar', 'pode enviar', 'reenvia', 'reenviar', 'segunda entrega', 'segunda via', 'substituir', 'substituto', 'reposição'],
+    'produto_defeituoso': ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga', 'estragado', 'danificado', 'problema', 'ruim', 'péssimo', 'usado', 'sujo', 'rachado', 'arranhão'],
+    'alteracao_dados': ['alterar', 'mudar', 'endereço', 'endereco', 'dados', 'erro', 'corrigir', 'atualizar'],
+    'cancelamento_pedido': ['cancelar', 'cancela', 'parar', 'anular', 'desfazer', 'reverter', 'estornar', 'remover', 'excluir', 'desistir'],
+    'pedidos': ['pedido', 'compra', 'status', 'onde', 'rastrear', 'acompanhar'],
+    'pagamento': ['pagar', 'pix', 'cartão', 'cartao', 'pagamento', 'valor', 'preco'],
+    'entrega': ['entrega', 'prazo', 'correios', 'rastrear', 'chegou', 'receber'],
+    'devolucao': ['devolver', 'trocar', 'reembolso', 'devoluçao', 'troca']
+}
+
+# Expressões que indicam forte intenção (valem 2 acertos cada)
+STRONG_INDICATORS = {
+    'reenvio_produto': ['não quero devolver pode mandar', 'sem devolver quero outro', 'pode enviar outro', 'segunda entrega'],
+    'produto_defeituoso': ['veio com defeito', 'produto quebrado', 'não funciona', 'chegou quebrado', 'defeito de fábrica'],
+    'cancelamento_pedido': ['cancelar', 'cancela', 'não quero', 'desistir', 'parar'],
+    'alteracao_dados': ['alterar dados', 'mudar endereço', 'corrigir', 'atualizar']
+}
+
+INTENT_CATEGORY_MAP = {
+    'reenvio_produto': ['reenvio_produto'],
+    'produto_defeituoso': ['produto_defeituoso'],
+    'cancelamento': ['cancelamento_pedido'],
+    'alteracao_dados': ['alteracao_dados'],
+    'alteracao_endereco': ['alteracao_dados'],
+    'devolucao': ['devolucao', 'reembolso'],
+    'consulta_pedido': ['pedidos'],
+    'pagamento': ['pagamento', 'pix', 'shopeepay'],
+    'geral': ['saudacao', 'suporte', 'geral']
+}
+
+# Alinhamentos parciais (intenção, categoria) -> boost menor
+PARTIAL_INTENT_BOOSTS = {
+    ('cancelamento', 'pedidos'): 0.3,
+    ('alteracao_dados', 'conta'): 0.3
+}
+
+# Frases de detect_primary_intent (busca por substring no texto dos tokens)
+INTENT_PHRASES = {
+    'reenvio': ['não quero devolver', 'sem devolver', 'pode mandar novamente', 'pode enviar outro'],
+    'defeito': ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga', 'estragado', 'danificado',
+                'veio quebrado', 'chegou quebrado', 'produto ruim', 'má qualidade', 'não presta'],
+    'cancelamento': ['cancelar', 'cancela', 'não quero', 'desistir', 'parar', 'anular'],
+    'alteracao': ['alterar', 'mudar', 'corrigir', 'atualizar'],
+    'dados': ['dados'],
+    'endereco': ['endereço', 'endereco', 'casa', 'apartamento'],
+    'devolucao': ['devolver', 'trocar', 'reembolso'],
+    'pedido': ['pedido', 'compra', 'onde', 'status'],
+    'pagamento': ['pagar', 'pagamento', 'pix', 'cartão']
+}
+
+# Ordem de prioridade das intenções: a primeira regra com todos os rótulos presentes vence
+# ('entidade', x) = intenção x do extrator de entidades; ('frase', x) = grupo de INTENT_PHRASES
+INTENT_PRIORITY: List[Tuple[str, Tuple[Tuple[str, str], ...]]] = [
+    # PRIORIDADE MÁXIMA: Reenvio/Segunda entrega (situação muito específica)
+    ('reenvio_produto', (('entidade', 'reenvio_produto'),)),
+    ('reenvio_produto', (('frase', 'reenvio'),)),
+    # PRIORIDADE ALTA: Produtos defeituosos
+    ('produto_defeituoso', (('entidade', 'produto_defeituoso'),)),
+    ('produto_defeituoso', (('frase', 'defeito'),)),
+    # Palavras-chave de alta prioridade
+    ('cancelamento', (('frase', 'cancelamento'),)),
+    ('alteracao_dados', (('frase', 'alteracao'), ('frase', 'dados'))),
+    ('alteracao_endereco', (('frase', 'endereco'),)),
+    ('devolucao', (('frase', 'devolucao'),)),
+    ('consulta_pedido', (('frase', 'pedido'),)),
+    ('pagamento', (('frase', 'pagamento'),))
+]
+DEFAULT_INTENT = 'geral'
+
+STRONG_INDICATOR_WEIGHT = 2
+MAX_RELEVANCE_BOOST = 1.5  # Permite boost > 1.0
+
+# Categorias recentes da sessão consideradas e boost de contexto
+CONTEXT_WINDOW = 3
+CONTEXT_BOOST = 0.8
+
+KEYWORD_SETS = {category: frozenset(keywords) for category, keywords in CATEGORY_KEYWORDS.items()}
+
+# Palavra-chave -> categorias que a listam (um token pode contar para várias)
+KEYWORD_CATEGORIES: Dict[str, Tuple[str, ...]] = {}
+for _category, _keywords in CATEGORY_KEYWORDS.items():
+    for _keyword in _keywords:
+        KEYWORD_CATEGORIES[_keyword] = KEYWORD_CATEGORIES.get(_keyword, ()) + (_category,)
+
+
+def build_phrase_automaton(intent_phrases: Optional[Dict[str, List[str]]] = None,
+                           strong_indicators: Optional[Dict[str, List[str]]] = None) -> PhraseAutomaton:
+    """
+    Autômato com as frases de intenção (rótulo ('frase', grupo)) e os
+    indicadores fortes (rótulo ('indicador', categoria, frase))
+    """
+    intent_phrases = INTENT_PHRASES if intent_phrases is None else intent_phrases
+    strong_indicators = STRONG_INDICATORS if strong_indicators is None else strong_indicators
+    phrases = [(phrase, ('frase', group)) for group, group_phrases in intent_phrases.items()
+               for phrase in group_phrases]
+    phrases += [(indicator, ('indicador', category, indicator)) for category, indicators in strong_indicators.items()
+                for indicator in indicators]
+    return PhraseAutomaton(phrases)
+
+
+PHRASE_AUTOMATON = build_phrase_automaton()
+
+# Textos recentes com as frases já encontradas
+PHRASE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PHRASE_CACHE_SIZE)
+def match_phrases(text: str) -> FrozenSet[Hashable]:
+    """
+    Rótulos das frases presentes no texto; a intenção primária e os termos
+    de categoria da mesma mensagem compartilham uma única passada
+    """
+    return frozenset(PHRASE_AUTOMATON.search(text))
+
+
+INTENT_RULES = [(intent, frozenset(required)) for intent, required in INTENT_PRIORITY]
+
+
+def select_intent(entity_intents: Iterable[str], phrases: FrozenSet[Hashable]) -> str:
+    """Intenção primária pela ordem de INTENT_PRIORITY"""
+    found = phrases
+    if entity_intents:
+        found = phrases.union([('entidade', intent) for intent in entity_intents])
+    for intent, required in INTENT_RULES:
+        if required <= found:
+            return intent
+    return DEFAULT_INTENT
+
+
+def query_features(processed_input: Dict, primary_intent: str,
+                   recent_categories: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Características da mensagem usadas pelos termos de categoria (uma vez por consulta)
+    recent_categories None = sessão sem histórico
+    """
+    tokens = processed_input['tokens']
+    return {
+        'tokens': tokens,
+        'phrases': match_phrases(' '.join(tokens)),
+        'intent': primary_intent,
+        'recent_categories': None if recent_categories is None else frozenset(recent_categories)
+    }
+
+
+def keyword_relevance(features: Dict[str, Any], category: str) -> float:
+    """Relevância da categoria pelas palavras-chave e indicadores fortes da mensagem"""
+    keywords = KEYWORD_SETS.get(category)
+    if keywords is None:
+        return 0.0
+
+    matches = sum(1 for token in features['tokens'] if token in keywords)
+    for label in features['phrases']:
+        if label[0] == 'indicador' and label[1] == category:
+            matches += STRONG_INDICATOR_WEIGHT
+    return min(matches / max(len(CATEGORY_KEYWORDS[category]), 1), MAX_RELEVANCE_BOOST)
+
+
+def intent_alignment(primary_intent: str, category: str) -> float:
+    """Alinhamento entre a intenção detectada e a categoria"""
+    if primary_intent not in INTENT_CATEGORY_MAP:
+        return 0.0
+    if category in INTENT_CATEGORY_MAP[primary_intent]:
+        return 1.0  # Boost forte para alinhamento perfeito
+    return PARTIAL_INTENT_BOOSTS.get((primary_intent, category), 0.0)
+
+
+def context_match(features: Dict[str, Any], category: str) -> float:
+    """Boost para categorias das interações recentes da sessão"""
+    recent = features['recent_categories']
+    return CONTEXT_BOOST if recent and category in recent else 0.0
+
+
+class CategoryTermTable:
+    """
+    Tabelas por id de categoria do índice: palavra-chave -> ids, indicadores
+    fortes, número de palavras-chave e vetor de boost por intenção
+    Remontada só quando o índice ganha categorias novas
+    """
+
+    def __init__(self, categories: List[str]):
+        self.categories = categories
+        self.size = len(categories)
+        self.lookup = lookup = {category: i for i, category in enumerate(categories)}
+
+        # Categorias sem palavras-chave nunca têm acertos (boost 0)
+        self.keyword_counts = np.ones(self.size)
+        for category, keywords in CATEGORY_KEYWORDS.items():
+            if category in lookup:
+                self.keyword_counts[lookup[category]] = max(len(keywords), 1)
+
+        self.keyword_ids: Dict[str, List[int]] = {}
+        for keyword, owners in KEYWORD_CATEGORIES.items():
+            ids = [lookup[category] for category in owners if category in lookup]
+            if ids:
+                self.keyword_ids[keyword] = ids
+        self.indicator_ids = {('indicador', category, indicator): lookup[category]
+                              for category, indicators in STRONG_INDICATORS.items() if category in lookup
+                              for indicator in indicators}
+
+        self.intent_rows = {intent: np.array([intent_alignment(intent, category) for category in categories])
+                            for intent in INTENT_CATEGORY_MAP}
+        self.no_intent = np.zeros(self.size)
+
+    def matches(self, categories: List[str]) -> bool:
+        """Tabela ainda corresponde à lista de categorias do índice?"""
+        return categories is self.categories and len(categories) == self.size
+
+    def relevance_boosts(self, features: Dict[str, Any]) -> np.ndarray:
+        """Relevância de todas as categorias: um acesso ao dicionário por token e por frase encontrada"""
+        matches = np.zeros(self.size)
+        for token in features['tokens']:
+            for category_id in self.keyword_ids.get(token, ()):
+                matches[category_id] += 1
+        for label in features['phrases']:
+            category_id = self.indicator_ids.get(label)
+            if category_id is not None:
+                matches[category_id] += STRONG_INDICATOR_WEIGHT
+
+        return np.minimum(matches / self.keyword_counts, MAX_RELEVANCE_BOOST)
+
+    def context_boosts(self, features: Dict[str, Any]) -> np.ndarray:
+        """Boost de contexto de todas as categorias"""
+        boosts = np.zeros(self.size)
+        for category in features['recent_categories'] or ():
+            category_id = self.lookup.get(category)
+            if category_id is not None:
+                boosts[category_id] = CONTEXT_BOOST
+        return boosts
+
+    def scores(self, features: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(contexto, relevância, intenção) por categoria para uma mensagem"""
+        intent_boosts = self.intent_rows.get(features['intent'], self.no_intent).copy()
+        return self.context_boosts(features), self.relevance_boosts(features), intent_boosts
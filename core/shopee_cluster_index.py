@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+SHOPEE CLUSTER INDEX - Busca Podada por Clusters (estilo IVF)
+Agrupa os padrões por categoria (categorias grandes são divididas em
+sub-centroides com k-means) para que a pontuação completa rode apenas
+nos clusters mais promissores para a consulta
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+# Tamanho máximo de um cluster antes de dividir a categoria com k-means
+MAX_CLUSTER_SIZE = 32
+
+# Iterações do k-means esférico
+KMEANS_ITERATIONS = 10
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """Normaliza as linhas para norma 1 (linhas nulas ficam nulas)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-8)
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, rng: np.random.Generator,
+                     iterations: int = KMEANS_ITERATIONS) -> np.ndarray:
+    """
+    k-means sobre vetores normalizados (similaridade cosseno)
+    Retorna o rótulo do cluster de cada vetor
+    """
+    # Inicialização k-means++ (distância = 1 - cosseno)
+    centers = [vectors[rng.integers(len(vectors))]]
+    for _ in range(1, k):
+        distances = np.maximum(1.0 - (vectors @ np.array(centers).T).max(axis=1), 0.0)
+        total = distances.sum()
+        if total <= 0:
+            break
+        centers.append(vectors[rng.choice(len(vectors), p=distances / total)])
+    centers = np.array(centers)
+
+    labels = np.full(len(vectors), -1, dtype=np.int64)
+    for _ in range(iterations):
+        new_labels = np.argmax(vectors @ centers.T, axis=1)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        for cluster in range(len(centers)):
+            members = vectors[labels == cluster]
+            if len(members):
+                centers[cluster] = normalize_rows(members.sum(axis=0, keepdims=True))[0]
+
+    # Rótulos compactos (clusters vazios descartados)
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+class ClusterIndex:
+    """
+    Lista invertida de clusters: centroide normalizado, categoria e membros
+    Padrões adicionados depois da construção (ids >= size) ficam na "cauda"
+    e são sempre pontuados até a próxima reconstrução
+    """
+
+    def __init__(self, centroids: np.ndarray, cluster_categories: np.ndarray,
+                 member_offsets: np.ndarray, member_ids: np.ndarray, size: int):
+        self.centroids = centroids
+        self.cluster_categories = cluster_categories
+        self.member_offsets = member_offsets
+        self.member_ids = member_ids
+        self.size = size
+
+    @property
+    def num_clusters(self) -> int:
+        return len(self.cluster_categories)
+
+    @classmethod
+    def build(cls, embeddings: np.ndarray, category_ids: np.ndarray,
+              max_cluster_size: int = MAX_CLUSTER_SIZE, seed: int = 0) -> "ClusterIndex":
+        """Constrói os clusters a partir das linhas do índice de padrões"""
+        # Gerador próprio: não altera o estado global de np.random
+        rng = np.random.default_rng(seed)
+        vectors = normalize_rows(np.asarray(embeddings, dtype=np.float64))
+
+        centroids, categories, members = [], [], []
+        order = np.argsort(category_ids, kind='stable')
+        boundaries = np.flatnonzero(np.diff(category_ids[order])) + 1
+
+        for ids in np.split(order, boundaries):
+            if ids.size == 0:
+                continue
+            category_id = int(category_ids[ids[0]])
+
+            groups = [ids]
+            if ids.size > max_cluster_size:
+                k = int(np.ceil(ids.size / max_cluster_size))
+                labels = spherical_kmeans(vectors[ids], k, rng)
+                groups = [ids[labels == label] for label in range(labels.max() + 1)]
+
+            for group in groups:
+                centroids.append(normalize_rows(vectors[group].sum(axis=0, keepdims=True))[0])
+                categories.append(category_id)
+                members.append(np.sort(group))
+
+        member_offsets = np.zeros(len(members) + 1, dtype=np.int64)
+        member_offsets[1:] = np.cumsum([len(group) for group in members])
+        member_ids = np.concatenate(members).astype(np.int64) if members else np.zeros(0, dtype=np.int64)
+        centroid_matrix = np.array(centroids, dtype=np.float32) if centroids \
+            else np.zeros((0, embeddings.shape[1]), dtype=np.float32)
+
+        return cls(centroid_matrix, np.array(categories, dtype=np.int32),
+                   member_offsets, member_ids, len(category_ids))
+
+    def cluster_scores(self, query_embedding: np.ndarray, category_priors: np.ndarray,
+                       cosine_weight: float = 0.3) -> np.ndarray:
+        """Score de cada cluster: cosseno com o centroide + termos da categoria"""
+        query = np.asarray(query_embedding, dtype=np.float32)
+        similarities = (self.centroids @ query).astype(np.float64)
+        similarities /= max(float(np.linalg.norm(query)), 1e-8)
+        return cosine_weight * similarities + category_priors[self.cluster_categories]
+
+    def candidates(self, query_embedding: np.ndarray, category_priors: np.ndarray,
+                   probe: int, total_size: int) -> Tuple[np.ndarray, int]:
+        """
+        Ids (ordenados) dos padrões nos `probe` melhores clusters + cauda
+        Retorna também quantos clusters foram visitados
+        """
+        probe = min(probe, self.num_clusters)
+        selected: List[np.ndarray] = []
+
+        if probe > 0:
+            scores = self.cluster_scores(query_embedding, category_priors)
+            if probe < self.num_clusters:
+                top = np.argpartition(-scores, probe - 1)[:probe]
+            else:
+                top = np.arange(self.num_clusters)
+            offsets = self.member_offsets
+            selected = [self.member_ids[offsets[c]:offsets[c + 1]] for c in top]
+
+        if total_size > self.size:
+            selected.append(np.arange(self.size, total_size, dtype=np.int64))
+
+        if not selected:
+            return np.zeros(0, dtype=np.int64), probe
+        return np.sort(np.concatenate(selected)), probe
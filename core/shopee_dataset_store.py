@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+SHOPEE DATASET STORE - Base de Treinamento em Segmentos
+Padrões gravados em segmentos JSONL imutáveis (só acrescentados) descritos
+por um manifesto; cada operação grava apenas os registros novos e troca o
+manifesto de forma atômica. Substituir uma categoria só marca a categoria
+nos segmentos antigos; os registros mascarados são descartados depois,
+na compactação em segundo plano. Perguntas repetidas (mesmo hash md5)
+não são gravadas de novo. Um único processo escritor por vez; leitores
+de um manifesto anterior têm SEGMENT_GRACE segundos para terminar antes
+que os segmentos que saíram do manifesto sejam apagados
+"""
+
+import os
+import json
+import struct
+import hashlib
+import logging
+import time
+import threading
+from typing import List, Dict, Tuple, Optional, Any, Iterable, Iterator, Set
+
+from shopee_training_stream import normalize_record, iter_jsonl, iter_training_records
+
+MANIFEST_FILE = 'manifest.json'
+SEGMENTS_DIR = 'segments'
+STORE_VERSION = 1
+
+# Índice de cada segmento: md5 da pergunta + posição da categoria no manifesto
+INDEX_RECORD = struct.Struct('<16sH')
+
+# Compactar quando houver muitos segmentos ou muitos registros mascarados
+COMPACT_MAX_SEGMENTS = 8
+COMPACT_GARBAGE_RATIO = 0.5
+
+# Segundos que um arquivo fora do manifesto é mantido antes de ser apagado
+SEGMENT_GRACE = 300.0
+
+logger = logging.getLogger('ShopeeNeuralAI')
+
+
+def question_digest(question: str) -> bytes:
+    """md5 da pergunta (o mesmo hash usado nos padrões do índice)"""
+    return hashlib.md5(question.encode()).digest()
+
+
+def write_durable(path: str, data: bytes):
+    """Grava e força o conteúdo para o disco"""
+    with open(path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class DatasetStore:
+    """Base de padrões de treinamento em segmentos JSONL + manifesto"""
+
+    def __init__(self, directory: str, auto_compact: bool = True, segment_grace: float = SEGMENT_GRACE):
+        self.directory = str(directory)
+        self.segments_dir = os.path.join(self.directory, SEGMENTS_DIR)
+        self.manifest_path = os.path.join(self.directory, MANIFEST_FILE)
+        self.auto_compact = auto_compact
+        self.segment_grace = segment_grace
+        self.lock = threading.RLock()
+        self.compaction_thread: Optional[threading.Thread] = None
+        self.manifest = self.read_manifest()
+
+        # md5 da pergunta -> categoria dos padrões vigentes (lido dos índices uma vez)
+        self.digests: Optional[Dict[bytes, str]] = None
+
+    def exists(self) -> bool:
+        return os.path.isfile(self.manifest_path)
+
+    def read_manifest(self) -> Dict[str, Any]:
+        if not self.exists():
+            return {'version': STORE_VERSION, 'next_segment': 1, 'segments': [], 'retired': {}}
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"Versão de base não suportada: {manifest.get('version')}")
+        manifest.setdefault('retired', {})
+        return manifest
+
+    def write_manifest(self, manifest: Dict[str, Any]):
+        """Troca atômica do manifesto (ponto de confirmação de cada operação)"""
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        write_durable(temp_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+        os.replace(temp_path, self.manifest_path)
+        self.manifest = manifest
+
+    # ---- Leitura ----
+
+    def segment_path(self, entry: Dict[str, Any]) -> str:
+        return os.path.join(self.segments_dir, entry['file'])
+
+    def live_segments(self) -> List[Tuple[str, Set[str]]]:
+        """(caminho do segmento, categorias mascaradas) na ordem de gravação"""
+        return [(self.segment_path(entry), set(entry['masked']))
+                for entry in self.manifest['segments']]
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Padrões vigentes, na ordem de gravação"""
+        for path, masked in self.live_segments():
+            with open(path, 'r', encoding='utf-8') as stream:
+                for record in iter_jsonl(stream):
+                    if record is not None and record['category'] not in masked:
+                        yield record
+
+    def categories(self) -> Dict[str, int]:
+        """Padrões vigentes por categoria"""
+        counts: Dict[str, int] = {}
+        for entry in self.manifest['segments']:
+            for category, count in entry['categories'].items():
+                if category not in entry['masked']:
+                    counts[category] = counts.get(category, 0) + count
+        return counts
+
+    def __len__(self) -> int:
+        return sum(self.categories().values())
+
+    def read_index(self, entry: Dict[str, Any]) -> Iterator[Tuple[bytes, str]]:
+        """(md5 da pergunta, categoria) de cada registro do segmento"""
+        names = list(entry['categories'])
+        with open(self.segment_path(entry)[:-len('.jsonl')] + '.idx', 'rb') as f:
+            data = f.read()
+        for digest, position in INDEX_RECORD.iter_unpack(data):
+            yield digest, names[position]
+
+    def live_digests(self) -> Dict[bytes, str]:
+        """
+        md5 -> categoria das perguntas vigentes; lido dos índices (18 bytes por
+        registro) só na primeira escrita e depois mantido a cada operação
+        """
+        if self.digests is None:
+            digests = {}
+            for entry in self.manifest['segments']:
+                masked = set(entry['masked'])
+                digests.update((digest, category) for digest, category in self.read_index(entry)
+                               if category not in masked)
+            self.digests = digests
+        return self.digests
+
+    # ---- Escrita ----
+
+    def write_segment(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Grava um segmento novo (JSONL + índice) e devolve sua entrada no manifesto"""
+        os.makedirs(self.segments_dir, exist_ok=True)
+        segment_id = self.manifest['next_segment']
+        self.manifest['next_segment'] = segment_id + 1
+
+        categories: Dict[str, int] = {}
+        for record in records:
+            categories[record['category']] = categories.get(record['category'], 0) + 1
+        positions = {category: i for i, category in enumerate(categories)}
+
+        lines = ''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records)
+        index = b''.join(INDEX_RECORD.pack(question_digest(record['question']), positions[record['category']])
+                         for record in records)
+
+        entry = {'file': f"{segment_id:06d}.jsonl", 'records': len(records),
+                 'categories': categories, 'masked': []}
+        write_durable(self.segment_path(entry), lines.encode('utf-8'))
+        write_durable(self.segment_path(entry)[:-len('.jsonl')] + '.idx', index)
+        return entry
+
+    def prepare_records(self, records: Iterable[Any], known: Dict[bytes, str],
+                        exclude_category: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int, int]:
+        """
+        Registros válidos e inéditos; retorna (registros, duplicados, inválidos)
+        Perguntas vigentes de exclude_category (que será substituída) não contam
+        """
+        accepted, duplicates, invalid = [], 0, 0
+        seen: Set[bytes] = set()
+        for record in records:
+            pattern = normalize_record(record)
+            if pattern is None:
+                invalid += 1
+                continue
+            digest = question_digest(pattern['question'])
+            existing = known.get(digest)
+            if digest in seen or (existing is not None and existing != exclude_category):
+                duplicates += 1
+                continue
+            seen.add(digest)
+            accepted.append(pattern)
+        return accepted, duplicates, invalid
+
+    def remember_digests(self, records: List[Dict[str, Any]]):
+        """Acrescenta as perguntas gravadas ao conjunto de hashes vigentes"""
+        digests = self.live_digests()
+        for record in records:
+            digests[question_digest(record['question'])] = record['category']
+
+    def add(self, records: Iterable[Any]) -> Dict[str, int]:
+        """Acrescenta padrões (perguntas já existentes são ignoradas)"""
+        with self.lock:
+            accepted, duplicates, invalid = self.prepare_records(records, self.live_digests())
+            if accepted:
+                entry = self.write_segment(accepted)
+                manifest = dict(self.manifest, segments=self.manifest['segments'] + [entry])
+                self.write_manifest(manifest)
+                self.remember_digests(accepted)
+
+        self.maybe_compact()
+        return {'added': len(accepted), 'duplicates': duplicates, 'invalid': invalid}
+
+    def replace_category(self, category: str, records: Iterable[Any]) -> Dict[str, int]:
+        """
+        Substitui todos os padrões da categoria pelos registros dados (atômico)
+        Registros de outras categorias são recusados (contados como inválidos)
+        """
+        records = list(records)
+        with self.lock:
+            accepted, duplicates, _ = self.prepare_records(
+                (record for record in records if isinstance(record, dict)
+                 and record.get('category', 'geral') == category),
+                self.live_digests(), exclude_category=category)
+            invalid = len(records) - len(accepted) - duplicates
+
+            removed = 0
+            segments = []
+            retired = []
+            for entry in self.manifest['segments']:
+                if category in entry['categories'] and category not in entry['masked']:
+                    removed += entry['categories'][category]
+                    entry = dict(entry, masked=entry['masked'] + [category])
+                # Segmento todo mascarado sai do manifesto (arquivo removido na compactação)
+                if set(entry['categories']) - set(entry['masked']):
+                    segments.append(entry)
+                else:
+                    retired.append(entry)
+
+            if accepted:
+                segments.append(self.write_segment(accepted))
+            self.write_manifest(dict(self.manifest, segments=segments,
+                                     retired=self.retire(retired)))
+
+            digests = self.live_digests()
+            for digest in [digest for digest, owner in digests.items() if owner == category]:
+                del digests[digest]
+            self.remember_digests(accepted)
+
+        self.maybe_compact()
+        return {'added': len(accepted), 'removed': removed, 'duplicates': duplicates, 'invalid': invalid}
+
+    # ---- Compactação ----
+
+    def garbage_records(self) -> int:
+        """Registros mascarados ainda presentes nos segmentos vigentes"""
+        return sum(count for entry in self.manifest['segments']
+                   for category, count in entry['categories'].items() if category in entry['masked'])
+
+    def needs_compaction(self) -> bool:
+        segments = self.manifest['segments']
+        total = sum(entry['records'] for entry in segments)
+        return (len(segments) > COMPACT_MAX_SEGMENTS
+                or (total > 0 and self.garbage_records() / total > COMPACT_GARBAGE_RATIO))
+
+    def maybe_compact(self):
+        """
+        Dispara a compactação em segundo plano quando necessária e apaga os
+        segmentos retirados cujo prazo de leitura já passou
+        """
+        if self.manifest['retired']:
+            with self.lock:
+                self.remove_unreferenced()
+        if not self.auto_compact or not self.needs_compaction():
+            return
+        if self.compaction_thread is not None and self.compaction_thread.is_alive():
+            return
+        self.compaction_thread = threading.Thread(target=self.compact, name='shopee-dataset-compact')
+        self.compaction_thread.start()
+
+    def compact(self) -> bool:
+        """
+        Reescreve os segmentos vigentes em um só, sem os registros mascarados,
+        e remove arquivos que não estão no manifesto. Escritas concorrentes
+        continuam possíveis; se mascararem um dos segmentos lidos, a troca é abortada
+        """
+        with self.lock:
+            snapshot = [dict(entry) for entry in self.manifest['segments']]
+        if not snapshot:
+            return False
+
+        records = []
+        for entry in snapshot:
+            masked = set(entry['masked'])
+            with open(self.segment_path(entry), 'r', encoding='utf-8') as stream:
+                records.extend(record for record in iter_jsonl(stream)
+                               if record is not None and record['category'] not in masked)
+
+        with self.lock:
+            current = self.manifest['segments']
+            if current[:len(snapshot)] != snapshot:
+                logger.warning("⚠️ Base alterada durante a compactação; nova tentativa depois")
+                return False
+
+            segments = ([self.write_segment(records)] if records else []) + current[len(snapshot):]
+            self.write_manifest(dict(self.manifest, segments=segments, retired=self.retire(snapshot)))
+            removed_files = self.remove_unreferenced()
+
+        logger.info(f"🧹 Base compactada: {len(snapshot)} segmentos → 1 "
+                    f"({len(records)} padrões, {removed_files} arquivos removidos)")
+        return True
+
+    def retire(self, entries: List[Dict[str, Any]]) -> Dict[str, float]:
+        """Registro de retirada (arquivo -> instante) com os segmentos que saem do manifesto"""
+        retired = dict(self.manifest['retired'])
+        now = time.time()
+        for entry in entries:
+            retired[entry['file']] = now
+        return retired
+
+    def remove_unreferenced(self) -> int:
+        """
+        Apaga segmentos fora do manifesto (substituídos ou de escritas interrompidas)
+        há mais de segment_grace segundos: retirados contam do instante da
+        retirada, órfãos da última modificação. Chamar com o lock
+        """
+        referenced = set()
+        for entry in self.manifest['segments']:
+            referenced.add(entry['file'][:-len('.jsonl')])
+
+        retired = dict(self.manifest['retired'])
+        now = time.time()
+        removed = 0
+        for name in os.listdir(self.segments_dir):
+            base, _ = os.path.splitext(name)
+            if base in referenced:
+                continue
+            path = os.path.join(self.segments_dir, name)
+            since = retired.get(base + '.jsonl', os.path.getmtime(path))
+            if now - since >= self.segment_grace:
+                os.remove(path)
+                removed += 1
+
+        # Retiradas cujos arquivos já não existem saem do manifesto
+        present = {os.path.splitext(name)[0] + '.jsonl' for name in os.listdir(self.segments_dir)}
+        if retired.keys() - present:
+            self.write_manifest(dict(self.manifest, retired={name: since for name, since in retired.items()
+                                                             if name in present}))
+        return removed
+
+    def wait_compaction(self):
+        """Aguarda a compactação em andamento (se houver)"""
+        if self.compaction_thread is not None:
+            self.compaction_thread.join()
+
+
+def open_store(directory: str, seed_sources: Optional[List[str]] = None) -> DatasetStore:
+    """Abre a base; se ainda não existe, cria importando seed_sources (uma única vez)"""
+    store = DatasetStore(directory)
+    if not store.exists() and seed_sources:
+        result = store.add(iter_training_records(seed_sources))
+        logger.info(f"📥 Base criada em {directory}: {result['added']} padrões importados")
+    return store
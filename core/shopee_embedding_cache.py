@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+SHOPEE EMBEDDING CACHE - Cache Incremental de Embeddings
+Guarda em disco o preprocessamento e o embedding de cada pergunta,
+indexados pelo md5 da pergunta, junto com a impressão digital do
+processador (configuração e pesos) que os gerou; uma recarga do JSON de
+treinamento só processa perguntas novas ou alteradas
+"""
+
+import json
+import hashlib
+from datetime import datetime
+from typing import List, Dict, Tuple, Optional, Any
+
+import numpy as np
+
+from shopee_index_storage import encode_strings, decode_strings, StringTable
+from shopee_snapshot import SnapshotError, write_snapshot, read_snapshot
+
+# Incrementar quando preprocessamento ou embeddings mudarem de forma incompatível
+CACHE_VERSION = 3
+
+
+def weights_fingerprint(embedding_dim: int, context_window: int, weights: List[np.ndarray]) -> str:
+    """Impressão digital da configuração e dos pesos que geraram os embeddings"""
+    digest = hashlib.md5(f"{CACHE_VERSION}:{embedding_dim}:{context_window}".encode())
+    for matrix in weights:
+        digest.update(np.ascontiguousarray(matrix, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def processor_fingerprint(processor) -> str:
+    """Impressão digital do processador atual"""
+    return weights_fingerprint(processor.embedding_dim, processor.context_window, [
+        processor.attention_weights, processor.context_weights, processor.semantic_weights])
+
+
+class EmbeddingCache:
+    """
+    Cache hash da pergunta -> (embedding, preprocessamento)
+    Só é aproveitado se a impressão digital for a do processador atual
+    (embeddings determinísticos: reaproveitados e novos ficam no mesmo espaço)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows: Dict[str, int] = {}
+        self.embeddings = np.zeros((0, 0))
+        self.processed: Optional[StringTable] = None
+        self.fingerprint: Optional[str] = None
+        self.merged_words = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def load(self, processor) -> bool:
+        """
+        Lê o cache; False se ausente, inválido ou de outro processador
+        Palavras salvas que o vocabulário ainda não tem são incorporadas a ele
+        (as já conhecidas não mudam); quantas ficam em merged_words
+        """
+        try:
+            arrays, metadata = read_snapshot(self.path)
+        except (OSError, SnapshotError):
+            return False
+
+        fingerprint = processor_fingerprint(processor)
+        if (metadata.get('cache_version') != CACHE_VERSION
+                or metadata.get('fingerprint') != fingerprint):
+            return False
+
+        # Copiar para a memória: o arquivo será regravado ao final da carga
+        self.merged_words = processor.word_vectors.add_vectors(
+            decode_strings(arrays['words_blob'], arrays['words_offsets']),
+            np.array(arrays['word_vectors']))
+
+        hashes = decode_strings(arrays['hashes_blob'], arrays['hashes_offsets'])
+        self.rows = {question_hash: row for row, question_hash in enumerate(hashes)}
+        self.embeddings = np.array(arrays['embeddings'])
+        self.processed = StringTable(np.array(arrays['processed_blob']), np.array(arrays['processed_offsets']))
+        self.fingerprint = fingerprint
+        return True
+
+    def get(self, question_hash: str) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+        """(embedding, preprocessamento) da pergunta, ou None se não estiver no cache"""
+        row = self.rows.get(question_hash)
+        if row is None:
+            return None
+        return self.embeddings[row].copy(), json.loads(self.processed[row])
+
+    def is_current(self, processor, patterns: List[Dict[str, Any]]) -> bool:
+        """
+        True se o cache contém exatamente as perguntas atuais com o mesmo processador
+        Compara os hashes distintos (perguntas repetidas ocupam uma só entrada)
+        """
+        if self.fingerprint != processor_fingerprint(processor):
+            return False
+        return self.rows.keys() == {pattern['hash'] for pattern in patterns}
+
+    def save(self, processor, patterns: List[Dict[str, Any]]):
+        """Regrava o cache com os padrões atuais (entradas obsoletas são descartadas)"""
+        unique = {}
+        for pattern in patterns:
+            unique.setdefault(pattern['hash'], pattern)
+
+        arrays = {}
+        arrays['hashes_blob'], arrays['hashes_offsets'] = encode_strings(unique.keys())
+        arrays['processed_blob'], arrays['processed_offsets'] = encode_strings(
+            json.dumps(pattern['processed'], ensure_ascii=False) for pattern in unique.values())
+
+        embeddings = np.zeros((len(unique), processor.embedding_dim))
+        for row, pattern in enumerate(unique.values()):
+            embeddings[row] = pattern['embedding']
+        arrays['embeddings'] = embeddings
+
+        arrays['words_blob'], arrays['words_offsets'] = encode_strings(processor.word_vectors.words)
+        arrays['word_vectors'] = processor.word_vectors.export_matrix()
+
+        fingerprint = processor_fingerprint(processor)
+        write_snapshot(self.path, arrays, {
+            'cache_version': CACHE_VERSION,
+            'fingerprint': fingerprint,
+            'embedding_dim': processor.embedding_dim,
+            'context_window': processor.context_window,
+            'entries': len(unique),
+            'saved_at': datetime.now().isoformat()
+        })
+
+        self.rows = {question_hash: row for row, question_hash in enumerate(unique)}
+        self.embeddings = embeddings
+        self.processed = StringTable(arrays['processed_blob'], arrays['processed_offsets'])
+        self.fingerprint = fingerprint
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+SHOPEE ENTITY EXTRACTOR - Extrator Compilado de Entidades e Intenções
+Substitui as ~15 buscas regex independentes por uma única varredura do texto
+seguida de consultas a uma tabela de frases pré-compilada
+"""
+
+import re
+from typing import List, Dict, Tuple
+
+# Varredura única: o texto vira uma sequência alternada de palavras e separadores
+SCAN_PATTERN = re.compile(r'\w+|\W+')
+
+# Regras de palavras/frases (mesmos vocabulários das regex originais)
+PHRASE_RULES: Dict[str, List[str]] = {
+    'endereco': ['endereço', 'endereco', 'casa', 'apartamento', 'numero', 'cep', 'rua', 'avenida'],
+    'local': ['casa', 'trabalho', 'faculdade', 'hotel', 'empresa', 'estado', 'cidade'],
+    'servico': ['pedido', 'entrega', 'pagamento', 'pix', 'reembolso', 'devolucao', 'cupom'],
+    'cancelamento': ['cancelar', 'cancela', 'não quero', 'desistir', 'parar'],
+    'alteracao': ['alterar', 'mudar', 'corrigir', 'atualizar', 'erro'],
+    'bloqueio_alteracao': ['defeito', 'quebrado', 'não funciona'],
+    'devolucao': ['devolver', 'trocar', 'reembolso'],
+    'defeito': ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga',
+                'estragado', 'danificado', 'com problema'],
+    'chegada': ['veio', 'chegou'],
+    'dano_chegada': ['quebrado', 'defeito', 'estragado', 'com problema', 'usado', 'sujo'],
+    'aparelho': ['produto', 'celular', 'notebook', 'tv', 'fone', 'mouse', 'teclado'],
+    'falha_aparelho': ['não funciona', 'não liga', 'quebrado', 'defeito'],
+    'recusa_devolucao': ['não quero devolver', 'sem devolver', 'não devolver'],
+    'pedido_envio': ['mandar', 'enviar', 'novo', 'outro'],
+    'reenvio': ['pode mandar', 'pode enviar', 'reenvia', 'reenviar', 'segunda entrega', 'segunda via'],
+    'substituicao': ['substituir', 'substituto', 'trocar por outro', 'produto de reposição'],
+    'acao': ['quero', 'preciso', 'como', 'onde', 'quando', 'posso']
+}
+
+# Regras sequenciais: a primeira frase precisa aparecer antes da segunda na mesma linha
+SEQUENCE_RULES = {
+    'defeito_chegada': ('chegada', 'dano_chegada'),
+    'defeito_aparelho': ('aparelho', 'falha_aparelho'),
+    'reenvio_sem_devolucao': ('recusa_devolucao', 'pedido_envio')
+}
+
+
+class CompiledEntityExtractor:
+    """
+    Extrator de entidades construído uma vez por processador
+    Uma varredura do texto produz todas as ocorrências de frases com posição e linha
+    """
+
+    def __init__(self, phrase_rules: Dict[str, List[str]] = None):
+        self.phrase_rules = phrase_rules or PHRASE_RULES
+
+        # Tabela: primeira palavra -> [(trechos da frase, regras)]
+        # Os trechos alternam palavras e separadores, como na saída de SCAN_PATTERN
+        self.phrase_table: Dict[str, List[Tuple[List[str], Tuple[str, ...]]]] = {}
+        phrase_owners: Dict[str, List[str]] = {}
+        for rule, phrases in self.phrase_rules.items():
+            for phrase in phrases:
+                phrase_owners.setdefault(phrase, []).append(rule)
+
+        for phrase, rules in phrase_owners.items():
+            phrase_chunks = SCAN_PATTERN.findall(phrase)
+            self.phrase_table.setdefault(phrase_chunks[0], []).append((phrase_chunks, tuple(rules)))
+
+    def scan(self, text: str) -> Tuple[Dict[str, List[Tuple[int, int, int]]], List[str], List[str]]:
+        """
+        Varre o texto uma única vez
+        Retorna ocorrências por regra (posição inicial, posição final, linha),
+        os trechos encontrados e os números
+        """
+        chunks = SCAN_PATTERN.findall(text)
+        phrase_table = self.phrase_table
+        occurrences: Dict[str, List[Tuple[int, int, int]]] = {}
+        numbers: List[str] = []
+
+        line = 0
+        for i, chunk in enumerate(chunks):
+            candidates = phrase_table.get(chunk)
+            if candidates is None:
+                if chunk.isdecimal():
+                    numbers.append(chunk)
+                elif '\n' in chunk:
+                    line += chunk.count('\n')
+                continue
+
+            for phrase_chunks, rules in candidates:
+                # Frases com várias palavras: separadores devem ser exatamente um espaço
+                last = i + len(phrase_chunks) - 1
+                if last > i and chunks[i:last + 1] != phrase_chunks:
+                    continue
+                for rule in rules:
+                    occurrences.setdefault(rule, []).append((i, last, line))
+
+        return occurrences, chunks, numbers
+
+    @staticmethod
+    def matched_words(occurrences: Dict[str, List[Tuple[int, int, int]]], rule: str,
+                      words: List[str]) -> List[str]:
+        """Palavras de uma regra na ordem em que aparecem no texto"""
+        return [words[start] for start, _, _ in occurrences.get(rule, ())]
+
+    @staticmethod
+    def has_sequence(occurrences: Dict[str, List[Tuple[int, int, int]]],
+                     first_rule: str, second_rule: str) -> bool:
+        """Verifica se alguma ocorrência da primeira regra precede uma da segunda na mesma linha"""
+        firsts = occurrences.get(first_rule)
+        seconds = occurrences.get(second_rule)
+        if not firsts or not seconds:
+            return False
+
+        earliest_end: Dict[int, int] = {}
+        for _, end, line in firsts:
+            if line not in earliest_end or end < earliest_end[line]:
+                earliest_end[line] = end
+
+        return any(line in earliest_end and start > earliest_end[line]
+                   for start, _, line in seconds)
+
+    def extract(self, text: str) -> Dict[str, List[str]]:
+        """Extrai entidades e intenções com o mesmo formato de extract_entities"""
+        occurrences, words, numbers = self.scan(text)
+
+        entities = {
+            'enderecos': [],
+            'numeros': numbers,
+            'locais': self.matched_words(occurrences, 'local', words),
+            'servicos': self.matched_words(occurrences, 'servico', words),
+            'problemas': [],
+            'intencoes': [],
+            'acoes': []
+        }
+
+        if 'endereco' in occurrences:
+            entities['enderecos'].append('endereco_mencionado')
+
+        intencoes = entities['intencoes']
+
+        # Detecção de intenções (mesma ordem e prioridade das regras originais)
+        if 'cancelamento' in occurrences:
+            intencoes.append('cancelamento')
+
+        if 'alteracao' in occurrences and 'bloqueio_alteracao' not in occurrences:
+            intencoes.append('alteracao')
+
+        if 'devolucao' in occurrences:
+            intencoes.append('devolucao')
+
+        if 'defeito' in occurrences:
+            intencoes.append('produto_defeituoso')
+
+        if self.has_sequence(occurrences, *SEQUENCE_RULES['defeito_chegada']):
+            intencoes.append('produto_defeituoso')
+
+        if self.has_sequence(occurrences, *SEQUENCE_RULES['defeito_aparelho']):
+            intencoes.append('produto_defeituoso')
+
+        if self.has_sequence(occurrences, *SEQUENCE_RULES['reenvio_sem_devolucao']):
+            intencoes.append('reenvio_produto')
+
+        if 'reenvio' in occurrences:
+            intencoes.append('reenvio_produto')
+
+        if 'substituicao' in occurrences:
+            intencoes.append('reenvio_produto')
+
+        entities['acoes'] = self.matched_words(occurrences, 'acao', words)
+
+        return entities
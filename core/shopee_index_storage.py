@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+SHOPEE INDEX STORAGE - Representação Plana do Índice
+Converte o índice treinado em um conjunto de arrays NumPy contíguos
+(números, strings e tabelas de vocabulário) que podem ser colocados em
+memória compartilhada ou em arquivo e reabertos sem cópia
+"""
+
+import hashlib
+import numpy as np
+from collections.abc import Sequence
+from typing import List, Dict, Tuple, Iterable, Optional, Any
+
+# Alinhamento (em bytes) de cada array dentro do buffer
+ARRAY_ALIGNMENT = 64
+
+
+def encode_strings(values: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Codifica strings como um blob UTF-8 e um array de offsets (n + 1)"""
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        offsets[1:] = np.cumsum([len(item) for item in encoded])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8) if encoded else np.zeros(0, dtype=np.uint8)
+    return blob, offsets
+
+
+def decode_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Decodifica todas as strings de um blob"""
+    data = blob.tobytes()
+    bounds = offsets.tolist()
+    return [data[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+
+
+class StringTable(Sequence):
+    """Sequência de strings decodificadas sob demanda a partir de blob + offsets"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        start, end = int(self.offsets[index]), int(self.offsets[index + 1])
+        return self.blob[start:end].tobytes().decode('utf-8')
+
+
+def plan_layout(arrays: Dict[str, np.ndarray]) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    """Calcula offsets alinhados de cada array dentro de um único buffer"""
+    layout = {}
+    offset = 0
+    for name, array in arrays.items():
+        offset = (offset + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+        layout[name] = {
+            'offset': offset,
+            'shape': list(array.shape),
+            'dtype': array.dtype.str
+        }
+        offset += array.nbytes
+    return layout, max(offset, 1)
+
+
+def write_arrays(buffer, arrays: Dict[str, np.ndarray], layout: Dict[str, Dict[str, Any]]):
+    """Copia os arrays para o buffer nas posições do layout"""
+    for name, array in arrays.items():
+        target = view_array(buffer, layout[name], readonly=False)
+        target[...] = array
+
+
+def view_array(buffer, spec: Dict[str, Any], readonly: bool = True) -> np.ndarray:
+    """Cria uma visão NumPy (sem cópia) de um array dentro do buffer"""
+    dtype = np.dtype(spec['dtype'])
+    shape = tuple(spec['shape'])
+    count = int(np.prod(shape)) if shape else 1
+    array = np.frombuffer(buffer, dtype=dtype, count=count, offset=spec['offset']).reshape(shape)
+    if readonly:
+        array.flags.writeable = False
+    return array
+
+
+def view_arrays(buffer, layout: Dict[str, Dict[str, Any]], readonly: bool = True) -> Dict[str, np.ndarray]:
+    """Visões de todos os arrays do layout"""
+    return {name: view_array(buffer, spec, readonly) for name, spec in layout.items()}
+
+
+class LazyPattern(dict):
+    """Padrão materializado sob demanda; 'processed' só é calculado se acessado"""
+
+    def __init__(self, processor, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.processor = processor
+
+    def __missing__(self, key: str) -> Any:
+        if key == 'processed':
+            self['processed'] = self.processor.advanced_preprocess(self['question'])
+            return self['processed']
+        raise KeyError(key)
+
+
+class PatternTable(Sequence):
+    """
+    Lista de padrões apoiada nos arrays planos do índice
+    Os dicionários são criados apenas quando um padrão é acessado
+    """
+
+    def __init__(self, processor, questions: StringTable, responses: StringTable,
+                 categories: List[str], category_ids: np.ndarray, confidences: np.ndarray,
+                 embeddings: np.ndarray, embedding_scales: Optional[np.ndarray] = None):
+        self.processor = processor
+        self.questions = questions
+        self.responses = responses
+        self.categories = categories
+        self.category_ids = category_ids
+        self.confidences = confidences
+        self.embeddings = embeddings
+        self.embedding_scales = embedding_scales
+
+        # Padrões adicionados após a carga (aprendizado dinâmico)
+        self.extra: List[Dict[str, Any]] = []
+
+    @property
+    def frozen_size(self) -> int:
+        return len(self.questions)
+
+    def __len__(self) -> int:
+        return self.frozen_size + len(self.extra)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        if index >= self.frozen_size:
+            return self.extra[index - self.frozen_size]
+
+        question = self.questions[index]
+        return LazyPattern(
+            self.processor,
+            question=question,
+            response=self.responses[index],
+            confidence=float(self.confidences[index]),
+            category=self.categories[int(self.category_ids[index])],
+            embedding=self.embedding(index),
+            hash=hashlib.md5(question.encode()).hexdigest()
+        )
+
+    def embedding(self, index: int) -> np.ndarray:
+        """Embedding do padrão congelado (linhas int8 decodificadas com a escala)"""
+        row = self.embeddings[index]
+        if self.embedding_scales is None or row.dtype != np.int8:
+            return row
+        return row.astype(np.float64) * float(self.embedding_scales[index])
+
+    def append(self, pattern: Dict[str, Any]):
+        """Adiciona um padrão novo (fora dos arrays congelados)"""
+        self.extra.append(pattern)
+
+    def group_by_category(self) -> Dict[str, "PatternGroup"]:
+        """Agrupa os padrões por categoria sem materializá-los"""
+        groups: Dict[str, PatternGroup] = {}
+        for category_id, category in enumerate(self.categories):
+            indices = np.flatnonzero(self.category_ids[:self.frozen_size] == category_id)
+            groups[category] = PatternGroup(self, indices.tolist())
+        for pattern in self.extra:
+            groups.setdefault(pattern['category'], PatternGroup(self, [])).append(pattern)
+        return groups
+
+
+class PatternGroup(Sequence):
+    """Grupo de padrões de uma categoria (índices na PatternTable ou dicionários novos)"""
+
+    def __init__(self, table: PatternTable, items: List[Any]):
+        self.table = table
+        self.items = items
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        item = self.items[index]
+        return self.table[item] if isinstance(item, int) else item
+
+    def append(self, pattern: Dict[str, Any]):
+        self.items.append(pattern)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+SHOPEE METRICS - Métricas em Formato Prometheus
+Contadores e histogramas em memória com registro de custo mínimo
+(um bisect e uma soma sob lock) e medidores calculados só na exportação;
+tudo é exportado no formato texto de exposição do Prometheus
+"""
+
+import os
+import math
+import bisect
+import threading
+from typing import List, Dict, Tuple, Optional, Callable, Sequence
+
+# Content-Type do formato texto de exposição
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Limites (segundos) dos histogramas de latência
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def format_value(value: float) -> str:
+    """Valor numérico no formato do Prometheus"""
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def escape_label(value: str) -> str:
+    """Escapa barra invertida, aspas e quebra de linha em valores de rótulo"""
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """{nome="valor",...} ou vazio"""
+    if not names:
+        return ''
+    pairs = ','.join(f'{name}="{escape_label(str(value))}"' for name, value in zip(names, values))
+    return '{' + pairs + '}'
+
+
+class Metric:
+    """Base: nome, descrição, rótulos e filhos por combinação de rótulos"""
+
+    type_name = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.children: Dict[Tuple[str, ...], object] = {}
+        self.lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Série com os valores de rótulo dados (criada na primeira vez)"""
+        child = self.children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: esperados rótulos {self.labelnames}")
+            with self.lock:
+                child = self.children.setdefault(values, self.new_child())
+        return child
+
+    def new_child(self):
+        raise NotImplementedError
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class CounterChild:
+    """Série de um contador"""
+
+    def __init__(self):
+        self.value = 0.0
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+
+class Counter(Metric):
+    """Contador monotônico"""
+
+    type_name = 'counter'
+
+    def new_child(self) -> CounterChild:
+        return CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        """Incrementa a série sem rótulos"""
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self.children.items()):
+            lines.append(f"{self.name}{format_labels(self.labelnames, values)} {format_value(child.value)}")
+        return lines
+
+
+class HistogramChild:
+    """Série de um histograma: contagem por faixa (não cumulativa), soma e total"""
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, value: float):
+        position = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[position] += 1
+            self.sum += value
+
+    def snapshot(self) -> Tuple[List[int], float]:
+        with self.lock:
+            return list(self.counts), self.sum
+
+
+class Histogram(Metric):
+    """Histograma com limites fixos (le) no estilo Prometheus"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def new_child(self) -> HistogramChild:
+        return HistogramChild(self.bounds)
+
+    def observe(self, value: float):
+        """Registra um valor na série sem rótulos"""
+        self.labels().observe(value)
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for values, child in list(self.children.items()):
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), counts):
+                cumulative += count
+                labels = format_labels(self.labelnames + ('le',), values + (format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.labelnames, values)
+            lines.append(f"{self.name}_sum{labels} {format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class FunctionMetric(Metric):
+    """Gauge ou contador cujo valor é lido de uma função na hora da exportação"""
+
+    def __init__(self, name: str, documentation: str, function: Callable[[], float],
+                 type_name: str = 'gauge'):
+        super().__init__(name, documentation)
+        self.function = function
+        self.type_name = type_name
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name} {format_value(float(self.function()))}"]
+
+
+class MetricsRegistry:
+    """Conjunto de métricas exportadas juntas (nomes únicos)"""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        """Registra a métrica; se o nome já existe, retorna a registrada"""
+        with self.lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_function(self, name: str, documentation: str, function: Callable[[], float]) -> FunctionMetric:
+        return self.register(FunctionMetric(name, documentation, function, 'gauge'))
+
+    def counter_function(self, name: str, documentation: str, function: Callable[[], float]) -> FunctionMetric:
+        return self.register(FunctionMetric(name, documentation, function, 'counter'))
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self.metrics.get(name)
+
+    def render(self) -> str:
+        """Todas as métricas no formato texto de exposição"""
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str):
+        """Grava o texto em arquivo (troca atômica; compatível com textfile collector)"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.render())
+        os.replace(temp_path, path)
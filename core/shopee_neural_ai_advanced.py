@@ -7,41 +7,77 @@ Implementa técnicas de Deep Learning, NLP avançado e IA conversacional
 
 import numpy as np
 import json
-import pickle
 import re
 import math
 import random
 import logging
 import hashlib
 from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Tuple, Optional, Any, Iterable
 from collections import defaultdict, deque
 import threading
+import gc
 import time
 import os
 
+from shopee_bound_search import branch_and_bound
+from shopee_category_terms import (CONTEXT_WINDOW, CategoryTermTable, query_features,
+                                   match_phrases, select_intent, keyword_relevance,
+                                   intent_alignment, context_match)
+from shopee_cluster_index import ClusterIndex
+from shopee_embedding_cache import EmbeddingCache
+from shopee_entity_extractor import CompiledEntityExtractor
+from shopee_index_storage import encode_strings, decode_strings, StringTable, PatternTable, LazyPattern
+from shopee_metrics import MetricsRegistry
+from shopee_ngram_encoder import HashedNgramEncoder
+from shopee_parallel_build import ParallelEmbeddingBuilder
+from shopee_pattern_index import PatternIndex
+from shopee_quantization import STORAGE_DTYPES
+from shopee_response_cache import ResponseCache
+from shopee_sessions import ConversationSession, SessionManager
+from shopee_snapshot import MODEL_VERSION, SnapshotError, write_snapshot, read_snapshot
+from shopee_training_stream import DEFAULT_CHUNK_SIZE, LoadStats, chunked, iter_training_records
+from shopee_vocabulary import WordVectorStore, smart_embeddings
+
 class AdvancedNeuralProcessor:
     """
     Processador Neural Avançado para NLP
     Implementa embeddings sophisticados e análise semântica profunda
     """
     
-    def __init__(self, embedding_dim: int = 150, context_window: int = 10):
+    def __init__(self, embedding_dim: int = 150, context_window: int = 10, weight_seed: int = 0):
         self.embedding_dim = embedding_dim
         self.context_window = context_window
-        self.word_vectors = {}
-        self.phrase_vectors = {}
+        self.weight_seed = weight_seed
+        self.word_vectors = WordVectorStore(embedding_dim)
         self.semantic_clusters = defaultdict(list)
-        self.context_memory = deque(maxlen=context_window)
+        
+        # N-gramas por hashing: bigramas e trigramas em posições fixas
+        bigram_dim = embedding_dim // 6
+        self.bigram_encoder = HashedNgramEncoder(bigram_dim)
+        self.trigram_encoder = HashedNgramEncoder(embedding_dim // 3 - bigram_dim)
+        
+        # Extrator de entidades compilado uma única vez
+        self.entity_extractor = CompiledEntityExtractor()
         
         # Inicializar camadas neurais
-        self.attention_weights = np.random.randn(embedding_dim, embedding_dim) * 0.01
-        self.context_weights = np.random.randn(embedding_dim, embedding_dim) * 0.01
-        self.semantic_weights = np.random.randn(embedding_dim, embedding_dim) * 0.01
+        self.initialize_weights()
         
         # Configurar logging avançado
         self.setup_logging()
         
+    def initialize_weights(self):
+        """
+        Inicializa as camadas neurais a partir de weight_seed
+        RandomState tem sequência garantida entre versões do NumPy e não
+        altera o estado global de np.random
+        """
+        rng = np.random.RandomState(self.weight_seed)
+        shape = (self.embedding_dim, self.embedding_dim)
+        self.attention_weights = rng.randn(*shape) * 0.01
+        self.context_weights = rng.randn(*shape) * 0.01
+        self.semantic_weights = rng.randn(*shape) * 0.01
+        
     def setup_logging(self):
         """Configura sistema de logging avançado"""
         logging.basicConfig(
@@ -92,70 +128,7 @@ class AdvancedNeuralProcessor:
     
     def extract_entities(self, text: str) -> Dict[str, List[str]]:
         """Extrai entidades nomeadas do texto com detecção de intenções"""
-        entities = {
-            'enderecos': [],
-            'numeros': [],
-            'locais': [],
-            'servicos': [],
-            'problemas': [],
-            'intencoes': [],
-            'acoes': []
-        }
-        
-        # Padrões para endereços
-        if re.search(r'\b(endereço|endereco|casa|apartamento|numero|cep|rua|avenida)\b', text):
-            entities['enderecos'].append('endereco_mencionado')
-        
-        # Padrões para números
-        numeros = re.findall(r'\b\d+\b', text)
-        entities['numeros'].extend(numeros)
-        
-        # Padrões para locais
-        locais_patterns = r'\b(casa|trabalho|faculdade|hotel|empresa|estado|cidade)\b'
-        locais = re.findall(locais_patterns, text)
-        entities['locais'].extend(locais)
-        
-        # Padrões para serviços Shopee
-        servicos_patterns = r'\b(pedido|entrega|pagamento|pix|reembolso|devolucao|cupom)\b'
-        servicos = re.findall(servicos_patterns, text)
-        entities['servicos'].extend(servicos)
-        
-        # Detecção de intenções específicas
-        if re.search(r'\b(cancelar|cancela|não quero|desistir|parar)\b', text):
-            entities['intencoes'].append('cancelamento')
-        
-        if re.search(r'\b(alterar|mudar|corrigir|atualizar|erro)\b', text) and not re.search(r'\b(defeito|quebrado|não funciona)\b', text):
-            entities['intencoes'].append('alteracao')
-        
-        if re.search(r'\b(devolver|trocar|reembolso)\b', text):
-            entities['intencoes'].append('devolucao')
-        
-        # Detecção de produtos defeituosos (alta prioridade)
-        if re.search(r'\b(defeito|defeituoso|quebrado|não funciona|não liga|estragado|danificado|com problema)\b', text):
-            entities['intencoes'].append('produto_defeituoso')
-        
-        if re.search(r'\b(veio|chegou)\b.*\b(quebrado|defeito|estragado|com problema|usado|sujo)\b', text):
-            entities['intencoes'].append('produto_defeituoso')
-        
-        if re.search(r'\b(produto|celular|notebook|tv|fone|mouse|teclado)\b.*\b(não funciona|não liga|quebrado|defeito)\b', text):
-            entities['intencoes'].append('produto_defeituoso')
-        
-        # Detecção de reenvio/segunda entrega (situação específica)
-        if re.search(r'\b(não quero devolver|sem devolver|não devolver)\b.*\b(mandar|enviar|novo|outro)\b', text):
-            entities['intencoes'].append('reenvio_produto')
-        
-        if re.search(r'\b(pode mandar|pode enviar|reenvia|reenviar|segunda entrega|segunda via)\b', text):
-            entities['intencoes'].append('reenvio_produto')
-        
-        if re.search(r'\b(substituir|substituto|trocar por outro|produto de reposição)\b', text):
-            entities['intencoes'].append('reenvio_produto')
-        
-        # Detecção de ações
-        acoes_patterns = r'\b(quero|preciso|como|onde|quando|posso)\b'
-        acoes = re.findall(acoes_patterns, text)
-        entities['acoes'].extend(acoes)
-        
-        return entities
+        return self.entity_extractor.extract(text)
     
     def analyze_sentiment(self, tokens: List[str]) -> Dict[str, float]:
         """Análise de sentimento avançada"""
@@ -193,21 +166,49 @@ class AdvancedNeuralProcessor:
         complexity = (unique_words / total_words) * (avg_word_length / 10)
         return min(complexity, 1.0)
     
-    def create_advanced_embedding(self, processed_text: Dict[str, Any]) -> np.ndarray:
+    def create_advanced_embedding(self, processed_text: Dict[str, Any],
+                                  context_vector: Optional[np.ndarray] = None) -> np.ndarray:
         """
         Cria embeddings avançados usando múltiplas técnicas
+        context_vector é o vetor de contexto da sessão (None = sem contexto)
         """
-        # Embedding base dos tokens
-        token_embeddings = []
-        for token in processed_text['tokens']:
-            if token not in self.word_vectors:
-                # Criar embedding baseado em hash + características
-                self.word_vectors[token] = self.generate_smart_embedding(token)
-            token_embeddings.append(self.word_vectors[token])
-        
-        if not token_embeddings:
+        features = self.compose_embedding_features(processed_text)
+        
+        if features is None:
             return np.zeros(self.embedding_dim)
         
+        # Aplicar transformações neurais
+        return self.apply_neural_transformations(features, context_vector)
+    
+    def create_advanced_embeddings(self, processed_texts: List[Dict[str, Any]],
+                                   context_vector: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Cria embeddings de várias mensagens de uma vez
+        As transformações neurais são aplicadas como um único produto matriz-matriz
+        """
+        embeddings = np.zeros((len(processed_texts), self.embedding_dim))
+        
+        features = [self.compose_embedding_features(processed) for processed in processed_texts]
+        valid_rows = [i for i, row in enumerate(features) if row is not None]
+        
+        if valid_rows:
+            embeddings[valid_rows] = self.apply_neural_transformations_batch(
+                np.vstack([features[i] for i in valid_rows]), context_vector)
+        
+        return embeddings
+    
+    def compose_embedding_features(self, processed_text: Dict[str, Any]) -> Optional[np.ndarray]:
+        """
+        Combina as características do texto antes das transformações neurais
+        Retorna None quando o texto não tem tokens
+        """
+        tokens = processed_text['tokens']
+        if not tokens:
+            return None
+        
+        # Embedding base dos tokens (palavras desconhecidas calculadas em lote)
+        token_embeddings = self.word_vectors.vectors(tokens)
+        
         # Embedding médio ponderado
         base_embedding = np.mean(token_embeddings, axis=0)
         
@@ -226,70 +227,23 @@ class AdvancedNeuralProcessor:
         dim3 = self.embedding_dim//6
         dim4 = self.embedding_dim - dim1 - dim2 - dim3  # Restante para sentiment
         
-        final_embedding = np.concatenate([
+        return np.concatenate([
             base_embedding[:dim1],
             ngram_features[:dim2],
             semantic_features[:dim3],
             sentiment_features[:dim4]
         ])
-        
-        # Aplicar transformações neurais
-        final_embedding = self.apply_neural_transformations(final_embedding)
-        
-        return final_embedding
     
     def generate_smart_embedding(self, word: str) -> np.ndarray:
-        """Gera embedding inteligente para uma palavra"""
-        # Hash-based initialization
-        hash_obj = hashlib.md5(word.encode())
-        hash_bytes = hash_obj.digest()
-        
-        # Converter para números
-        hash_numbers = [b / 255.0 for b in hash_bytes]
-        
-        # Expandir para dimensão desejada
-        embedding = np.array(hash_numbers * (self.embedding_dim // len(hash_numbers) + 1))
-        embedding = embedding[:self.embedding_dim]
-        
-        # Adicionar características linguísticas
-        linguistic_features = np.array([
-            len(word) / 20.0,  # Comprimento normalizado
-            word.count('a') / len(word),  # Densidade de vogais
-            word.count('e') / len(word),
-            word.count('i') / len(word),
-            word.count('o') / len(word),
-            word.count('u') / len(word),
-            1.0 if word.endswith('ão') else 0.0,  # Padrões morfológicos
-            1.0 if word.startswith('des') else 0.0,
-            1.0 if 'shop' in word else 0.0,  # Relevância para Shopee
-            1.0 if any(c.isdigit() for c in word) else 0.0  # Contém números
-        ])
-        
-        # Mesclar características
-        embedding[:len(linguistic_features)] += linguistic_features
-        
-        # Normalizar
-        embedding = embedding / (np.linalg.norm(embedding) + 1e-8)
-        
-        return embedding
+        """Gera embedding inteligente para uma palavra (hash + características linguísticas)"""
+        return smart_embeddings([word], self.embedding_dim)[0]
     
     def process_ngrams(self, processed_text: Dict[str, Any]) -> np.ndarray:
-        """Processa n-gramas para features avançadas"""
-        features = np.zeros(self.embedding_dim // 3)
-        
-        # Processar bigramas
-        for i, bigram in enumerate(processed_text['bigrams'][:10]):
-            if bigram not in self.phrase_vectors:
-                self.phrase_vectors[bigram] = np.random.randn(self.embedding_dim // 6)
-            features[:self.embedding_dim//6] += self.phrase_vectors[bigram]
-        
-        # Processar trigramas
-        for i, trigram in enumerate(processed_text['trigrams'][:5]):
-            if trigram not in self.phrase_vectors:
-                self.phrase_vectors[trigram] = np.random.randn(self.embedding_dim // 6)
-            features[self.embedding_dim//6:] += self.phrase_vectors[trigram]
-        
-        return features
+        """Processa n-gramas para features avançadas (hashing determinístico)"""
+        return np.concatenate([
+            self.bigram_encoder.encode(processed_text['bigrams'][:10]),
+            self.trigram_encoder.encode(processed_text['trigrams'][:5])
+        ])
     
     def extract_semantic_features(self, processed_text: Dict[str, Any]) -> np.ndarray:
         """Extrai características semânticas avançadas"""
@@ -309,10 +263,7 @@ class AdvancedNeuralProcessor:
         if target_size > 5:
             features[5] = processed_text['length'] / 20.0
         
-        # Adicionar características extras se necessário
-        for i in range(6, target_size):
-            features[i] = random.random() * 0.1  # Ruído baixo para dimensões extras
-        
+        # Dimensões extras ficam zeradas (sem ruído: embeddings reprodutíveis)
         return features
     
     def encode_sentiment(self, sentiment: Dict[str, float]) -> np.ndarray:
@@ -334,7 +285,8 @@ class AdvancedNeuralProcessor:
         
         return base_sentiment[:target_size]
     
-    def apply_neural_transformations(self, embedding: np.ndarray) -> np.ndarray:
+    def apply_neural_transformations(self, embedding: np.ndarray,
+                                     context_vector: Optional[np.ndarray] = None) -> np.ndarray:
         """Aplica transformações neurais avançadas"""
         # Garantir dimensionalidade correta
         if embedding.shape[0] != self.embedding_dim:
@@ -346,29 +298,23 @@ class AdvancedNeuralProcessor:
                 padding = np.zeros(self.embedding_dim - embedding.shape[0])
                 embedding = np.concatenate([embedding, padding])
         
+        return self.apply_neural_transformations_batch(embedding.reshape(1, -1), context_vector)[0]
+    
+    def apply_neural_transformations_batch(self, embeddings: np.ndarray,
+                                           context_vector: Optional[np.ndarray] = None) -> np.ndarray:
+        """Aplica as transformações neurais a uma matriz de embeddings (uma linha por mensagem)"""
         # Atenção
-        attention_output = np.tanh(np.dot(embedding, self.attention_weights))
-        
-        # Contexto
-        if self.context_memory:
-            context_vector = np.mean(list(self.context_memory), axis=0)
-            # Garantir que context_vector tem a dimensão correta
-            if context_vector.shape[0] != self.embedding_dim:
-                if context_vector.shape[0] > self.embedding_dim:
-                    context_vector = context_vector[:self.embedding_dim]
-                else:
-                    padding = np.zeros(self.embedding_dim - context_vector.shape[0])
-                    context_vector = np.concatenate([context_vector, padding])
-            
+        attention_output = np.tanh(np.dot(embeddings, self.attention_weights))
+        
+        # Contexto (o mesmo vetor de contexto para todas as linhas)
+        if context_vector is not None:
             context_output = np.tanh(np.dot(context_vector, self.context_weights))
-            embedding = 0.7 * attention_output + 0.3 * context_output
+            embeddings = 0.7 * attention_output + 0.3 * context_output
         else:
-            embedding = attention_output
+            embeddings = attention_output
         
         # Normalização final
-        embedding = embedding / (np.linalg.norm(embedding) + 1e-8)
-        
-        return embedding
+        return embeddings / (np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8)
 
 class ShopeeNeuralAI:
     """
@@ -379,54 +325,163 @@ class ShopeeNeuralAI:
     def __init__(self):
         self.processor = AdvancedNeuralProcessor()
         self.training_patterns = []
-        self.conversation_context = deque(maxlen=20)
         self.user_profiles = {}
         self.performance_metrics = defaultdict(float)
+        self.metrics_lock = threading.Lock()
         self.learning_rate = 0.01
         self.confidence_threshold = 0.3
         
         # Sistemas avançados
         self.semantic_clusters = defaultdict(list)
-        self.response_cache = {}
-        self.dynamic_learning = True
-        self.session_stats = defaultdict(int)
+        self.pattern_index = PatternIndex(self.processor.embedding_dim)
+        # Protege training_patterns + índice juntos (aprendizado, reconstrução, snapshot da reotimização)
+        self.index_lock = threading.RLock()
+        self.cluster_distances = np.zeros(0)
+        self.cluster_lock = threading.Lock()
+        self.cluster_optimization_pending = False
+        
+        # Busca podada por clusters: 'exhaustive' pontua todos os padrões,
+        # 'clusters' só os cluster_probe clusters mais promissores,
+        # 'bound' poda por limite superior (mesmo resultado da exaustiva),
+        # 'cascade' pontua por completo só os cascade_k padrões de maior cosseno
+        self.search_mode = 'exhaustive'
+        self.cluster_probe = 8
+        self.cascade_k = 32
+        self.cluster_index: Optional[ClusterIndex] = None
+        
+        # Com embeddings em int8, os quantized_rerank melhores têm o cosseno
+        # recalculado com o embedding em float (0 = sem rerank)
+        self.quantized_rerank = 8
+        
+        # Termos por categoria (palavras-chave, intenção) indexados pelos ids do índice
+        self.category_terms = CategoryTermTable(self.pattern_index.categories)
+        
+        # Resultados recentes por (mensagem normalizada, categorias recentes da sessão)
+        self.response_cache = ResponseCache()
+        self.training_load_stats: Optional[LoadStats] = None
+        self.dynamic_learning_enabled = True
+        
+        # Sessões de conversa (o índice treinado é compartilhado entre elas)
+        self.sessions = SessionManager(self.processor.embedding_dim, self.processor.context_window)
+        self.default_session = ConversationSession('default', self.processor.embedding_dim,
+                                                   self.processor.context_window)
         
         # Configurar persistência
-        self.model_file = 'e:/MENSAGENS/shopee_neural_model.pkl'
+        self.model_file = 'e:/MENSAGENS/shopee_neural_model.snap'
+        self.legacy_model_file = 'e:/MENSAGENS/shopee_neural_model.pkl'
+        self.embedding_cache_file = 'e:/MENSAGENS/shopee_embedding_cache.bin'
         self.metrics_file = 'e:/MENSAGENS/shopee_metrics.json'
         
+        # Snapshot cujo arquivo está mapeado pelos arrays do índice (após load_model)
+        self.mapped_snapshot: Optional[str] = None
+        
+        # Métricas exportáveis (Prometheus)
+        self.metrics = MetricsRegistry()
+        self.setup_metrics()
+        
         # Inicializar logger
         self.logger = self.processor.logger
+    
+    def setup_metrics(self):
+        """Registra histogramas, contadores e medidores do sistema"""
+        metrics = self.metrics
+        stage_latency = metrics.histogram('shopee_stage_duration_seconds',
+                                          'Duração de cada etapa da busca', ('stage',))
+        self.stage_timers = {stage: stage_latency.labels(stage)
+                             for stage in ('preprocess', 'embedding', 'scoring', 'selection')}
+        self.search_latency = metrics.histogram('shopee_search_duration_seconds',
+                                                'Duração da busca por categoria respondida', ('category',))
+        self.fallback_counter = metrics.counter('shopee_fallback_responses_total',
+                                                'Mensagens respondidas com fallback')
+        self.learned_counter = metrics.counter('shopee_learned_patterns_total',
+                                               'Padrões aprendidos dinamicamente')
+        self.bound_scored_counter = metrics.counter('shopee_bound_patterns_scored_total',
+                                                    'Padrões com termos semânticos calculados na busca por limite')
+        self.bound_pruned_counter = metrics.counter('shopee_bound_patterns_pruned_total',
+                                                    'Padrões descartados pelo limite superior')
+        
+        metrics.counter_function('shopee_response_cache_hits_total', 'Acertos do cache de respostas',
+                                 lambda: self.response_cache.hits)
+        metrics.counter_function('shopee_response_cache_misses_total', 'Faltas do cache de respostas',
+                                 lambda: self.response_cache.misses)
+        metrics.gauge_function('shopee_response_cache_entries', 'Respostas em cache',
+                               lambda: len(self.response_cache))
+        metrics.gauge_function('shopee_patterns', 'Padrões no índice', lambda: len(self.training_patterns))
+        metrics.gauge_function('shopee_vocabulary_words', 'Palavras do vocabulário de treinamento',
+                               lambda: len(self.processor.word_vectors))
+        metrics.gauge_function('shopee_vocabulary_cached_words', 'Palavras desconhecidas em cache (LRU)',
+                               lambda: len(self.processor.word_vectors.cache))
+        metrics.gauge_function('shopee_ngram_buckets', 'Posições do espaço de n-gramas por hashing',
+                               lambda: (self.processor.bigram_encoder.num_buckets
+                                        + self.processor.trigram_encoder.num_buckets))
+        metrics.gauge_function('shopee_sessions', 'Sessões de conversa ativas', lambda: len(self.sessions))
+    
+    @property
+    def conversation_context(self) -> deque:
+        """Histórico da sessão padrão (interface de terminal)"""
+        return self.default_session.conversation_context
+    
+    @property
+    def session_stats(self) -> defaultdict:
+        """Estatísticas da sessão padrão (interface de terminal)"""
+        return self.default_session.session_stats
+    
+    def get_session(self, session_id: Optional[str] = None) -> ConversationSession:
+        """Retorna a sessão do cliente (ou a sessão padrão se não houver id)"""
+        if session_id is None:
+            return self.default_session
+        return self.sessions.get(session_id)
         
     def load_advanced_training_data(self, file_path: str) -> bool:
-        """Carrega dados de treinamento com processamento avançado"""
+        """Carrega dados de treinamento com processamento avançado (JSON ou JSONL)"""
+        return self.load_training_stream([file_path])
+    
+    def load_training_stream(self, sources: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE,
+                             workers: Optional[int] = 1) -> bool:
+        """
+        Carrega padrões de um ou mais arquivos (globs aceitos; JSONL/JSON, gzip/lzma)
+        em lotes de chunk_size; registros inválidos são ignorados e contados
+        workers != 1 distribui os lotes em um pool de processos (None/0 = todos os núcleos)
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_data = json.load(f)
+            self.logger.info(f"Carregando padrões de treinamento de {len(sources)} fonte(s)...")
             
-            self.logger.info(f"Carregando {len(raw_data)} padrões de treinamento...")
+            # Cache de embeddings: só perguntas novas ou alteradas são processadas
+            cache = EmbeddingCache(self.embedding_cache_file) if self.embedding_cache_file else None
+            if cache is not None and cache.load(self.processor):
+                self.logger.info(f"♻️ Cache de embeddings: {len(cache)} perguntas, "
+                                 f"{cache.merged_words} palavras incorporadas ao vocabulário")
             
-            # Processar cada padrão
-            for item in raw_data:
-                processed_question = self.processor.advanced_preprocess(item['question'])
-                question_embedding = self.processor.create_advanced_embedding(processed_question)
-                
-                pattern = {
-                    'question': item['question'],
-                    'response': item['response'],
-                    'confidence': item.get('confidence', 0.8),
-                    'category': item.get('category', 'geral'),
-                    'embedding': question_embedding,
-                    'processed': processed_question,
-                    'hash': hashlib.md5(item['question'].encode()).hexdigest()
-                }
-                
-                self.training_patterns.append(pattern)
-                self.semantic_clusters[pattern['category']].append(pattern)
+            stats = LoadStats()
+            self.training_load_stats = stats
+            reused = 0
+            
+            chunks = chunked(iter_training_records(sources, stats), chunk_size)
+            if workers == 1:
+                for chunk in chunks:
+                    reused += self.process_training_chunk(chunk, cache)
+            else:
+                reused = self.process_training_chunks_parallel(chunks, cache, workers)
             
-            self.logger.info(f"✅ {len(self.training_patterns)} padrões processados")
+            if stats.skipped:
+                self.logger.warning(f"⚠️ {stats.skipped} registros inválidos ignorados")
+            if not stats.loaded:
+                self.logger.error("Nenhum padrão de treinamento válido encontrado")
+                return False
+            
+            self.logger.info(f"✅ {len(self.training_patterns)} padrões processados "
+                             f"({reused} do cache, {stats.loaded - reused} novos)")
             self.logger.info(f"📊 {len(self.semantic_clusters)} categorias semânticas criadas")
             
+            if cache is not None and not cache.is_current(self.processor, self.training_patterns):
+                try:
+                    cache.save(self.processor, self.training_patterns)
+                except OSError as e:
+                    self.logger.warning(f"⚠️ Não foi possível gravar o cache de embeddings: {e}")
+            
+            # Indexar padrões para pontuação vetorizada
+            self.rebuild_pattern_index()
+            
             # Otimizar clusters
             self.optimize_semantic_clusters()
             
@@ -436,155 +491,901 @@ class ShopeeNeuralAI:
             self.logger.error(f"Erro ao carregar dados: {e}")
             return False
     
+    def process_training_chunk(self, items: List[Dict[str, Any]],
+                               cache: Optional[EmbeddingCache] = None) -> int:
+        """
+        Preprocessa e indexa um lote de padrões (vocabulário do lote incorporado de uma vez)
+        Retorna quantos embeddings vieram do cache
+        """
+        entries = self.lookup_training_chunk(items, cache)
+        pending = [self.processor.advanced_preprocess(item['question'])
+                   for item, _, cached in entries if cached is None]
+        
+        self.processor.word_vectors.add_training_words(
+            token for processed in pending for token in processed['tokens'])
+        
+        computed = [(processed, self.processor.create_advanced_embedding(processed))
+                    for processed in pending]
+        return self.merge_training_chunk(entries, computed)
+    
+    def process_training_chunks_parallel(self, chunks: Iterable[List[Dict[str, Any]]],
+                                         cache: Optional[EmbeddingCache] = None,
+                                         workers: Optional[int] = None) -> int:
+        """
+        Versão paralela de process_training_chunk: preprocessamento e embeddings
+        das perguntas fora do cache rodam em um pool de processos; vocabulário e
+        padrões são juntados aqui na ordem dos lotes (resultado igual ao serial)
+        """
+        jobs = ((entries, [item['question'] for item, _, cached in entries if cached is None])
+                for entries in (self.lookup_training_chunk(chunk, cache) for chunk in chunks))
+        
+        reused = 0
+        with ParallelEmbeddingBuilder(self.processor, workers) as builder:
+            for entries, (processed, embeddings) in builder.imap(jobs):
+                self.processor.word_vectors.add_training_words(
+                    token for item in processed for token in item['tokens'])
+                reused += self.merge_training_chunk(entries, zip(processed, embeddings))
+        
+        return reused
+    
+    def lookup_training_chunk(self, items: List[Dict[str, Any]],
+                              cache: Optional[EmbeddingCache] = None) -> List[Tuple]:
+        """(item, hash da pergunta, (embedding, processed) do cache ou None) por padrão"""
+        entries = []
+        for item in items:
+            question_hash = hashlib.md5(item['question'].encode()).hexdigest()
+            cached = cache.get(question_hash) if cache is not None else None
+            entries.append((item, question_hash, cached))
+        return entries
+    
+    def merge_training_chunk(self, entries: List[Tuple],
+                             computed: Iterable[Tuple[Dict[str, Any], np.ndarray]]) -> int:
+        """
+        Acrescenta os padrões do lote; computed traz (processed, embedding)
+        das entradas fora do cache, na ordem. Retorna quantos vieram do cache
+        """
+        computed = iter(computed)
+        reused = 0
+        for item, question_hash, cached in entries:
+            if cached is None:
+                processed_question, question_embedding = next(computed)
+            else:
+                question_embedding, processed_question = cached
+                reused += 1
+            
+            pattern = {
+                'question': item['question'],
+                'response': item['response'],
+                'confidence': item.get('confidence', 0.8),
+                'category': item.get('category', 'geral'),
+                'embedding': question_embedding,
+                'processed': processed_question,
+                'hash': question_hash
+            }
+            
+            self.training_patterns.append(pattern)
+            self.semantic_clusters[pattern['category']].append(pattern)
+        
+        return reused
+    
     def optimize_semantic_clusters(self):
         """Otimiza clusters semânticos para busca mais eficiente"""
+        self.ensure_pattern_index()
+        self.recompute_semantic_clusters()
+    
+    def recompute_semantic_clusters(self):
+        """
+        Centroides, distâncias e clusters da busca podada sobre uma cópia das
+        linhas já indexadas; nunca reconstrói o índice (roda em segundo plano)
+        """
         self.logger.info("🔧 Otimizando clusters semânticos...")
         
-        for category, patterns in self.semantic_clusters.items():
-            if len(patterns) > 1:
-                # Calcular centroide do cluster
-                embeddings = [p['embedding'] for p in patterns]
-                centroid = np.mean(embeddings, axis=0)
-                
-                # Adicionar centroide ao cluster
-                for pattern in patterns:
-                    pattern['cluster_centroid'] = centroid
-                    pattern['cluster_distance'] = np.linalg.norm(pattern['embedding'] - centroid)
+        # Cópia fixa: padrões aprendidos durante o cálculo ficam para a próxima rodada
+        index = self.pattern_index
+        with self.index_lock:
+            size = min(index.size, len(self.training_patterns))
+            embeddings = index.row_embeddings(np.arange(size))
+            category_ids = index.category_ids[:size].copy()
+            num_categories = index.num_categories
+        counts = np.bincount(category_ids, minlength=num_categories)
+        
+        # Centroides de todos os clusters de uma vez
+        centroids = np.zeros((num_categories, index.embedding_dim))
+        np.add.at(centroids, category_ids, embeddings)
+        centroids /= np.maximum(counts, 1)[:, None]
+        distances = np.linalg.norm(embeddings - centroids[category_ids], axis=1)
+        
+        # Padrões materializados sob demanda (PatternTable) consultam o índice
+        if isinstance(self.training_patterns, list):
+            for pattern, category_id, distance in zip(self.training_patterns[:size],
+                                                      category_ids.tolist(), distances.tolist()):
+                if counts[category_id] > 1:
+                    pattern['cluster_centroid'] = centroids[category_id]
+                    pattern['cluster_distance'] = distance
+        
+        self.cluster_distances = distances
+        
+        # Clusters da busca podada (categorias grandes divididas com k-means)
+        self.cluster_index = ClusterIndex.build(embeddings, category_ids)
+        self.logger.info(f"✅ Otimização de clusters concluída ({self.cluster_index.num_clusters} clusters)")
+    
+    def schedule_cluster_optimization(self):
+        """Agenda a reotimização completa dos clusters fora do caminho da requisição"""
+        with self.cluster_lock:
+            if self.cluster_optimization_pending:
+                return
+            self.cluster_optimization_pending = True
         
-        self.logger.info("✅ Otimização de clusters concluída")
+        threading.Thread(target=self.run_scheduled_cluster_optimization,
+                         name='shopee-clusters', daemon=True).start()
+    
+    def run_scheduled_cluster_optimization(self):
+        """Executa a reotimização agendada (thread de fundo)"""
+        try:
+            self.recompute_semantic_clusters()
+        except Exception as e:
+            self.logger.error(f"Erro ao otimizar clusters: {e}")
+        finally:
+            with self.cluster_lock:
+                self.cluster_optimization_pending = False
+    
+    def rebuild_pattern_index(self):
+        """Reconstrói o índice matricial a partir de training_patterns"""
+        with self.index_lock:
+            self.pattern_index.build(self.training_patterns)
+        self.response_cache.invalidate()
+    
+    def ensure_pattern_index(self):
+        """Garante que o índice está alinhado com training_patterns"""
+        with self.index_lock:
+            if self.pattern_index.size != len(self.training_patterns):
+                self.rebuild_pattern_index()
+    
+    def set_embedding_storage(self, storage: str):
+        """Troca o armazenamento dos embeddings do índice (float64, float32 ou int8)"""
+        self.ensure_pattern_index()
+        self.pattern_index.set_storage(storage)
+        self.response_cache.invalidate()
+        self.logger.info(f"🗜️ Embeddings em {storage}: {self.pattern_index.embedding_nbytes / 1024:.0f} KB")
     
-    def advanced_similarity_search(self, user_input: str) -> Tuple[Dict, float, str]:
+    def pattern_float_embedding(self, pattern_id: int) -> np.ndarray:
+        """
+        Embedding em float de um padrão; padrões congelados de snapshot só têm
+        a linha do índice, então o embedding é recalculado (determinístico)
+        """
+        pattern = self.training_patterns[pattern_id]
+        if isinstance(pattern, LazyPattern):
+            return self.processor.create_advanced_embedding(pattern['processed'])
+        return pattern['embedding']
+    
+    def rerank_quantized_scores(self, input_embedding: np.ndarray, pattern_ids: Optional[np.ndarray],
+                                scores: np.ndarray) -> np.ndarray:
+        """
+        Índice em int8: troca, nos quantized_rerank maiores scores, o cosseno
+        aproximado pelo cosseno com o embedding em float do padrão
+        pattern_ids mapeia cada score para o padrão (None = scores de todos os padrões)
+        """
+        index = self.pattern_index
+        rerank = min(self.quantized_rerank, scores.size)
+        if index.storage != 'int8' or rerank <= 0:
+            return scores
+        
+        positions = np.argpartition(-scores, rerank - 1)[:rerank]
+        ids = positions if pattern_ids is None else pattern_ids[positions]
+        approximate = index.cosine_scores(input_embedding, ids)
+        exact = np.array([self.cosine_similarity(input_embedding, self.pattern_float_embedding(int(i)))
+                          for i in ids])
+        scores = scores.copy()
+        scores[positions] += 0.3 * (exact - approximate)
+        return scores
+    
+    def export_index_arrays(self) -> Dict[str, np.ndarray]:
+        """Exporta o índice treinado como arrays planos (memória compartilhada ou arquivo)"""
+        self.ensure_pattern_index()
+        arrays = self.pattern_index.export_arrays()
+        
+        arrays['questions_blob'], arrays['questions_offsets'] = encode_strings(
+            pattern['question'] for pattern in self.training_patterns)
+        arrays['responses_blob'], arrays['responses_offsets'] = encode_strings(
+            pattern['response'] for pattern in self.training_patterns)
+        
+        arrays['attention_weights'] = self.processor.attention_weights
+        arrays['context_weights'] = self.processor.context_weights
+        arrays['semantic_weights'] = self.processor.semantic_weights
+        
+        arrays['words_blob'], arrays['words_offsets'] = encode_strings(self.processor.word_vectors.words)
+        arrays['word_vectors'] = self.processor.word_vectors.export_matrix()
+        
+        return arrays
+    
+    def attach_index_arrays(self, arrays: Dict[str, np.ndarray]):
+        """
+        Adota arrays planos do índice sem copiá-los
+        Os padrões passam a ser materializados sob demanda a partir dos arrays
+        """
+        self.pattern_index.load_arrays(arrays)
+        self.response_cache.invalidate()
+        
+        self.processor.attention_weights = arrays['attention_weights']
+        self.processor.context_weights = arrays['context_weights']
+        self.processor.semantic_weights = arrays['semantic_weights']
+        
+        self.processor.word_vectors = WordVectorStore(
+            self.processor.embedding_dim,
+            words=decode_strings(arrays['words_blob'], arrays['words_offsets']),
+            matrix=arrays['word_vectors'])
+        
+        self.training_patterns = PatternTable(
+            self.processor,
+            StringTable(arrays['questions_blob'], arrays['questions_offsets']),
+            StringTable(arrays['responses_blob'], arrays['responses_offsets']),
+            self.pattern_index.categories,
+            arrays['category_ids'],
+            arrays['confidences'],
+            arrays['embeddings'],
+            self.pattern_index.embedding_scales
+        )
+        self.semantic_clusters = defaultdict(list, self.training_patterns.group_by_category())
+    
+    def advanced_similarity_search(self, user_input: str,
+                                   session: Optional[ConversationSession] = None) -> Tuple[Dict, float, str]:
         """
         Busca avançada com múltiplas métricas de similaridade e detecção de intenção
+        session isola o contexto de cada cliente (padrão: sessão do terminal)
         """
+        session = session or self.default_session
+        session.touch()
+        start_time = time.perf_counter()
+        
+        # Mensagem repetida no mesmo contexto de categorias e modo de busca:
+        # reaproveitar o padrão escolhido; a resposta é montada a cada pedido
+        cache_key = self.response_cache.make_key(user_input, session.recent_categories(3),
+                                                 self.search_settings())
+        generation = self.response_cache.generation
+        match = self.response_cache.get(cache_key)
+        if match is not None:
+            # Contexto desta sessão: embedding refeito do processed_input guardado
+            session.remember_embedding(self.processor.create_advanced_embedding(
+                match[0], session.context_vector()))
+        else:
+            match, _ = self.search_match(user_input, session)
+            self.response_cache.put(cache_key, match, generation)
+        
+        result = self.respond_to_match(user_input, match, session)
+        category = result[2]
+        if category == 'fallback':
+            self.fallback_counter.inc()
+        self.search_latency.labels(category).observe(time.perf_counter() - start_time)
+        return result
+    
+    def run_similarity_search(self, user_input: str, session: ConversationSession,
+                              update_metrics: bool = True) -> Tuple[Tuple[str, float, str], np.ndarray]:
+        """Executa a busca completa (sem cache); retorna (resultado, embedding da entrada)"""
+        match, input_embedding = self.search_match(user_input, session)
+        return self.respond_to_match(user_input, match, session, update_metrics), input_embedding
+    
+    def search_settings(self) -> Tuple:
+        """Parâmetros de busca que mudam o padrão escolhido (parte da chave do cache)"""
+        return self.search_mode, self.cluster_probe, self.cascade_k, self.quantized_rerank
+    
+    def search_match(self, user_input: str, session: ConversationSession) -> Tuple[Tuple, np.ndarray]:
+        """
+        Busca completa sem montar a resposta; retorna ((processed_input,
+        id do melhor padrão ou None, score), embedding da entrada)
+        """
+        timers = self.stage_timers
+        start_time = time.perf_counter()
         processed_input = self.processor.advanced_preprocess(user_input)
-        input_embedding = self.processor.create_advanced_embedding(processed_input)
+        preprocessed_time = time.perf_counter()
+        timers['preprocess'].observe(preprocessed_time - start_time)
         
-        # Adicionar ao contexto
-        self.processor.context_memory.append(input_embedding)
+        input_embedding = self.processor.create_advanced_embedding(processed_input,
+                                                                   session.context_vector())
+        embedded_time = time.perf_counter()
+        timers['embedding'].observe(embedded_time - preprocessed_time)
         
-        best_match = None
-        best_score = 0.0
-        scoring_details = {}
+        # Adicionar ao contexto
+        session.remember_embedding(input_embedding)
         
         # Detectar intenção primária
         primary_intent = self.detect_primary_intent(processed_input)
         
-        for pattern in self.training_patterns:
-            # Múltiplas métricas de similaridade
-            cosine_sim = self.cosine_similarity(input_embedding, pattern['embedding'])
-            semantic_sim = self.semantic_similarity(processed_input, pattern['processed'])
-            context_sim = self.context_similarity(pattern)
-            category_boost = self.category_relevance_boost(processed_input, pattern['category'])
-            intent_boost = self.intent_alignment_boost(primary_intent, pattern['category'])
-            
-            # Score combinado com pesos neurais ajustados
-            combined_score = (
-                0.3 * cosine_sim +
-                0.25 * semantic_sim +
-                0.15 * context_sim +
-                0.2 * category_boost +
-                0.1 * intent_boost
-            )
-            
-            # Aplicar boost de confiança
-            confidence_boost = pattern['confidence'] * 0.05
-            final_score = combined_score + confidence_boost
-            
-            if final_score > best_score:
-                best_score = final_score
-                best_match = pattern
-                scoring_details = {
-                    'cosine': cosine_sim,
-                    'semantic': semantic_sim,
-                    'context': context_sim,
-                    'category_boost': category_boost,
-                    'intent_boost': intent_boost,
-                    'confidence_boost': confidence_boost,
-                    'final_score': final_score,
-                    'primary_intent': primary_intent
-                }
+        if self.search_mode == 'clusters':
+            # Pontuar só os padrões dos clusters mais promissores
+            pattern_ids, scores = self.score_cluster_candidates(processed_input, input_embedding,
+                                                                primary_intent, session)
+        elif self.search_mode == 'bound':
+            # Pontuar só os padrões cujo limite superior alcança o melhor score
+            pattern_ids, scores = self.score_bounded_candidates(processed_input, input_embedding,
+                                                                primary_intent, session)
+        elif self.search_mode == 'cascade':
+            # Cosseno em todos, score completo só nos cascade_k melhores
+            pattern_ids, scores = self.score_cascade_candidates(processed_input, input_embedding,
+                                                                primary_intent, session)
+        else:
+            # Pontuar todos os padrões de uma vez
+            pattern_ids = None
+            scores = self.score_all_patterns(processed_input, input_embedding, primary_intent, session)
+        scores = self.rerank_quantized_scores(input_embedding, pattern_ids, scores)
+        scored_time = time.perf_counter()
+        timers['scoring'].observe(scored_time - embedded_time)
+        
+        match = self.select_best_match(processed_input, scores, pattern_ids)
+        timers['selection'].observe(time.perf_counter() - scored_time)
+        return match, input_embedding
+    
+    def prewarm_response_cache(self, limit: int = 100) -> int:
+        """
+        Pré-calcula as respostas das consultas mais frequentes do histórico
+        (contexto de sessão nova, sem alterar métricas); retorna quantas
+        """
+        session = ConversationSession('prewarm', self.processor.embedding_dim,
+                                      self.processor.context_window)
+        warmed = 0
+        for text, _ in self.response_cache.most_frequent(limit):
+            session.reset()
+            generation = self.response_cache.generation
+            match, _ = self.search_match(text, session)
+            self.response_cache.put(self.response_cache.make_key(text, (), self.search_settings()),
+                                    match, generation)
+            warmed += 1
+        return warmed
+    
+    def search_many(self, user_inputs: List[str],
+                    session: Optional[ConversationSession] = None) -> List[Tuple[str, float, str]]:
+        """
+        Busca em lote: processa várias mensagens com uma única passagem matricial
+        Todas as mensagens usam o mesmo contexto (o contexto não é alterado)
+        """
+        if not user_inputs:
+            return []
+        
+        session = session or self.default_session
+        processed_inputs = [self.processor.advanced_preprocess(text) for text in user_inputs]
+        input_embeddings = self.processor.create_advanced_embeddings(processed_inputs,
+                                                                     session.context_vector())
+        primary_intents = [self.detect_primary_intent(processed) for processed in processed_inputs]
+        
+        scores = self.score_patterns_batch(processed_inputs, input_embeddings, primary_intents, session)
         
-        if best_match:
+        return [
+            self.select_best_response(user_input, processed_input, row_scores, session)
+            for user_input, processed_input, row_scores in zip(user_inputs, processed_inputs, scores)
+        ]
+    
+    def handle_message(self, user_input: str,
+                       session: Optional[ConversationSession] = None) -> Dict[str, Any]:
+        """
+        Responde uma mensagem e registra a interação no histórico da sessão
+        """
+        session = session or self.default_session
+        
+        start_time = time.time()
+        response, confidence, category = self.advanced_similarity_search(user_input, session)
+        processing_time = time.time() - start_time
+        
+        session.record_interaction(user_input, response, confidence, category, processing_time)
+        
+        return {
+            'response': response,
+            'confidence': confidence,
+            'category': category,
+            'processing_time': processing_time
+        }
+    
+    def select_best_response(self, user_input: str, processed_input: Dict, scores: np.ndarray,
+                             session: Optional[ConversationSession] = None,
+                             pattern_ids: Optional[np.ndarray] = None,
+                             update_metrics: bool = True) -> Tuple[str, float, str]:
+        """
+        Escolhe o padrão de maior score ou gera resposta de fallback
+        pattern_ids mapeia cada score para o padrão (None = scores de todos os padrões)
+        """
+        match = self.select_best_match(processed_input, scores, pattern_ids)
+        return self.respond_to_match(user_input, match, session, update_metrics)
+    
+    def select_best_match(self, processed_input: Dict, scores: np.ndarray,
+                          pattern_ids: Optional[np.ndarray] = None) -> Tuple[Dict, Optional[int], float]:
+        """(processed_input, id do padrão de maior score, score); id None = fallback"""
+        if scores.size > 0:
+            best_position = int(np.argmax(scores))
+            best_score = float(scores[best_position])
+            if best_score > 0.0:
+                best_index = best_position if pattern_ids is None else int(pattern_ids[best_position])
+                return processed_input, best_index, best_score
+        return processed_input, None, 0.0
+    
+    def respond_to_match(self, user_input: str, match: Tuple[Dict, Optional[int], float],
+                         session: Optional[ConversationSession] = None,
+                         update_metrics: bool = True) -> Tuple[str, float, str]:
+        """Monta a resposta do padrão escolhido (personalização sorteada a cada pedido)"""
+        processed_input, best_index, best_score = match
+        if best_index is not None:
+            best_match = self.training_patterns[best_index]
             response = self.enhance_response(best_match, processed_input, best_score)
-            category = best_match['category']
             
             # Atualizar métricas
-            self.update_performance_metrics(user_input, best_match, best_score)
+            if update_metrics:
+                self.update_performance_metrics(user_input, best_match, best_score, session)
             
-            return response, best_score, category
+            return response, best_score, best_match['category']
         
         return self.generate_fallback_response(processed_input), 0.0, 'fallback'
     
-    def detect_primary_intent(self, processed_input: Dict) -> str:
-        """Detecta a intenção primária do usuário com prioridade para produtos defeituosos"""
-        entities = processed_input['entities']
-        tokens = processed_input['tokens']
-        text = ' '.join(tokens)
-        
-        # PRIORIDADE MÁXIMA: Reenvio/Segunda entrega (situação muito específica)
-        if 'reenvio_produto' in entities['intencoes']:
-            return 'reenvio_produto'
+    def score_all_patterns(self, processed_input: Dict, input_embedding: np.ndarray,
+                           primary_intent: str,
+                           session: Optional[ConversationSession] = None) -> np.ndarray:
+        """Calcula o score final de todos os padrões para uma mensagem"""
+        return self.score_patterns_batch([processed_input], input_embedding.reshape(1, -1),
+                                         [primary_intent], session)[0]
+    
+    def score_patterns_batch(self, processed_inputs: List[Dict], input_embeddings: np.ndarray,
+                             primary_intents: List[str],
+                             session: Optional[ConversationSession] = None) -> np.ndarray:
+        """
+        Calcula o score final de todos os padrões com operações vetorizadas
+        Retorna uma matriz (mensagens x padrões); termos que dependem só da
+        categoria são calculados uma vez por categoria
+        """
+        self.ensure_pattern_index()
+        index = self.pattern_index
+        
+        if index.size == 0:
+            return np.zeros((len(processed_inputs), 0))
+        
+        # Mensagens repetidas no lote compartilham os termos que não dependem do embedding
+        first_occurrence = {}
+        for i, processed in enumerate(processed_inputs):
+            first_occurrence.setdefault(processed['original'], i)
+        unique_order = list(first_occurrence.values())
+        unique_position = {text: row for row, text in enumerate(first_occurrence)}
+        row_map = [unique_position[processed['original']] for processed in processed_inputs]
+        
+        # Termos por padrão
+        cosine_sims = index.cosine_scores(input_embeddings)
+        semantic_sims = np.vstack([self.semantic_scores(processed_inputs[i]) for i in unique_order])
+        
+        # Termos por categoria, distribuídos aos padrões via category_ids
+        category_terms = [self.category_term_scores(processed_inputs[i], primary_intents[i], session)
+                          for i in unique_order]
+        context_sims = np.vstack([terms[0] for terms in category_terms])[row_map]
+        category_boosts = np.vstack([terms[1] for terms in category_terms])[row_map]
+        intent_boosts = np.vstack([terms[2] for terms in category_terms])[row_map]
+        semantic_sims = semantic_sims[row_map]
+        category_ids = index.category_ids
+        
+        # Score combinado com pesos neurais ajustados
+        combined_scores = (
+            0.3 * cosine_sims +
+            0.25 * semantic_sims +
+            0.15 * context_sims[:, category_ids] +
+            0.2 * category_boosts[:, category_ids] +
+            0.1 * intent_boosts[:, category_ids]
+        )
         
-        if any(pattern in text for pattern in ['não quero devolver', 'sem devolver', 'pode mandar novamente', 'pode enviar outro']):
-            return 'reenvio_produto'
+        # Aplicar boost de confiança
+        return combined_scores + index.confidences * 0.05
+    
+    def ensure_cluster_index(self) -> ClusterIndex:
+        """Garante que há clusters construídos para o índice atual"""
+        self.ensure_pattern_index()
+        cluster_index = self.cluster_index
+        if cluster_index is None or cluster_index.size > self.pattern_index.size:
+            index = self.pattern_index
+            cluster_index = ClusterIndex.build(index.row_embeddings(), index.category_ids)
+            self.cluster_index = cluster_index
+        return cluster_index
+    
+    def score_cluster_candidates(self, processed_input: Dict, input_embedding: np.ndarray,
+                                 primary_intent: str, session: Optional[ConversationSession] = None,
+                                 probe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca podada: ordena os clusters pelo cosseno com o centroide somado aos
+        termos da categoria (contexto, relevância e intenção primária como prior)
+        e calcula o score completo apenas nos padrões dos melhores clusters
+        Retorna (ids dos padrões, scores)
+        """
+        cluster_index = self.ensure_cluster_index()
+        index = self.pattern_index
+        
+        context_sims, category_boosts, intent_boosts = self.category_term_scores(
+            processed_input, primary_intent, session)
+        category_terms = 0.15 * context_sims + 0.2 * category_boosts + 0.1 * intent_boosts
+        
+        pattern_ids, _ = cluster_index.candidates(
+            input_embedding, category_terms, probe or self.cluster_probe, index.size)
+        if pattern_ids.size == 0:
+            return pattern_ids, np.zeros(0)
+        
+        scores = (
+            0.3 * index.cosine_scores(input_embedding, pattern_ids) +
+            0.25 * index.semantic_scores(processed_input, pattern_ids) +
+            category_terms[index.category_ids[pattern_ids]]
+        )
+        return pattern_ids, scores + index.confidences[pattern_ids] * 0.05
+    
+    def score_bounded_candidates(self, processed_input: Dict, input_embedding: np.ndarray,
+                                 primary_intent: str, session: Optional[ConversationSession] = None
+                                 ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca exata por branch-and-bound: limite superior de cada padrão com o
+        cosseno e os termos de categoria exatos e o termo semântico no máximo
+        possível para a consulta; Jaccard de tokens/entidades só é calculado
+        nos padrões cujo limite alcança o melhor score encontrado
+        O cosseno continua sendo um único produto matriz-vetor sobre todos os
+        padrões (o BLAS não garante os mesmos bits em subconjuntos)
+        Retorna (ids dos padrões pontuados, scores) com o argmax da busca exaustiva
+        """
+        self.ensure_pattern_index()
+        index = self.pattern_index
+        
+        if index.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        
+        cosine_sims = index.cosine_scores(input_embedding.reshape(1, -1))[0]
+        context_sims, category_boosts, intent_boosts = self.category_term_scores(
+            processed_input, primary_intent, session)
+        category_ids = index.category_ids
+        category_terms = 0.15 * context_sims + 0.2 * category_boosts + 0.1 * intent_boosts
+        
+        bounds = (0.3 * cosine_sims + 0.25 * index.semantic_upper_bound(processed_input) +
+                  category_terms[category_ids] + index.confidences * 0.05)
+        
+        pattern_ids, scores = branch_and_bound(
+            bounds, lambda ids: self.score_pattern_subset(processed_input, cosine_sims, context_sims,
+                                                          category_boosts, intent_boosts, ids))
+        self.bound_scored_counter.inc(pattern_ids.size)
+        self.bound_pruned_counter.inc(index.size - pattern_ids.size)
+        return pattern_ids, scores
+    
+    def score_cascade_candidates(self, processed_input: Dict, input_embedding: np.ndarray,
+                                 primary_intent: str, session: Optional[ConversationSession] = None,
+                                 k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Busca em cascata: o cosseno (um produto matriz-vetor) escolhe os k
+        candidatos com np.argpartition; semântica, contexto, categoria e
+        intenção são calculados só para eles
+        Retorna (ids dos candidatos em ordem crescente, scores)
+        """
+        self.ensure_pattern_index()
+        index = self.pattern_index
         
-        # PRIORIDADE ALTA: Produtos defeituosos
-        if 'produto_defeituoso' in entities['intencoes'] and 'reenvio_produto' not in entities['intencoes']:
-            return 'produto_defeituoso'
+        if index.size == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
         
-        if any(word in text for word in ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga', 'estragado', 'danificado']):
-            return 'produto_defeituoso'
+        k = min(k or self.cascade_k, index.size)
+        cosine_sims = index.cosine_scores(input_embedding.reshape(1, -1))[0]
+        if k < index.size:
+            pattern_ids = np.sort(np.argpartition(-cosine_sims, k - 1)[:k])
+        else:
+            pattern_ids = np.arange(index.size)
         
-        if any(pattern in text for pattern in ['veio quebrado', 'chegou quebrado', 'produto ruim', 'má qualidade', 'não presta']):
-            return 'produto_defeituoso'
+        context_sims, category_boosts, intent_boosts = self.category_term_scores(
+            processed_input, primary_intent, session)
+        scores = self.score_pattern_subset(processed_input, cosine_sims, context_sims,
+                                           category_boosts, intent_boosts, pattern_ids)
+        return pattern_ids, scores
+    
+    def top_matches(self, user_input: str, top_k: int = 5,
+                    session: Optional[ConversationSession] = None) -> List[Dict[str, Any]]:
+        """
+        Os top_k padrões para a mensagem (maior score primeiro), com o detalhe
+        de cada termo do score (scoring_details) calculado só para os retornados
+        Usa o modo de busca atual; não altera sessão nem métricas
+        """
+        session = session or self.default_session
+        processed_input = self.processor.advanced_preprocess(user_input)
+        input_embedding = self.processor.create_advanced_embedding(processed_input,
+                                                                   session.context_vector())
+        primary_intent = self.detect_primary_intent(processed_input)
         
-        # Palavras-chave de alta prioridade
-        if any(word in text for word in ['cancelar', 'cancela', 'não quero', 'desistir', 'parar', 'anular']):
-            return 'cancelamento'
+        if self.search_mode == 'clusters':
+            pattern_ids, scores = self.score_cluster_candidates(processed_input, input_embedding,
+                                                                primary_intent, session)
+        elif self.search_mode == 'cascade':
+            pattern_ids, scores = self.score_cascade_candidates(processed_input, input_embedding,
+                                                                primary_intent, session,
+                                                                max(self.cascade_k, top_k))
+        else:
+            # A poda por limite só garante o primeiro lugar: top-k usa todos os scores
+            scores = self.score_all_patterns(processed_input, input_embedding, primary_intent, session)
+            pattern_ids = np.arange(scores.size)
+        scores = self.rerank_quantized_scores(input_embedding, pattern_ids, scores)
+        
+        # Maior score primeiro; empates pelo menor id (como o argmax)
+        order = np.lexsort((pattern_ids, -scores))[:top_k]
+        matches = []
+        for position in order:
+            pattern = self.training_patterns[int(pattern_ids[position])]
+            matches.append({
+                'pattern_id': int(pattern_ids[position]),
+                'question': pattern['question'],
+                'response': pattern['response'],
+                'category': pattern['category'],
+                'score': float(scores[position]),
+                'scoring_details': self.score_pattern_details(processed_input, input_embedding, pattern,
+                                                              primary_intent, session)
+            })
+        return matches
+    
+    def evaluate_cascade_search(self, user_inputs: List[str], ks: Tuple[int, ...] = (4, 8, 16, 32, 64),
+                                top_k: int = 5) -> Dict[int, Dict[str, float]]:
+        """
+        Mede, para cada k, o recall da cascata contra a busca exaustiva:
+        recall@1 (mesmo vencedor), recall@top_k (fração dos top_k exaustivos
+        entre os candidatos), fração pontuada por completo e tempo médio
+        Cada mensagem é avaliada sem contexto e sem alterar sessões
+        """
+        session = ConversationSession('avaliacao', self.processor.embedding_dim,
+                                      self.processor.context_window)
+        queries = []
+        exhaustive_time = 0.0
+        for user_input in user_inputs:
+            processed = self.processor.advanced_preprocess(user_input)
+            embedding = self.processor.create_advanced_embedding(processed)
+            intent = self.detect_primary_intent(processed)
+            
+            start_time = time.perf_counter()
+            scores = self.score_all_patterns(processed, embedding, intent, session)
+            exhaustive_time += time.perf_counter() - start_time
+            expected_top = set(np.lexsort((np.arange(scores.size), -scores))[:top_k].tolist())
+            queries.append((processed, embedding, intent, int(np.argmax(scores)), expected_top))
+        
+        total = max(len(queries), 1)
+        results = {}
+        for k in ks:
+            hits = 0
+            top_hits = 0
+            top_total = 0
+            candidates = 0
+            cascade_time = 0.0
+            for processed, embedding, intent, expected, expected_top in queries:
+                start_time = time.perf_counter()
+                pattern_ids, scores = self.score_cascade_candidates(processed, embedding, intent, session, k)
+                cascade_time += time.perf_counter() - start_time
+                candidates += pattern_ids.size
+                if scores.size:
+                    hits += int(pattern_ids[int(np.argmax(scores))]) == expected
+                    found_top = pattern_ids[np.lexsort((pattern_ids, -scores))[:top_k]]
+                    top_hits += len(expected_top.intersection(found_top.tolist()))
+                top_total += len(expected_top)
+            
+            results[k] = {
+                'recall_at_1': hits / total,
+                f'recall_at_{top_k}': top_hits / max(top_total, 1),
+                'candidate_fraction': candidates / (total * max(self.pattern_index.size, 1)),
+                'cascade_ms': cascade_time * 1000 / total,
+                'exhaustive_ms': exhaustive_time * 1000 / total
+            }
         
-        if any(word in text for word in ['alterar', 'mudar', 'corrigir', 'atualizar']) and 'dados' in text:
-            return 'alteracao_dados'
+        return results
+    
+    def evaluate_embedding_storage(self, user_inputs: List[str],
+                                   storages: Tuple[str, ...] = tuple(STORAGE_DTYPES)) -> Dict[str, Dict[str, float]]:
+        """
+        Compara cada armazenamento de embeddings com float64 (referência):
+        concordância do vencedor (com e sem rerank em float no int8), maior
+        erro de cosseno, bytes dos embeddings e tempo médio da busca exaustiva
+        Índices temporários montados a partir de training_patterns; cada
+        mensagem é avaliada sem contexto e sem alterar sessões
+        """
+        self.ensure_pattern_index()
+        session = ConversationSession('avaliacao', self.processor.embedding_dim,
+                                      self.processor.context_window)
+        queries = []
+        for user_input in user_inputs:
+            processed = self.processor.advanced_preprocess(user_input)
+            queries.append((processed, self.processor.create_advanced_embedding(processed),
+                            self.detect_primary_intent(processed)))
+        
+        serving_index = self.pattern_index
+        results = {}
+        reference = None
+        try:
+            for storage in ('float64',) + tuple(s for s in storages if s != 'float64'):
+                self.pattern_index = PatternIndex(serving_index.embedding_dim, storage)
+                self.pattern_index.build(self.training_patterns)
+                
+                winners, reranked, cosines = [], [], []
+                search_time = 0.0
+                for processed, embedding, intent in queries:
+                    start_time = time.perf_counter()
+                    scores = self.score_all_patterns(processed, embedding, intent, session)
+                    search_time += time.perf_counter() - start_time
+                    winners.append(int(np.argmax(scores)) if scores.size else -1)
+                    reranked_scores = self.rerank_quantized_scores(embedding, None, scores)
+                    reranked.append(int(np.argmax(reranked_scores)) if scores.size else -1)
+                    cosines.append(self.pattern_index.cosine_scores(embedding))
+                
+                if reference is None:
+                    reference = (winners, cosines)
+                total = max(len(queries), 1)
+                results[storage] = {
+                    'agreement': sum(a == b for a, b in zip(winners, reference[0])) / total,
+                    'reranked_agreement': sum(a == b for a, b in zip(reranked, reference[0])) / total,
+                    'max_cosine_error': max((float(np.abs(a - b).max()) for a, b in zip(cosines, reference[1])
+                                             if a.size), default=0.0),
+                    'embedding_bytes': self.pattern_index.embedding_nbytes,
+                    'search_ms': search_time * 1000 / total
+                }
+        finally:
+            self.pattern_index = serving_index
         
-        if any(word in text for word in ['endereço', 'endereco', 'casa', 'apartamento']):
-            return 'alteracao_endereco'
+        return {storage: results[storage] for storage in storages}
+    
+    def score_pattern_subset(self, processed_input: Dict, cosine_sims: np.ndarray,
+                             context_sims: np.ndarray, category_boosts: np.ndarray,
+                             intent_boosts: np.ndarray, ids: np.ndarray) -> np.ndarray:
+        """Score final de `ids` (ordenados) com a mesma expressão de score_patterns_batch"""
+        index = self.pattern_index
+        pattern_categories = index.category_ids[ids]
+        combined_scores = (
+            0.3 * cosine_sims[ids] +
+            0.25 * index.semantic_scores(processed_input, ids) +
+            0.15 * context_sims[pattern_categories] +
+            0.2 * category_boosts[pattern_categories] +
+            0.1 * intent_boosts[pattern_categories]
+        )
+        return combined_scores + index.confidences[ids] * 0.05
+    
+    def evaluate_bound_search(self, user_inputs: List[str]) -> Dict[str, float]:
+        """
+        Compara a busca por limite com a exaustiva: concordância do argmax,
+        fração de padrões podados e tempo médio por consulta
+        Cada mensagem é avaliada sem contexto e sem alterar sessões
+        """
+        session = ConversationSession('avaliacao', self.processor.embedding_dim,
+                                      self.processor.context_window)
+        matches = 0
+        scored = 0
+        exhaustive_time = 0.0
+        bound_time = 0.0
+        for user_input in user_inputs:
+            processed = self.processor.advanced_preprocess(user_input)
+            embedding = self.processor.create_advanced_embedding(processed)
+            intent = self.detect_primary_intent(processed)
+            
+            start_time = time.perf_counter()
+            scores = self.score_all_patterns(processed, embedding, intent, session)
+            exhaustive_time += time.perf_counter() - start_time
+            
+            start_time = time.perf_counter()
+            pattern_ids, bound_scores = self.score_bounded_candidates(processed, embedding, intent, session)
+            bound_time += time.perf_counter() - start_time
+            
+            scored += pattern_ids.size
+            if scores.size:
+                best_position = int(np.argmax(bound_scores))
+                matches += (int(pattern_ids[best_position]) == int(np.argmax(scores))
+                            and float(bound_scores[best_position]) == float(scores.max()))
         
-        if any(word in text for word in ['devolver', 'trocar', 'reembolso']):
-            return 'devolucao'
+        total = max(len(user_inputs), 1)
+        return {
+            'argmax_agreement': matches / total,
+            'pruned_fraction': 1.0 - scored / (total * max(self.pattern_index.size, 1)),
+            'bound_ms': bound_time * 1000 / total,
+            'exhaustive_ms': exhaustive_time * 1000 / total
+        }
+    
+    def evaluate_cluster_search(self, user_inputs: List[str],
+                                probes: Tuple[int, ...] = (1, 2, 4, 8, 16)) -> Dict[int, Dict[str, float]]:
+        """
+        Mede recall@1 da busca podada contra a busca exaustiva (mesmo padrão
+        e mesma categoria vencedora), fração de padrões pontuados e tempo médio
+        Cada mensagem é avaliada sem contexto e sem alterar sessões
+        """
+        session = ConversationSession('avaliacao', self.processor.embedding_dim,
+                                      self.processor.context_window)
+        queries = []
+        exhaustive_time = 0.0
+        for user_input in user_inputs:
+            processed = self.processor.advanced_preprocess(user_input)
+            embedding = self.processor.create_advanced_embedding(processed)
+            intent = self.detect_primary_intent(processed)
+            
+            start_time = time.perf_counter()
+            scores = self.score_all_patterns(processed, embedding, intent, session)
+            exhaustive_time += time.perf_counter() - start_time
+            queries.append((processed, embedding, intent, int(np.argmax(scores))))
+        
+        total = max(len(queries), 1)
+        category_ids = self.pattern_index.category_ids
+        results = {}
+        for probe in probes:
+            hits = 0
+            category_hits = 0
+            candidates = 0
+            cluster_time = 0.0
+            for processed, embedding, intent, expected in queries:
+                start_time = time.perf_counter()
+                pattern_ids, scores = self.score_cluster_candidates(processed, embedding, intent,
+                                                                    session, probe)
+                cluster_time += time.perf_counter() - start_time
+                candidates += pattern_ids.size
+                if scores.size:
+                    found = int(pattern_ids[int(np.argmax(scores))])
+                    hits += found == expected
+                    category_hits += category_ids[found] == category_ids[expected]
+            
+            results[probe] = {
+                'recall_at_1': hits / total,
+                'category_recall': category_hits / total,
+                'candidate_fraction': candidates / (total * max(self.pattern_index.size, 1)),
+                'cluster_ms': cluster_time * 1000 / total,
+                'exhaustive_ms': exhaustive_time * 1000 / total
+            }
         
-        if any(word in text for word in ['pedido', 'compra', 'onde', 'status']):
-            return 'consulta_pedido'
+        return results
+    
+    def semantic_scores(self, processed_input: Dict) -> np.ndarray:
+        """Similaridade semântica da entrada contra cada padrão via índice invertido"""
+        return self.pattern_index.semantic_scores(processed_input)
+    
+    def query_category_features(self, processed_input: Dict, primary_intent: str,
+                                session: Optional[ConversationSession] = None) -> Dict[str, Any]:
+        """Características da mensagem para os termos de categoria (uma vez por consulta)"""
+        session = session or self.default_session
+        recent_categories = None
+        if session.conversation_context:
+            recent_categories = session.recent_categories(CONTEXT_WINDOW)
+        return query_features(processed_input, primary_intent, recent_categories)
+    
+    def category_term_scores(self, processed_input: Dict, primary_intent: str,
+                             session: Optional[ConversationSession] = None
+                             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calcula contexto, relevância e alinhamento de intenção por categoria
+        Custo proporcional ao número de categorias (e de tokens), não de padrões
+        """
+        categories = self.pattern_index.categories
+        if not self.category_terms.matches(categories):
+            self.category_terms = CategoryTermTable(categories)
         
-        if any(word in text for word in ['pagar', 'pagamento', 'pix', 'cartão']):
-            return 'pagamento'
+        features = self.query_category_features(processed_input, primary_intent, session)
+        return self.category_terms.scores(features)
+    
+    def score_pattern_details(self, processed_input: Dict, input_embedding: np.ndarray,
+                              pattern: Dict, primary_intent: str,
+                              session: Optional[ConversationSession] = None) -> Dict[str, float]:
+        """Detalha cada termo do score para um único padrão"""
+        cosine_sim = self.cosine_similarity(input_embedding, pattern['embedding'])
+        semantic_sim = self.semantic_similarity(processed_input, pattern['processed'])
+        features = self.query_category_features(processed_input, primary_intent, session)
+        context_sim = context_match(features, pattern['category'])
+        category_boost = keyword_relevance(features, pattern['category'])
+        intent_boost = intent_alignment(primary_intent, pattern['category'])
+        
+        combined_score = (
+            0.3 * cosine_sim +
+            0.25 * semantic_sim +
+            0.15 * context_sim +
+            0.2 * category_boost +
+            0.1 * intent_boost
+        )
+        confidence_boost = pattern['confidence'] * 0.05
         
-        return 'geral'
+        return {
+            'cosine': cosine_sim,
+            'semantic': semantic_sim,
+            'context': context_sim,
+            'category_boost': category_boost,
+            'intent_boost': intent_boost,
+            'confidence_boost': confidence_boost,
+            'final_score': combined_score + confidence_boost,
+            'primary_intent': primary_intent
+        }
+    
+    def detect_primary_intent(self, processed_input: Dict) -> str:
+        """
+        Detecta a intenção primária do usuário com prioridade para produtos defeituosos
+        Uma passada do autômato de frases; a prioridade segue INTENT_PRIORITY
+        """
+        phrases = match_phrases(' '.join(processed_input['tokens']))
+        return select_intent(processed_input['entities']['intencoes'], phrases)
     
     def intent_alignment_boost(self, primary_intent: str, category: str) -> float:
         """Boost baseado no alinhamento entre intenção detectada e categoria"""
-        intent_category_map = {
-            'reenvio_produto': ['reenvio_produto'],
-            'produto_defeituoso': ['produto_defeituoso'],
-            'cancelamento': ['cancelamento_pedido'],
-            'alteracao_dados': ['alteracao_dados'],
-            'alteracao_endereco': ['alteracao_dados'],
-            'devolucao': ['devolucao', 'reembolso'],
-            'consulta_pedido': ['pedidos'],
-            'pagamento': ['pagamento', 'pix', 'shopeepay'],
-            'geral': ['saudacao', 'suporte', 'geral']
-        }
-        
-        if primary_intent in intent_category_map:
-            if category in intent_category_map[primary_intent]:
-                return 1.0  # Boost forte para alinhamento perfeito
-            
-            # Verificar alinhamentos parciais
-            if primary_intent == 'cancelamento' and category == 'pedidos':
-                return 0.3  # Boost menor para relação parcial
-            if primary_intent == 'alteracao_dados' and category == 'conta':
-                return 0.3
-        
-        return 0.0
+        return intent_alignment(primary_intent, category)
     
     def cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
         """Similaridade cosseno otimizada"""
@@ -615,54 +1416,14 @@ class ShopeeNeuralAI:
         
         return 0.5 * entity_sim + 0.3 * token_sim + 0.2 * sentiment_sim
     
-    def context_similarity(self, pattern: Dict) -> float:
+    def context_similarity(self, pattern: Dict, session: Optional[ConversationSession] = None) -> float:
         """Similaridade baseada no contexto da conversa"""
-        if not self.conversation_context:
-            return 0.0
-        
-        # Analisar contexto recente
-        recent_categories = [ctx.get('category', '') for ctx in list(self.conversation_context)[-3:]]
-        
-        if pattern['category'] in recent_categories:
-            return 0.8  # Boost para categoria relacionada ao contexto
-        
-        return 0.0
+        features = self.query_category_features({'tokens': []}, 'geral', session)
+        return context_match(features, pattern['category'])
     
     def category_relevance_boost(self, processed_input: Dict, category: str) -> float:
         """Boost baseado na relevância da categoria com detecção precisa"""
-        category_keywords = {
-            'reenvio_produto': ['não quero devolver', 'sem devolver', 'pode mandar', 'pode enviar', 'reenvia', 'reenviar', 'segunda entrega', 'segunda via', 'substituir', 'substituto', 'reposição'],
-            'produto_defeituoso': ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga', 'estragado', 'danificado', 'problema', 'ruim', 'péssimo', 'usado', 'sujo', 'rachado', 'arranhão'],
-            'alteracao_dados': ['alterar', 'mudar', 'endereço', 'endereco', 'dados', 'erro', 'corrigir', 'atualizar'],
-            'cancelamento_pedido': ['cancelar', 'cancela', 'parar', 'anular', 'desfazer', 'reverter', 'estornar', 'remover', 'excluir', 'desistir'],
-            'pedidos': ['pedido', 'compra', 'status', 'onde', 'rastrear', 'acompanhar'],
-            'pagamento': ['pagar', 'pix', 'cartão', 'cartao', 'pagamento', 'valor', 'preco'],
-            'entrega': ['entrega', 'prazo', 'correios', 'rastrear', 'chegou', 'receber'],
-            'devolucao': ['devolver', 'trocar', 'reembolso', 'devoluçao', 'troca']
-        }
-        
-        # Palavras que indicam forte intenção para cada categoria
-        strong_indicators = {
-            'reenvio_produto': ['não quero devolver pode mandar', 'sem devolver quero outro', 'pode enviar outro', 'segunda entrega'],
-            'produto_defeituoso': ['veio com defeito', 'produto quebrado', 'não funciona', 'chegou quebrado', 'defeito de fábrica'],
-            'cancelamento_pedido': ['cancelar', 'cancela', 'não quero', 'desistir', 'parar'],
-            'alteracao_dados': ['alterar dados', 'mudar endereço', 'corrigir', 'atualizar']
-        }
-        
-        if category in category_keywords:
-            keywords = category_keywords[category]
-            matches = sum(1 for token in processed_input['tokens'] if token in keywords)
-            
-            # Boost extra para indicadores fortes
-            if category in strong_indicators:
-                text_full = ' '.join(processed_input['tokens'])
-                for indicator in strong_indicators[category]:
-                    if indicator in text_full:
-                        matches += 2  # Boost extra
-            
-            return min(matches / max(len(keywords), 1), 1.5)  # Permite boost > 1.0
-        
-        return 0.0
+        return keyword_relevance(query_features(processed_input, 'geral'), category)
     
     def enhance_response(self, pattern: Dict, user_input: Dict, score: float) -> str:
         """Aprimora resposta com base no contexto e score"""
@@ -712,33 +1473,39 @@ class ShopeeNeuralAI:
         return ("Não consegui encontrar uma resposta específica para sua pergunta. "
                "Pode reformular ou entrar em contato com o suporte oficial da Shopee?")
     
-    def update_performance_metrics(self, user_input: str, pattern: Dict, score: float):
-        """Atualiza métricas de performance"""
-        self.performance_metrics['total_interactions'] += 1
-        self.performance_metrics['average_confidence'] = (
-            (self.performance_metrics['average_confidence'] * 
-             (self.performance_metrics['total_interactions'] - 1) + score) /
-            self.performance_metrics['total_interactions']
-        )
-        
-        category = pattern['category']
-        self.performance_metrics[f'category_{category}'] += 1
-        
-        if score > 0.7:
-            self.performance_metrics['high_confidence_responses'] += 1
-        elif score > 0.4:
-            self.performance_metrics['medium_confidence_responses'] += 1
-        else:
-            self.performance_metrics['low_confidence_responses'] += 1
+    def update_performance_metrics(self, user_input: str, pattern: Dict, score: float,
+                                   session: Optional[ConversationSession] = None):
+        """Atualiza métricas de performance (globais e da sessão)"""
+        session = session or self.default_session
+        
+        with self.metrics_lock:
+            for metrics in (self.performance_metrics, session.performance_metrics):
+                metrics['total_interactions'] += 1
+                metrics['average_confidence'] = (
+                    (metrics['average_confidence'] * 
+                     (metrics['total_interactions'] - 1) + score) /
+                    metrics['total_interactions']
+                )
+                
+                category = pattern['category']
+                metrics[f'category_{category}'] += 1
+                
+                if score > 0.7:
+                    metrics['high_confidence_responses'] += 1
+                elif score > 0.4:
+                    metrics['medium_confidence_responses'] += 1
+                else:
+                    metrics['low_confidence_responses'] += 1
     
     def dynamic_learning(self, user_input: str, expected_response: str, category: str = 'geral'):
         """Sistema de aprendizado dinâmico em tempo real"""
-        if not self.dynamic_learning:
+        if not self.dynamic_learning_enabled:
             return False
         
         try:
-            # Processar nova entrada
+            # Processar nova entrada (palavras passam a fazer parte do vocabulário)
             processed_input = self.processor.advanced_preprocess(user_input)
+            self.processor.word_vectors.add_training_words(processed_input['tokens'])
             input_embedding = self.processor.create_advanced_embedding(processed_input)
             
             # Criar novo padrão
@@ -754,20 +1521,30 @@ class ShopeeNeuralAI:
                 'learned_dynamically': True
             }
             
-            # Verificar se já existe padrão similar
-            for existing_pattern in self.training_patterns:
-                similarity = self.cosine_similarity(input_embedding, existing_pattern['embedding'])
-                if similarity > 0.9:  # Muito similar
-                    self.logger.info(f"Padrão similar já existe (sim: {similarity:.3f})")
-                    return False
+            with self.index_lock:
+                # Verificar se já existe padrão similar (um produto matriz-vetor)
+                self.ensure_pattern_index()
+                if self.pattern_index.size:
+                    similarity = float(self.pattern_index.cosine_scores(input_embedding).max())
+                    if similarity > 0.9:  # Muito similar
+                        self.logger.info(f"Padrão similar já existe (sim: {similarity:.3f})")
+                        return False
+                
+                # Adicionar novo padrão (centroide da categoria atualizado como média corrente)
+                self.training_patterns.append(new_pattern)
+                self.pattern_index.add(new_pattern)
+                self.semantic_clusters[category].append(new_pattern)
+                cluster_size = len(self.semantic_clusters[category])
+                centroid = self.pattern_index.centroid(category)
             
-            # Adicionar novo padrão
-            self.training_patterns.append(new_pattern)
-            self.semantic_clusters[category].append(new_pattern)
+            self.response_cache.invalidate()
+            self.learned_counter.inc()
+            new_pattern['cluster_centroid'] = centroid
+            new_pattern['cluster_distance'] = np.linalg.norm(input_embedding - centroid)
             
-            # Reotimizar clusters se necessário
-            if len(self.semantic_clusters[category]) % 10 == 0:
-                self.optimize_semantic_clusters()
+            # Reotimizar clusters em segundo plano se necessário
+            if cluster_size % 10 == 0:
+                self.schedule_cluster_optimization()
             
             self.logger.info(f"✅ Novo padrão aprendido dinamicamente: {category}")
             return True
@@ -777,30 +1554,26 @@ class ShopeeNeuralAI:
             return False
     
     def save_model(self) -> bool:
-        """Salva modelo completo com todas as informações"""
+        """Salva o modelo como snapshot binário (arrays alinhados + metadados JSON)"""
         try:
-            model_data = {
-                'training_patterns': self.training_patterns,
-                'processor_word_vectors': self.processor.word_vectors,
-                'processor_phrase_vectors': self.processor.phrase_vectors,
-                'semantic_clusters': dict(self.semantic_clusters),
+            metadata = {
+                'version': MODEL_VERSION,
+                'saved_at': datetime.now().isoformat(),
+                'embedding_dim': self.processor.embedding_dim,
+                'patterns': len(self.training_patterns),
                 'performance_metrics': dict(self.performance_metrics),
                 'conversation_context': list(self.conversation_context),
-                'neural_weights': {
-                    'attention': self.processor.attention_weights.tolist(),
-                    'context': self.processor.context_weights.tolist(),
-                    'semantic': self.processor.semantic_weights.tolist()
-                },
-                'saved_at': datetime.now().isoformat(),
-                'version': '2.0_advanced'
+                'frequent_queries': self.response_cache.most_frequent()
             }
             
-            with open(self.model_file, 'wb') as f:
-                pickle.dump(model_data, f)
+            if self.mapped_snapshot == self.model_file:
+                self.release_snapshot_mapping()
+            write_snapshot(self.model_file, self.export_index_arrays(), metadata)
             
-            # Salvar métricas separadamente em JSON
+            # Salvar métricas separadamente em JSON e no formato Prometheus
             with open(self.metrics_file, 'w', encoding='utf-8') as f:
                 json.dump(dict(self.performance_metrics), f, indent=2, ensure_ascii=False)
+            self.metrics.write(os.path.splitext(self.metrics_file)[0] + '.prom')
             
             self.logger.info(f"💾 Modelo salvo: {self.model_file}")
             return True
@@ -809,32 +1582,49 @@ class ShopeeNeuralAI:
             self.logger.error(f"Erro ao salvar modelo: {e}")
             return False
     
+    def release_snapshot_mapping(self):
+        """
+        Copia para a memória os arrays mapeados do snapshot e fecha o mapeamento
+        No Windows um arquivo mapeado não pode ser substituído por os.replace
+        """
+        if self.mapped_snapshot is None:
+            return
+        arrays = {name: np.array(array) for name, array in self.export_index_arrays().items()}
+        self.attach_index_arrays(arrays)
+        self.mapped_snapshot = None
+        gc.collect()
+        self.logger.info("📤 Snapshot copiado para a memória antes de ser regravado")
+    
     def load_model(self) -> bool:
-        """Carrega modelo salvo"""
+        """Carrega o snapshot salvo via memmap (sem desserializar objetos)"""
         if not os.path.exists(self.model_file):
+            if os.path.exists(self.legacy_model_file):
+                self.logger.warning(f"⚠️ Modelo em pickle encontrado: {self.legacy_model_file}")
+                self.logger.warning("💡 Converta com scripts/converter_modelo_snapshot.py")
             return False
         
         try:
-            with open(self.model_file, 'rb') as f:
-                model_data = pickle.load(f)
+            arrays, metadata = read_snapshot(self.model_file)
+            
+            if metadata.get('embedding_dim') != self.processor.embedding_dim:
+                raise SnapshotError(f"dimensão incompatível: {metadata.get('embedding_dim')}")
             
-            # Restaurar dados
-            self.training_patterns = model_data.get('training_patterns', [])
-            self.processor.word_vectors = model_data.get('processor_word_vectors', {})
-            self.processor.phrase_vectors = model_data.get('processor_phrase_vectors', {})
-            self.semantic_clusters = defaultdict(list, model_data.get('semantic_clusters', {}))
-            self.performance_metrics = defaultdict(float, model_data.get('performance_metrics', {}))
-            self.conversation_context = deque(model_data.get('conversation_context', []), maxlen=20)
+            # Restaurar dados (visões do arquivo mapeado)
+            self.attach_index_arrays(arrays)
+            self.mapped_snapshot = self.model_file
+            self.performance_metrics = defaultdict(float, metadata.get('performance_metrics', {}))
+            self.default_session.conversation_context.extend(metadata.get('conversation_context', []))
+            self.response_cache.load_counts(metadata.get('frequent_queries', []))
             
-            # Restaurar pesos neurais
-            neural_weights = model_data.get('neural_weights', {})
-            if neural_weights:
-                self.processor.attention_weights = np.array(neural_weights.get('attention'))
-                self.processor.context_weights = np.array(neural_weights.get('context'))
-                self.processor.semantic_weights = np.array(neural_weights.get('semantic'))
+            saved_at = metadata.get('saved_at', 'desconhecido')
+            version = metadata.get('version', 'legacy')
             
-            saved_at = model_data.get('saved_at', 'desconhecido')
-            version = model_data.get('version', 'legacy')
+            # Embeddings de versões anteriores usavam vetores de frases aleatórios
+            if version != MODEL_VERSION:
+                self.logger.warning(f"⚠️ Modelo da versão {version}: recalculando embeddings")
+                self.processor.initialize_weights()
+                self.reembed_patterns()
+                self.save_model()
             
             self.logger.info(f"✅ Modelo carregado: {len(self.training_patterns)} padrões")
             self.logger.info(f"📅 Salvo em: {saved_at}, Versão: {version}")
@@ -845,6 +1635,39 @@ class ShopeeNeuralAI:
             self.logger.error(f"Erro ao carregar modelo: {e}")
             return False
     
+    def restore_model_data(self, model_data: Dict[str, Any]):
+        """Restaura o estado a partir do dicionário de um modelo '2.0_advanced' (pickle)"""
+        self.training_patterns = model_data.get('training_patterns', [])
+        self.processor.word_vectors = WordVectorStore.from_mapping(
+            model_data.get('processor_word_vectors', {}), self.processor.embedding_dim)
+        self.performance_metrics = defaultdict(float, model_data.get('performance_metrics', {}))
+        self.default_session.conversation_context.extend(model_data.get('conversation_context', []))
+        
+        # Pesos, vetores de frases e ruído do pickle não são reprodutíveis:
+        # os embeddings são recalculados com o processador determinístico
+        self.reembed_patterns()
+    
+    def reembed_patterns(self):
+        """Recalcula preprocessamento e embedding de todos os padrões com o processador atual"""
+        patterns = []
+        for pattern in self.training_patterns:
+            pattern = {key: pattern[key] for key in ('question', 'response', 'confidence', 'category')}
+            pattern['processed'] = self.processor.advanced_preprocess(pattern['question'])
+            pattern['hash'] = hashlib.md5(pattern['question'].encode()).hexdigest()
+            patterns.append(pattern)
+        
+        self.processor.word_vectors.add_training_words(
+            token for pattern in patterns for token in pattern['processed']['tokens'])
+        
+        self.semantic_clusters = defaultdict(list)
+        for pattern in patterns:
+            pattern['embedding'] = self.processor.create_advanced_embedding(pattern['processed'])
+            self.semantic_clusters[pattern['category']].append(pattern)
+        
+        self.training_patterns = patterns
+        self.rebuild_pattern_index()
+        self.optimize_semantic_clusters()
+    
     def get_detailed_stats(self) -> Dict[str, Any]:
         """Retorna estatísticas detalhadas do sistema"""
         stats = {
@@ -852,14 +1675,19 @@ class ShopeeNeuralAI:
                 'total_patterns': len(self.training_patterns),
                 'categories': len(self.semantic_clusters),
                 'vocabulary_size': len(self.processor.word_vectors),
-                'phrase_vectors': len(self.processor.phrase_vectors),
-                'context_memory': len(self.processor.context_memory),
-                'conversation_context': len(self.conversation_context)
+                'ngram_buckets': (self.processor.bigram_encoder.num_buckets
+                                  + self.processor.trigram_encoder.num_buckets),
+                'context_memory': len(self.default_session.context_memory),
+                'conversation_context': len(self.conversation_context),
+                'active_sessions': len(self.sessions)
             },
+            'vocabulary': self.processor.word_vectors.get_stats(),
+            'response_cache': self.response_cache.get_stats(),
             'performance': dict(self.performance_metrics),
             'categories': {cat: len(patterns) for cat, patterns in self.semantic_clusters.items()},
             'recent_activity': {
-                'session_stats': dict(self.session_stats)
+                'session_stats': dict(self.session_stats),
+                'sessions': self.sessions.get_stats()
             }
         }
         
@@ -940,25 +1768,16 @@ class ShopeeNeuralAI:
                     continue
                 
                 elif user_input.lower() == 'reset':
-                    self.conversation_context.clear()
-                    self.processor.context_memory.clear()
+                    self.default_session.reset()
                     print("🔄 Contexto limpo!")
                     continue
                 
                 # Processar pergunta normal
-                start_time = time.time()
-                response_data, confidence, category = self.advanced_similarity_search(user_input)
-                processing_time = time.time() - start_time
-                
-                # Adicionar ao contexto da conversa
-                self.conversation_context.append({
-                    'user_input': user_input,
-                    'response': response_data,
-                    'confidence': confidence,
-                    'category': category,
-                    'timestamp': datetime.now().isoformat(),
-                    'processing_time': processing_time
-                })
+                result = self.handle_message(user_input)
+                response_data = result['response']
+                confidence = result['confidence']
+                category = result['category']
+                processing_time = result['processing_time']
                 
                 # Determinar emoji de confiança
                 if confidence > 0.8:
@@ -977,13 +1796,6 @@ class ShopeeNeuralAI:
                 if confidence < 0.6:
                     print(f"    🔬 [Confiança: {confidence:.3f} | Categoria: {category} | {processing_time:.3f}s]")
                 
-                # Atualizar estatísticas da sessão
-                self.session_stats['total_queries'] += 1
-                self.session_stats[f'category_{category}'] += 1
-                
-                if confidence > 0.6:
-                    self.session_stats['successful_responses'] += 1
-                
             except KeyboardInterrupt:
                 print("\n\n🔄 Salvando estado antes de encerrar...")
                 self.save_model()
@@ -1006,6 +1818,17 @@ class ShopeeNeuralAI:
         for key, value in stats['system_info'].items():
             print(f"  📋 {key.replace('_', ' ').title()}: {value:,}")
         
+        print(f"\n🔤 VOCABULÁRIO:")
+        for key, value in stats['vocabulary'].items():
+            print(f"  📋 {key.replace('_', ' ').title()}: {value:,}")
+        
+        print(f"\n⚡ CACHE DE RESPOSTAS:")
+        for key, value in stats['response_cache'].items():
+            if isinstance(value, float):
+                print(f"  📈 {key.replace('_', ' ').title()}: {value:.3f}")
+            else:
+                print(f"  📋 {key.replace('_', ' ').title()}: {value:,}")
+        
         print(f"\n⚡ PERFORMANCE GERAL:")
         perf = stats['performance']
         for key, value in perf.items():
@@ -1118,6 +1941,11 @@ def main():
             print("💡 Certifique-se de que os dados estão disponíveis")
             return
     
+    # Respostas das consultas mais frequentes já prontas
+    warmed = ai_system.prewarm_response_cache()
+    if warmed:
+        print(f"🔥 Cache de respostas pré-aquecido: {warmed} consultas")
+    
     print("🎯 Sistema Neural carregado e otimizado!")
     print("🔥 Pronto para atendimento avançado com IA!")
     
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+SHOPEE NGRAM ENCODER - N-gramas por Hashing
+Mapeia bigramas e trigramas para um número fixo de posições usando hash
+assinado determinístico (feature hashing); não há tabela de vetores,
+então o resultado é idêntico entre processos e reinícios e a memória
+não depende do tráfego
+"""
+
+import math
+import hashlib
+from typing import List
+
+import numpy as np
+
+# Posições (com sinal) que cada n-grama ativa
+NGRAM_HASH_PROBES = 3
+
+
+class HashedNgramEncoder:
+    """
+    Codificador de n-gramas em `num_buckets` posições
+    Cada n-grama ativa NGRAM_HASH_PROBES posições com sinal ±, escaladas para
+    que a norma esperada seja a mesma de um vetor normal de `num_buckets` dimensões
+    """
+
+    def __init__(self, num_buckets: int, probes: int = NGRAM_HASH_PROBES):
+        self.num_buckets = num_buckets
+        self.probes = probes
+        self.scale = math.sqrt(num_buckets / probes)
+
+    def hash_ngrams(self, ngrams: List[str]) -> np.ndarray:
+        """Valores de hash (n x probes, uint32) de cada n-grama"""
+        digests = b''.join(
+            hashlib.blake2b(ngram.encode('utf-8'), digest_size=4 * self.probes).digest()
+            for ngram in ngrams)
+        return np.frombuffer(digests, dtype='<u4').reshape(len(ngrams), self.probes)
+
+    def encode(self, ngrams: List[str]) -> np.ndarray:
+        """Soma dos vetores assinados de todos os n-gramas"""
+        features = np.zeros(self.num_buckets)
+        if not ngrams:
+            return features
+
+        hashes = self.hash_ngrams(ngrams)
+        buckets = (hashes % self.num_buckets).astype(np.int64)
+        signs = np.where(hashes >> 31, -self.scale, self.scale)
+        np.add.at(features, buckets.ravel(), signs.ravel())
+        return features
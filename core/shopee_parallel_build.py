@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+SHOPEE PARALLEL BUILD - Construção do Índice em Paralelo
+Preprocessamento e embeddings das perguntas de treinamento são calculados
+em um pool de processos, um lote por tarefa; o processo pai só junta
+vocabulário e padrões na ordem original. Cada worker parte de uma cópia
+dos pesos e do vocabulário do processador, então o resultado é idêntico
+ao da construção serial
+"""
+
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Tuple, Any, Iterable, Iterator, Optional
+
+import numpy as np
+
+# Lotes em andamento por worker (limita a memória do pipeline)
+PENDING_PER_WORKER = 2
+
+# Processador do worker (criado uma vez por processo)
+_worker_processor = None
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    """Número de processos; None ou 0 = todos os núcleos"""
+    return workers if workers and workers > 0 else (os.cpu_count() or 1)
+
+
+def processor_state(processor) -> Dict[str, Any]:
+    """Estado do processador necessário para reproduzir seus embeddings em outro processo"""
+    return {
+        'embedding_dim': processor.embedding_dim,
+        'context_window': processor.context_window,
+        'weight_seed': processor.weight_seed,
+        'attention_weights': processor.attention_weights,
+        'context_weights': processor.context_weights,
+        'semantic_weights': processor.semantic_weights,
+        'words': list(processor.word_vectors.words),
+        'word_matrix': processor.word_vectors.export_matrix()
+    }
+
+
+def init_worker(state: Dict[str, Any]):
+    """Recria o processador no worker a partir do estado do pai"""
+    global _worker_processor
+    from shopee_neural_ai_advanced import AdvancedNeuralProcessor
+    from shopee_vocabulary import WordVectorStore
+
+    processor = AdvancedNeuralProcessor(state['embedding_dim'], state['context_window'],
+                                        state['weight_seed'])
+    processor.attention_weights = state['attention_weights']
+    processor.context_weights = state['context_weights']
+    processor.semantic_weights = state['semantic_weights']
+    processor.word_vectors = WordVectorStore(state['embedding_dim'], words=state['words'],
+                                             matrix=state['word_matrix'])
+    _worker_processor = processor
+
+
+def embed_questions(questions: List[str]) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+    """
+    Preprocessa e cria o embedding de cada pergunta (executado no worker)
+    Os embeddings voltam empilhados em uma matriz: bem mais barato de serializar
+    """
+    processor = _worker_processor
+    processed = [processor.advanced_preprocess(question) for question in questions]
+    processor.word_vectors.add_training_words(
+        token for item in processed for token in item['tokens'])
+
+    embeddings = np.zeros((len(processed), processor.embedding_dim))
+    for row, item in enumerate(processed):
+        embeddings[row] = processor.create_advanced_embedding(item)
+    return processed, embeddings
+
+
+class ParallelEmbeddingBuilder:
+    """Pool de processos que calcula (processed, embeddings) por lote de perguntas"""
+
+    def __init__(self, processor, workers: Optional[int] = None):
+        self.workers = resolve_workers(workers)
+        self.logger = logging.getLogger('ShopeeNeuralAI')
+
+        # 'spawn' evita herdar o heap do pai (e funciona igual no Windows)
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_worker,
+            initargs=(processor_state(processor),)
+        )
+
+    def imap(self, jobs: Iterable[Tuple[Any, List[str]]]
+             ) -> Iterator[Tuple[Any, Tuple[List[Dict[str, Any]], np.ndarray]]]:
+        """
+        Para cada (tag, perguntas) devolve (tag, resultados) na ordem de entrada
+        Só PENDING_PER_WORKER lotes por worker ficam em andamento
+        """
+        pending = deque()
+        max_pending = self.workers * PENDING_PER_WORKER
+
+        for tag, questions in jobs:
+            pending.append((tag, self.executor.submit(embed_questions, questions)))
+            if len(pending) >= max_pending:
+                tag, future = pending.popleft()
+                yield tag, future.result()
+
+        while pending:
+            tag, future = pending.popleft()
+            yield tag, future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ParallelEmbeddingBuilder":
+        self.logger.info(f"👷 Construção paralela do índice com {self.workers} processos")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
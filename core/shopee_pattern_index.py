@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""
+SHOPEE PATTERN INDEX - Índice Matricial de Padrões
+Mantém embeddings, confianças e categorias em arrays contíguos
+para pontuação vetorizada de todos os padrões de uma só vez; tokens e
+entidades ficam em matrizes esparsas binárias (scipy.sparse) e os
+sentimentos em uma tabela de vetores distintos
+"""
+
+import numpy as np
+import scipy.sparse as sp
+from typing import List, Dict, Any, Iterable, Set, Tuple, Optional
+
+from shopee_index_storage import encode_strings, decode_strings
+from shopee_quantization import (DEFAULT_STORAGE, storage_dtype, storage_of, encode_rows, decode_rows,
+                                 quantized_products, storage_nbytes)
+
+# Ordem fixa das chaves de sentimento na matriz de sentimentos
+SENTIMENT_KEYS = ('positive', 'negative', 'urgent', 'neutral')
+
+# Arrays com uma linha por padrão (crescem juntos)
+ROW_ARRAYS = ('embeddings', 'embedding_scales', 'norms', 'confidences', 'category_ids',
+              'token_counts', 'entity_counts', 'sentiments', 'sentiment_ids')
+
+# Capacidade mínima ao crescer o armazenamento
+MIN_CAPACITY = 64
+
+# Padrões acrescentados antes de consolidar os termos nas matrizes esparsas
+PENDING_LIMIT = 256
+
+
+def first_seen_unique(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Linhas distintas na ordem de primeira ocorrência e o id de cada linha"""
+    if rows.shape[0] == 0:
+        return rows.copy(), np.zeros(0, dtype=np.int32)
+    table, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    return table[order], rank[inverse.reshape(-1)].astype(np.int32)
+
+
+class TermMatrix:
+    """
+    Matriz binária padrões x termos em scipy.sparse CSC (cada coluna lista os
+    padrões que contêm o termo), mais listas invertidas para os padrões
+    acrescentados desde a última consolidação
+    """
+
+    def __init__(self):
+        self.terms: List[str] = []
+        self.columns: Dict[str, int] = {}
+        self.matrix = sp.csc_matrix((0, 0), dtype=np.int8)
+        self.pending: Dict[str, List[int]] = {}
+        self.pending_rows = 0
+        self.size = 0
+
+    def append(self, terms: Iterable[str], pattern_id: int):
+        """Registra os termos de um padrão novo (consolidados depois, em fold)"""
+        for term in terms:
+            ids = self.pending.get(term)
+            if ids is None:
+                self.pending[term] = [pattern_id]
+            else:
+                ids.append(pattern_id)
+        self.pending_rows += 1
+        self.size = pattern_id + 1
+
+    def fold(self):
+        """Incorpora os padrões pendentes à matriz (uma conversão COO -> CSC)"""
+        if not self.pending_rows:
+            return
+
+        matrix = self.matrix
+        rows = [matrix.indices]
+        columns = [np.repeat(np.arange(len(self.terms), dtype=np.int32), np.diff(matrix.indptr))]
+        for term, ids in self.pending.items():
+            column = self.columns.get(term)
+            if column is None:
+                column = self.columns[term] = len(self.terms)
+                self.terms.append(term)
+            rows.append(np.asarray(ids, dtype=np.int32))
+            columns.append(np.full(len(ids), column, dtype=np.int32))
+
+        rows = np.concatenate(rows)
+        self.matrix = sp.csc_matrix((np.ones(len(rows), dtype=np.int8), (rows, np.concatenate(columns))),
+                                    shape=(self.size, len(self.terms)))
+        self.pending = {}
+        self.pending_rows = 0
+
+    def overlap_counts(self, terms: Set[str], count: int, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Termos em comum com cada um dos `count` padrões: só as colunas dos termos
+        da consulta são lidas. Com `ids` (ordenados), conta apenas para esses padrões
+        """
+        size = count if ids is None else len(ids)
+        columns = [self.columns[term] for term in terms if term in self.columns]
+        matched = [self.matrix[:, columns].indices] if columns else []
+        matched.extend(self.pending[term] for term in terms if term in self.pending)
+        if not matched or size == 0:
+            return np.zeros(size, dtype=np.int64)
+
+        hits = np.concatenate(matched).astype(np.int64)
+        if ids is None:
+            return np.bincount(hits, minlength=count)
+
+        positions = np.minimum(np.searchsorted(ids, hits), size - 1)
+        return np.bincount(positions[ids[positions] == hits], minlength=size)
+
+    def export_arrays(self, prefix: str) -> Dict[str, np.ndarray]:
+        """Termos + colunas da matriz no formato CSR das listas invertidas"""
+        self.fold()
+        arrays = {}
+        arrays[f'{prefix}_terms_blob'], arrays[f'{prefix}_terms_offsets'] = encode_strings(self.terms)
+        arrays[f'{prefix}_postings_offsets'] = self.matrix.indptr.astype(np.int64)
+        arrays[f'{prefix}_postings'] = self.matrix.indices.astype(np.int32, copy=False)
+        return arrays
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray], prefix: str, size: int):
+        """Adota os arrays como matriz CSC sem copiar os ids dos padrões"""
+        self.terms = decode_strings(arrays[f'{prefix}_terms_blob'], arrays[f'{prefix}_terms_offsets'])
+        self.columns = {term: i for i, term in enumerate(self.terms)}
+        offsets = arrays[f'{prefix}_postings_offsets']
+        indices = arrays[f'{prefix}_postings']
+
+        # Offsets int32 (cópia pequena) evitam que o scipy converta os ids para int64
+        if offsets[-1] <= np.iinfo(np.int32).max:
+            offsets = offsets.astype(np.int32)
+        self.matrix = sp.csc_matrix((np.ones(len(indices), dtype=np.int8), indices, offsets),
+                                    shape=(size, len(self.terms)))
+        self.pending = {}
+        self.pending_rows = 0
+        self.size = size
+
+
+class PatternIndex:
+    """
+    Índice vetorizado dos padrões de treinamento
+    A linha i de cada array corresponde a training_patterns[i]
+    Os arrays públicos são visões das primeiras `size` linhas de buffers
+    pré-alocados, que dobram de capacidade quando enchem
+    Os embeddings ficam no modo `storage` (float64, float32 ou int8 com
+    escala por linha); normas e centroides usam as linhas decodificadas
+    """
+
+    def __init__(self, embedding_dim: int = 150, storage: str = DEFAULT_STORAGE):
+        self.embedding_dim = embedding_dim
+        self.storage = storage
+
+        # Arrays por padrão (alinhados com training_patterns)
+        self.embeddings = np.zeros((0, embedding_dim), dtype=storage_dtype(storage))
+        self.embedding_scales = np.zeros(0, dtype=np.float32)
+        self.norms = np.zeros(0, dtype=np.float64)
+        self.confidences = np.zeros(0, dtype=np.float64)
+        self.category_ids = np.zeros(0, dtype=np.int32)
+
+        # Matrizes esparsas padrões x termos e tamanho de cada conjunto
+        self.token_terms = TermMatrix()
+        self.entity_terms = TermMatrix()
+        self.token_counts = np.zeros(0, dtype=np.int32)
+        self.entity_counts = np.zeros(0, dtype=np.int32)
+
+        # Sentimentos: vetor por padrão + tabela de vetores distintos (poucos)
+        self.sentiments = np.zeros((0, len(SENTIMENT_KEYS)), dtype=np.float64)
+        self.sentiment_ids = np.zeros(0, dtype=np.int32)
+        self.sentiment_table = np.zeros((0, len(SENTIMENT_KEYS)), dtype=np.float64)
+        self.sentiment_lookup: Dict[Tuple[float, ...], int] = {}
+
+        # Tabela de categorias (id <-> nome)
+        self.categories: List[str] = []
+        self.category_lookup: Dict[str, int] = {}
+
+        # Soma e contagem dos embeddings por categoria (centroides incrementais);
+        # None = ainda não calculadas (índice carregado sem elas)
+        self.category_sums: Optional[np.ndarray] = np.zeros((0, embedding_dim), dtype=np.float64)
+        self.category_counts: Optional[np.ndarray] = np.zeros(0, dtype=np.int64)
+
+        # Buffers com capacidade reservada; os arrays públicos são visões deles
+        self.buffers: Dict[str, np.ndarray] = {name: getattr(self, name) for name in ROW_ARRAYS}
+        self.capacity = 0
+        self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Número de padrões indexados"""
+        return self._size
+
+    @property
+    def num_categories(self) -> int:
+        """Número de categorias conhecidas"""
+        return len(self.categories)
+
+    def category_id(self, category: str) -> int:
+        """Retorna o id da categoria, registrando-a se for nova"""
+        if category not in self.category_lookup:
+            self.category_lookup[category] = len(self.categories)
+            self.categories.append(category)
+        return self.category_lookup[category]
+
+    def centroids(self) -> np.ndarray:
+        """Centroide de cada categoria (linha = id da categoria)"""
+        self._ensure_category_sums()
+        counts = self.category_counts[:len(self.categories)]
+        return self.category_sums[:len(self.categories)] / np.maximum(counts, 1)[:, None]
+
+    def centroid(self, category: str) -> np.ndarray:
+        """Centroide de uma categoria"""
+        category_id = self.category_lookup[category]
+        self._ensure_category_sums()
+        return self.category_sums[category_id] / max(self.category_counts[category_id], 1)
+
+    @property
+    def embedding_nbytes(self) -> int:
+        """Bytes ocupados pelos embeddings indexados"""
+        return storage_nbytes(self.embeddings, self.embedding_scales)
+
+    def row_embeddings(self, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Embeddings decodificados em float64 (todos ou só as linhas `ids`)"""
+        if ids is None:
+            return decode_rows(self.embeddings, self.embedding_scales)
+        return decode_rows(self.embeddings[ids], self.embedding_scales[ids])
+
+    def set_storage(self, storage: str):
+        """Regrava os embeddings no modo `storage` (int8 -> float não recupera a precisão)"""
+        storage_dtype(storage)
+        if storage == self.storage:
+            return
+        embeddings, scales = encode_rows(self.row_embeddings(), storage)
+        arrays = {name: self.buffers[name][:self._size] for name in ROW_ARRAYS}
+        arrays.update(embeddings=embeddings, embedding_scales=scales,
+                      norms=np.linalg.norm(decode_rows(embeddings, scales), axis=1))
+        self.storage = storage
+        self._adopt_rows(arrays)
+
+    def _adopt_rows(self, arrays: Dict[str, np.ndarray]):
+        """Usa os arrays dados como armazenamento exato (sem capacidade extra)"""
+        self.buffers = {name: arrays[name] for name in ROW_ARRAYS}
+        self._size = self.capacity = arrays['embeddings'].shape[0]
+        self._refresh_views()
+
+    def _refresh_views(self):
+        """Atualiza os arrays públicos como visões das linhas ocupadas"""
+        for name in ROW_ARRAYS:
+            setattr(self, name, self.buffers[name][:self._size])
+
+    def reserve(self, count: int):
+        """Garante espaço para mais `count` padrões (capacidade dobra ao crescer)"""
+        needed = self._size + count
+        writable = all(buffer.flags.writeable for buffer in self.buffers.values())
+        if needed <= self.capacity and writable:
+            return
+
+        capacity = max(MIN_CAPACITY, self.capacity * 2, needed)
+        for name in ROW_ARRAYS:
+            current = self.buffers[name]
+            buffer = np.zeros((capacity,) + current.shape[1:], dtype=current.dtype)
+            buffer[:self._size] = current[:self._size]
+            self.buffers[name] = buffer
+        self.capacity = capacity
+        self._refresh_views()
+
+    def _recompute_category_sums(self):
+        """Recalcula somas e contagens por categoria a partir dos arrays"""
+        num_categories = len(self.categories)
+        self.category_sums = np.zeros((num_categories, self.embedding_dim), dtype=np.float64)
+        np.add.at(self.category_sums, self.category_ids, self.row_embeddings())
+        self.category_counts = np.bincount(self.category_ids, minlength=num_categories).astype(np.int64)
+
+    def _ensure_category_sums(self):
+        """Calcula somas e contagens na primeira consulta (índice carregado sem elas)"""
+        if self.category_sums is None:
+            self._recompute_category_sums()
+
+    def _add_to_category(self, category_id: int, embedding: np.ndarray):
+        """Atualiza a soma corrente da categoria com um novo embedding"""
+        self._ensure_category_sums()
+        # Cresce a tabela ou copia a adotada do snapshot/memória compartilhada (somente leitura)
+        if category_id >= self.category_sums.shape[0] or not self.category_sums.flags.writeable:
+            capacity = max(category_id + 1, self.category_sums.shape[0] * 2)
+            sums = np.zeros((capacity, self.embedding_dim), dtype=np.float64)
+            sums[:self.category_sums.shape[0]] = self.category_sums
+            counts = np.zeros(capacity, dtype=np.int64)
+            counts[:self.category_counts.shape[0]] = self.category_counts
+            self.category_sums, self.category_counts = sums, counts
+        self.category_sums[category_id] += embedding
+        self.category_counts[category_id] += 1
+
+    @staticmethod
+    def semantic_terms(processed: Dict[str, Any]) -> Tuple[Set[str], Set[str]]:
+        """Conjuntos de tokens e entidades usados na similaridade semântica"""
+        entities = processed['entities']
+        return set(processed['tokens']), set(entities['enderecos'] + entities['servicos'])
+
+    @staticmethod
+    def sentiment_vector(processed: Dict[str, Any]) -> np.ndarray:
+        """Vetor de sentimento na ordem de SENTIMENT_KEYS"""
+        sentiment = processed['sentiment']
+        return np.array([sentiment[key] for key in SENTIMENT_KEYS], dtype=np.float64)
+
+    def _set_sentiment_table(self, table: np.ndarray):
+        self.sentiment_table = table
+        self.sentiment_lookup = {tuple(row): i for i, row in enumerate(table.tolist())}
+
+    def sentiment_id(self, vector: np.ndarray) -> int:
+        """Id do vetor de sentimento na tabela, registrando-o se for novo"""
+        key = tuple(vector.tolist())
+        sentiment_id = self.sentiment_lookup.get(key)
+        if sentiment_id is None:
+            sentiment_id = self.sentiment_lookup[key] = len(self.sentiment_table)
+            self.sentiment_table = np.vstack([self.sentiment_table, vector])
+        return sentiment_id
+
+    def build(self, patterns: List[Dict[str, Any]]):
+        """Reconstrói o índice completo a partir da lista de padrões"""
+        self.categories = []
+        self.category_lookup = {}
+        self.token_terms = TermMatrix()
+        self.entity_terms = TermMatrix()
+
+        count = len(patterns)
+        embeddings = np.zeros((count, self.embedding_dim), dtype=np.float64)
+        confidences = np.zeros(count, dtype=np.float64)
+        category_ids = np.zeros(count, dtype=np.int32)
+        token_counts = np.zeros(count, dtype=np.int32)
+        entity_counts = np.zeros(count, dtype=np.int32)
+        sentiments = np.zeros((count, len(SENTIMENT_KEYS)), dtype=np.float64)
+
+        for i, pattern in enumerate(patterns):
+            embeddings[i] = pattern['embedding']
+            confidences[i] = pattern['confidence']
+            category_ids[i] = self.category_id(pattern['category'])
+
+            tokens, entities = self.semantic_terms(pattern['processed'])
+            self.token_terms.append(tokens, i)
+            self.entity_terms.append(entities, i)
+            token_counts[i] = len(tokens)
+            entity_counts[i] = len(entities)
+            sentiments[i] = self.sentiment_vector(pattern['processed'])
+
+        self.token_terms.fold()
+        self.entity_terms.fold()
+        sentiment_table, sentiment_ids = first_seen_unique(sentiments)
+        self._set_sentiment_table(sentiment_table)
+
+        embeddings, scales = encode_rows(embeddings, self.storage)
+        self._adopt_rows({
+            'embeddings': embeddings,
+            'embedding_scales': scales,
+            'norms': np.linalg.norm(decode_rows(embeddings, scales), axis=1),
+            'confidences': confidences,
+            'category_ids': category_ids,
+            'token_counts': token_counts,
+            'entity_counts': entity_counts,
+            'sentiments': sentiments,
+            'sentiment_ids': sentiment_ids
+        })
+        self._recompute_category_sums()
+
+    def add(self, pattern: Dict[str, Any]):
+        """Adiciona um padrão ao final do índice (O(1) amortizado)"""
+        self.reserve(1)
+        pattern_id = self._size
+        embedding, scale = encode_rows(pattern['embedding'], self.storage)
+        row = decode_rows(embedding, scale)
+        category_id = self.category_id(pattern['category'])
+        tokens, entities = self.semantic_terms(pattern['processed'])
+
+        buffers = self.buffers
+        buffers['embeddings'][pattern_id] = embedding
+        buffers['embedding_scales'][pattern_id] = scale
+        buffers['norms'][pattern_id] = np.linalg.norm(row)
+        buffers['confidences'][pattern_id] = pattern['confidence']
+        buffers['category_ids'][pattern_id] = category_id
+        buffers['token_counts'][pattern_id] = len(tokens)
+        buffers['entity_counts'][pattern_id] = len(entities)
+        sentiment = self.sentiment_vector(pattern['processed'])
+        buffers['sentiments'][pattern_id] = sentiment
+        buffers['sentiment_ids'][pattern_id] = self.sentiment_id(sentiment)
+
+        self.token_terms.append(tokens, pattern_id)
+        self.entity_terms.append(entities, pattern_id)
+        if self.token_terms.pending_rows >= PENDING_LIMIT:
+            self.token_terms.fold()
+            self.entity_terms.fold()
+        self._add_to_category(category_id, row)
+
+        self._size += 1
+        self._refresh_views()
+
+    def export_arrays(self) -> Dict[str, np.ndarray]:
+        """Representação plana do índice (listas invertidas em formato CSR)"""
+        arrays = {
+            'embeddings': self.embeddings,
+            'embedding_scales': self.embedding_scales,
+            'norms': self.norms,
+            'confidences': self.confidences,
+            'category_ids': self.category_ids,
+            'token_counts': self.token_counts,
+            'entity_counts': self.entity_counts,
+            'sentiments': self.sentiments,
+            'sentiment_ids': self.sentiment_ids,
+            'sentiment_table': self.sentiment_table
+        }
+        self._ensure_category_sums()
+        arrays['category_sums'] = self.category_sums[:self.num_categories]
+        arrays['category_counts'] = self.category_counts[:self.num_categories]
+        arrays['categories_blob'], arrays['categories_offsets'] = encode_strings(self.categories)
+        arrays.update(self.token_terms.export_arrays('token'))
+        arrays.update(self.entity_terms.export_arrays('entity'))
+        return arrays
+
+    def load_arrays(self, arrays: Dict[str, np.ndarray]):
+        """
+        Adota os arrays planos sem copiá-los (listas invertidas viram matrizes CSC)
+        O primeiro add() copia as linhas para buffers graváveis
+        """
+        if 'sentiment_ids' not in arrays:
+            # Índice gravado antes da tabela de sentimentos
+            sentiment_table, sentiment_ids = first_seen_unique(np.asarray(arrays['sentiments']))
+            arrays = dict(arrays, sentiment_ids=sentiment_ids, sentiment_table=sentiment_table)
+        if 'embedding_scales' not in arrays:
+            # Índice gravado antes do armazenamento quantizado (embeddings em float)
+            arrays = dict(arrays, embedding_scales=np.ones(len(arrays['embeddings']), dtype=np.float32))
+        self.storage = storage_of(np.asarray(arrays['embeddings']))
+        self._adopt_rows(arrays)
+        self._set_sentiment_table(np.asarray(arrays['sentiment_table']))
+
+        self.categories = decode_strings(arrays['categories_blob'], arrays['categories_offsets'])
+        self.category_lookup = {category: i for i, category in enumerate(self.categories)}
+        if 'category_sums' in arrays:
+            self.category_sums = arrays['category_sums']
+            self.category_counts = arrays['category_counts']
+        else:
+            # Índice gravado sem as somas: calculadas no primeiro centroide ou add()
+            self.category_sums = self.category_counts = None
+
+        self.token_terms.load_arrays(arrays, 'token', self.size)
+        self.entity_terms.load_arrays(arrays, 'entity', self.size)
+
+    def cosine_scores(self, query_embeddings: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Similaridade cosseno contra todos os padrões (ou só contra `ids`)
+        Aceita um vetor (produto matriz-vetor) ou uma matriz de consultas (matriz-matriz)
+        """
+        if self.storage == 'int8':
+            return self.quantized_cosine_scores(query_embeddings, ids)
+        queries = np.asarray(query_embeddings, dtype=self.embeddings.dtype)
+        if queries.ndim == 1:
+            embeddings = self.embeddings if ids is None else self.embeddings[ids]
+            norms = self.norms if ids is None else self.norms[ids]
+            dots = (embeddings @ queries).astype(np.float64)
+            query_norm = np.linalg.norm(queries.astype(np.float64))
+            return dots / (norms * query_norm + 1e-8)
+
+        dots = (queries @ self.embeddings.T).astype(np.float64)
+        query_norms = np.linalg.norm(queries.astype(np.float64), axis=1, keepdims=True)
+        return dots / (self.norms * query_norms + 1e-8)
+
+    def quantized_cosine_scores(self, query_embeddings: np.ndarray,
+                                ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Cosseno sobre os códigos int8: produto em float32 por bloco, escala por linha depois"""
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        codes = self.embeddings if ids is None else self.embeddings[ids]
+        scales = self.embedding_scales if ids is None else self.embedding_scales[ids]
+        norms = self.norms if ids is None else self.norms[ids]
+
+        dots = quantized_products(codes, queries).astype(np.float64) * scales
+        if queries.ndim == 1:
+            query_norm = np.linalg.norm(queries.astype(np.float64))
+            return dots / (norms * query_norm + 1e-8)
+        query_norms = np.linalg.norm(queries.astype(np.float64), axis=1, keepdims=True)
+        return dots / (norms * query_norms + 1e-8)
+
+    def jaccard_scores(self, term_matrix: TermMatrix, terms: Set[str],
+                       term_counts: np.ndarray, ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Jaccard da consulta contra os padrões; só candidatos com interseção são calculados"""
+        intersections = term_matrix.overlap_counts(terms, self.size, ids)
+        candidates = np.flatnonzero(intersections)
+        if ids is not None:
+            term_counts = term_counts[ids]
+
+        scores = np.zeros(len(intersections))
+        if candidates.size:
+            shared = intersections[candidates]
+            unions = len(terms) + term_counts[candidates] - shared
+            scores[candidates] = shared / (unions + 1e-8)
+        return scores
+
+    def semantic_scores(self, processed: Dict[str, Any], ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Similaridade semântica contra todos os padrões (ou só contra `ids`, ordenados)
+        Padrões sem termos em comum recebem apenas o termo de sentimento
+        """
+        tokens, entities = self.semantic_terms(processed)
+
+        entity_sims = self.jaccard_scores(self.entity_terms, entities, self.entity_counts, ids)
+        token_sims = self.jaccard_scores(self.token_terms, tokens, self.token_counts, ids)
+
+        sentiment_ids = self.sentiment_ids if ids is None else self.sentiment_ids[ids]
+        sentiment_sims = self.sentiment_similarities(processed)[sentiment_ids]
+
+        return 0.5 * entity_sims + 0.3 * token_sims + 0.2 * sentiment_sims
+
+    def sentiment_similarities(self, processed: Dict[str, Any]) -> np.ndarray:
+        """Similaridade de sentimento contra cada vetor distinto da tabela (distância L1)"""
+        sentiment_distance = np.abs(self.sentiment_table - self.sentiment_vector(processed)).sum(axis=1)
+        return 1.0 - sentiment_distance / len(SENTIMENT_KEYS)
+
+    def semantic_upper_bound(self, processed: Dict[str, Any]) -> float:
+        """
+        Maior similaridade semântica que algum padrão pode ter com a consulta:
+        Jaccard no máximo 1 (0 se a consulta não tem termos) e o melhor sentimento da tabela
+        """
+        tokens, entities = self.semantic_terms(processed)
+        sentiment_sims = self.sentiment_similarities(processed)
+        best_sentiment = float(sentiment_sims.max()) if sentiment_sims.size else 0.0
+        return 0.5 * float(bool(entities)) + 0.3 * float(bool(tokens)) + 0.2 * best_sentiment
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+SHOPEE PHRASE AUTOMATON - Autômato Aho–Corasick de Frases
+Todas as frases (intenções, indicadores fortes) compiladas em um único
+autômato; uma passada pelo texto devolve os rótulos de todas as frases
+encontradas como substring, com custo linear no tamanho da mensagem
+independente do número de frases
+"""
+
+from typing import List, Dict, Tuple, Set, FrozenSet, Hashable, Iterable
+from collections import deque
+
+
+class PhraseAutomaton:
+    """
+    Aho–Corasick por caractere com transições completas (sem laço de falha na busca)
+    Cada frase leva um rótulo; a mesma frase pode ter vários rótulos
+    """
+
+    def __init__(self, phrases: Iterable[Tuple[str, Hashable]] = ()):
+        self.transitions: List[Dict[str, int]] = [{}]
+        self.outputs: List[FrozenSet[Hashable]] = [frozenset()]
+        self.phrase_count = 0
+
+        pending_outputs: List[Set[Hashable]] = [set()]
+        for phrase, label in phrases:
+            node = 0
+            for char in phrase:
+                next_node = self.transitions[node].get(char)
+                if next_node is None:
+                    next_node = len(self.transitions)
+                    self.transitions[node][char] = next_node
+                    self.transitions.append({})
+                    pending_outputs.append(set())
+                node = next_node
+            if phrase:
+                pending_outputs[node].add(label)
+                self.phrase_count += 1
+
+        self.build(pending_outputs)
+
+    def build(self, pending_outputs: List[Set[Hashable]]):
+        """
+        Links de falha em largura; cada estado herda as saídas e as transições
+        que lhe faltam do seu estado de falha (já completo, por ser mais raso)
+        """
+        fail = [0] * len(self.transitions)
+        queue = deque(self.transitions[0].values())
+
+        while queue:
+            node = queue.popleft()
+            edges = self.transitions[node]
+            fallback = self.transitions[fail[node]]
+            for char, child in edges.items():
+                fail[child] = fallback.get(char, 0)
+                pending_outputs[child] |= pending_outputs[fail[child]]
+                queue.append(child)
+            self.transitions[node] = {**fallback, **edges}
+
+        self.outputs = [frozenset(labels) for labels in pending_outputs]
+
+    def search(self, text: str) -> Set[Hashable]:
+        """Rótulos de todas as frases que ocorrem no texto (uma passada)"""
+        transitions = self.transitions
+        outputs = self.outputs
+        found: Set[Hashable] = set()
+
+        node = 0
+        for char in text:
+            node = transitions[node].get(char, 0)
+            if outputs[node]:
+                found |= outputs[node]
+        return found
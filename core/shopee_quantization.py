@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+SHOPEE QUANTIZATION - Armazenamento Compacto de Embeddings
+Modos de armazenamento das matrizes de embeddings: float64 (referência),
+float32 (padrão, metade da memória) e int8 com uma escala por linha
+(um oitavo da memória); o cosseno é calculado direto sobre os códigos int8,
+convertidos para float32 em blocos pequenos que cabem no cache
+"""
+
+import numpy as np
+from typing import Tuple
+
+# Modos de armazenamento e o dtype de cada um
+STORAGE_DTYPES = {
+    'float64': np.float64,
+    'float32': np.float32,
+    'int8': np.int8
+}
+
+DEFAULT_STORAGE = 'float32'
+
+# Maior código int8 usado (simétrico: -127..127)
+INT8_LEVELS = 127
+
+# Linhas convertidas por bloco no produto sobre códigos int8
+QUANTIZED_BLOCK = 1024
+
+
+def storage_dtype(storage: str) -> type:
+    """dtype da matriz de embeddings para o modo de armazenamento"""
+    if storage not in STORAGE_DTYPES:
+        raise ValueError(f"Armazenamento desconhecido: {storage} (use {', '.join(STORAGE_DTYPES)})")
+    return STORAGE_DTYPES[storage]
+
+
+def storage_of(matrix: np.ndarray) -> str:
+    """Modo de armazenamento de uma matriz já gravada (pelo dtype)"""
+    for storage, dtype in STORAGE_DTYPES.items():
+        if matrix.dtype == dtype:
+            return storage
+    raise ValueError(f"dtype de embeddings sem modo de armazenamento: {matrix.dtype}")
+
+
+def quantize_rows(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quantização int8 simétrica por linha: linha ≈ códigos * escala
+    A escala é max|linha| / 127 (linhas nulas ficam com escala 1)
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.ndim == 1:
+        codes, scales = quantize_rows(matrix.reshape(1, -1))
+        return codes[0], scales[0]
+    peaks = np.abs(matrix).max(axis=1) if matrix.shape[1] else np.zeros(matrix.shape[0])
+    scales = np.where(peaks > 0, peaks / INT8_LEVELS, 1.0).astype(np.float32)
+    codes = np.rint(matrix / scales[:, None].astype(np.float64))
+    codes = np.clip(codes, -INT8_LEVELS, INT8_LEVELS).astype(np.int8)
+    return codes, scales
+
+
+def encode_rows(matrix: np.ndarray, storage: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Linhas no modo de armazenamento: (matriz gravada, escala por linha)"""
+    if storage_dtype(storage) is np.int8:
+        return quantize_rows(matrix)
+    matrix = np.asarray(matrix, dtype=storage_dtype(storage))
+    scale_shape = matrix.shape[:1] if matrix.ndim == 2 else ()
+    return matrix, np.ones(scale_shape, dtype=np.float32)
+
+
+def decode_rows(stored: np.ndarray, scales: np.ndarray) -> np.ndarray:
+    """Linhas em float64 a partir da matriz gravada e das escalas"""
+    if stored.dtype != np.int8:
+        return stored.astype(np.float64)
+    scales = np.asarray(scales, dtype=np.float64)
+    return stored.astype(np.float64) * (scales[..., None] if stored.ndim == 2 else scales)
+
+
+def quantized_products(codes: np.ndarray, queries: np.ndarray,
+                       block: int = QUANTIZED_BLOCK) -> np.ndarray:
+    """
+    codes @ queries.T com os códigos int8 convertidos para float32 bloco a bloco
+    (a matriz inteira nunca é expandida); queries: vetor ou matriz float32
+    Retorna (linhas,) para um vetor ou (consultas x linhas) para uma matriz
+    """
+    queries = np.asarray(queries, dtype=np.float32)
+    if queries.ndim == 1:
+        products = np.empty(codes.shape[0], dtype=np.float32)
+        for start in range(0, codes.shape[0], block):
+            rows = codes[start:start + block].astype(np.float32)
+            products[start:start + rows.shape[0]] = rows @ queries
+        return products
+
+    products = np.empty((queries.shape[0], codes.shape[0]), dtype=np.float32)
+    for start in range(0, codes.shape[0], block):
+        rows = codes[start:start + block].astype(np.float32)
+        products[:, start:start + rows.shape[0]] = queries @ rows.T
+    return products
+
+
+def storage_nbytes(stored: np.ndarray, scales: np.ndarray) -> int:
+    """Bytes ocupados pelos embeddings (códigos + escalas no modo int8)"""
+    if stored.dtype != np.int8:
+        return int(stored.nbytes)
+    return int(stored.nbytes + scales.nbytes)
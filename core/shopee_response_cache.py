@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+SHOPEE RESPONSE CACHE - Cache de Respostas com LRU e TTL
+Mensagens repetidas ("olá", "onde está meu pedido") reaproveitam o
+resultado da busca; a chave inclui as categorias recentes da sessão,
+que alteram o score via context_similarity, e os parâmetros de busca
+"""
+
+import time
+import threading
+from collections import Counter, OrderedDict
+from typing import List, Dict, Tuple, Optional, Any, Iterable
+
+# Entradas mantidas e tempo de vida de cada uma (segundos)
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 600.0
+
+# Consultas distintas contadas antes de descartar as menos frequentes
+MAX_TRACKED_FACTOR = 8
+
+
+def normalize_query(text: str) -> str:
+    """Texto normalizado da mensagem (minúsculas, espaços simples)"""
+    return ' '.join(text.lower().split())
+
+
+def context_signature(recent_categories: Iterable[str]) -> Tuple[str, ...]:
+    """Assinatura compacta das categorias recentes (ordem e repetição não importam)"""
+    return tuple(sorted(set(recent_categories)))
+
+
+class ResponseCache:
+    """
+    Cache (texto normalizado, assinatura de contexto, parâmetros de busca) -> resultado
+    Entradas expiram após `ttl` segundos e as menos usadas saem primeiro;
+    também conta a frequência das consultas para pré-aquecimento
+    A geração avança a cada invalidação: resultados calculados antes dela
+    não voltam ao cache
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self.entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self.query_counts: Counter = Counter()
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.generation = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def make_key(self, text: str, recent_categories: Iterable[str] = (),
+                 search_settings: Tuple = ()) -> Tuple:
+        """Chave do cache para a mensagem no contexto e modo de busca atuais"""
+        return normalize_query(text), context_signature(recent_categories), tuple(search_settings)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        """Resultado em cache (ou None) e contagem da consulta"""
+        with self.lock:
+            self._count_query(key[0])
+
+            entry = self.entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if time.monotonic() - stored_at <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self.entries[key]
+                self.expirations += 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple, value: Any, generation: Optional[int] = None):
+        """
+        Guarda um resultado, descartando os menos usados acima do limite
+        generation: geração lida antes de calcular o resultado; se houve
+        invalidação no meio do cálculo o resultado é descartado
+        """
+        if self.max_entries <= 0:
+            return
+        with self.lock:
+            if generation is not None and generation != self.generation:
+                return
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self):
+        """Descarta todos os resultados (o índice de padrões mudou)"""
+        with self.lock:
+            self.entries.clear()
+            self.invalidations += 1
+            self.generation += 1
+
+    def _count_query(self, text: str):
+        """Conta a consulta mantendo o contador limitado"""
+        self.query_counts[text] += 1
+        limit = max(self.max_entries, 1) * MAX_TRACKED_FACTOR
+        if len(self.query_counts) > limit:
+            self.query_counts = Counter(dict(self.query_counts.most_common(limit // 2)))
+
+    def most_frequent(self, limit: Optional[int] = None) -> List[Tuple[str, int]]:
+        """Consultas mais frequentes: [(texto normalizado, contagem)]"""
+        with self.lock:
+            return self.query_counts.most_common(limit or self.max_entries)
+
+    def load_counts(self, counts: Iterable[Tuple[str, int]]):
+        """Restaura contagens salvas (histórico de consultas de execuções anteriores)"""
+        with self.lock:
+            for text, count in counts:
+                self.query_counts[normalize_query(text)] += int(count)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do cache"""
+        total = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'max_entries': self.max_entries,
+            'ttl': self.ttl,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'tracked_queries': len(self.query_counts)
+        }
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+SHOPEE SERVER - Servidor HTTP Assíncrono
+Expõe o ShopeeNeuralAI via HTTP/1.1 com conexões keep-alive usando apenas
+asyncio da biblioteca padrão; a pontuação roda em um executor para não
+bloquear o loop de eventos
+"""
+
+import json
+import time
+import socket
+import asyncio
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Optional, Any
+
+import numpy as np
+
+from shopee_metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+
+# Limites de proteção do servidor
+MAX_BODY_SIZE = 1024 * 1024
+MAX_HEADERS = 100
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error'
+}
+
+
+class HTTPError(Exception):
+    """Erro HTTP com status e mensagem para o cliente"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class ShopeeChatServer:
+    """
+    Servidor HTTP assíncrono para atendimento
+    Endpoints: POST /chat, POST /learn, GET /stats, GET /health, GET /metrics
+    """
+
+    def __init__(self, ai_system, host: str = '127.0.0.1', port: int = 8080,
+                 workers: int = 1, idle_timeout: float = 75.0, backlog: int = 4096,
+                 sock: Optional[socket.socket] = None):
+        self.ai_system = ai_system
+        self.host = host
+        self.port = port
+        self.sock = sock
+        self.idle_timeout = idle_timeout
+        self.backlog = backlog
+
+        # Um único worker serializa buscas e aprendizado sobre o índice compartilhado
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='shopee-score')
+
+        self.routes = {
+            ('POST', '/chat'): self.handle_chat,
+            ('POST', '/learn'): self.handle_learn,
+            ('GET', '/stats'): self.handle_stats,
+            ('GET', '/health'): self.handle_health,
+            ('GET', '/metrics'): self.handle_metrics
+        }
+
+        # Métricas do servidor
+        self.open_connections = 0
+        self.total_connections = 0
+        self.total_requests = 0
+        self.latencies = deque(maxlen=10000)
+        self.started_at = time.time()
+
+        # Métricas HTTP no mesmo registro do sistema (exportadas em /metrics)
+        metrics = ai_system.metrics
+        self.request_latency = metrics.histogram('shopee_http_request_duration_seconds',
+                                                 'Duração das requisições HTTP', ('path', 'status'))
+        metrics.gauge_function('shopee_http_open_connections', 'Conexões HTTP abertas',
+                               lambda: self.open_connections)
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.logger = logging.getLogger('ShopeeNeuralAI.server')
+
+    async def start(self):
+        """Abre o socket (ou usa o socket herdado) e começa a aceitar conexões"""
+        if self.sock is not None:
+            self.server = await asyncio.start_server(
+                self.handle_connection, sock=self.sock, backlog=self.backlog)
+            return
+
+        self.server = await asyncio.start_server(
+            self.handle_connection, self.host, self.port, backlog=self.backlog)
+        self.logger.info(f"🌐 Servidor ouvindo em http://{self.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Atende conexões até ser cancelado"""
+        if self.server is None:
+            await self.start()
+
+        eviction_task = asyncio.create_task(self.evict_sessions_periodically())
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            eviction_task.cancel()
+            self.executor.shutdown(wait=False)
+
+    def run(self):
+        """Executa o servidor bloqueando a thread atual"""
+        try:
+            asyncio.run(self.serve_forever())
+        except KeyboardInterrupt:
+            self.logger.info("👋 Servidor encerrado")
+
+    async def evict_sessions_periodically(self, interval: float = 60.0):
+        """Remove sessões inativas em segundo plano"""
+        while True:
+            await asyncio.sleep(interval)
+            self.ai_system.sessions.evict_expired()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Atende uma conexão, processando várias requisições enquanto keep-alive"""
+        self.open_connections += 1
+        self.total_connections += 1
+        connection_session = f"conn-{self.total_connections}"
+
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self.read_request(reader), self.idle_timeout)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError,
+                        asyncio.LimitOverrunError, ConnectionError, ValueError):
+                    break
+                except HTTPError as e:
+                    await self.write_response(writer, e.status, {'error': e.message}, keep_alive=False)
+                    break
+
+                if request is None:
+                    break
+
+                method, path, headers, body, keep_alive = request
+                start_time = time.perf_counter()
+
+                try:
+                    handler = self.routes.get((method, path))
+                    if handler is None:
+                        known_path = any(route_path == path for _, route_path in self.routes)
+                        raise HTTPError(405 if known_path else 404, f"{method} {path} não suportado")
+                    status, payload = 200, await handler(body, connection_session)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': e.message}
+                except Exception as e:
+                    self.logger.error(f"Erro ao processar {method} {path}: {e}")
+                    status, payload = 500, {'error': 'erro interno'}
+
+                latency = time.perf_counter() - start_time
+                self.total_requests += 1
+                self.latencies.append(latency)
+                route = path if (method, path) in self.routes else 'desconhecida'
+                self.request_latency.labels(route, str(status)).observe(latency)
+
+                await self.write_response(writer, status, payload, keep_alive, latency)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.open_connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def read_request(self, reader: asyncio.StreamReader
+                           ) -> Optional[Tuple[str, str, Dict[str, str], bytes, bool]]:
+        """Lê e interpreta uma requisição HTTP/1.x"""
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+
+        try:
+            method, target, version = request_line.decode('latin-1').strip().split(' ')
+        except ValueError:
+            raise HTTPError(400, 'linha de requisição inválida')
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(400, 'cabeçalhos demais')
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            content_length = int(headers.get('content-length', '0'))
+        except ValueError:
+            raise HTTPError(400, 'content-length inválido')
+        if content_length < 0:
+            raise HTTPError(400, 'content-length inválido')
+        if content_length > MAX_BODY_SIZE:
+            raise HTTPError(413, 'corpo da requisição muito grande')
+        body = await reader.readexactly(content_length) if content_length else b''
+
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            keep_alive = connection == 'keep-alive'
+        else:
+            keep_alive = connection != 'close'
+
+        path = target.split('?', 1)[0]
+        return method.upper(), path, headers, body, keep_alive
+
+    async def write_response(self, writer: asyncio.StreamWriter, status: int, payload: Any,
+                             keep_alive: bool = True, latency: Optional[float] = None):
+        """Escreve uma resposta JSON (ou texto, se payload for str)"""
+        if isinstance(payload, str):
+            body, content_type = payload.encode('utf-8'), METRICS_CONTENT_TYPE
+        else:
+            body = json.dumps(payload, ensure_ascii=False, default=self.json_default).encode('utf-8')
+            content_type = "application/json; charset=utf-8"
+        headers = [
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, 'OK')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"
+        ]
+        if latency is not None:
+            headers.append(f"X-Processing-Time: {latency * 1000:.3f}ms")
+
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    @staticmethod
+    def json_default(value: Any) -> Any:
+        """Converte tipos NumPy para JSON"""
+        if isinstance(value, np.generic):
+            return value.item()
+        if isinstance(value, np.ndarray):
+            return value.tolist()
+        raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+    @staticmethod
+    def parse_json(body: bytes) -> Dict[str, Any]:
+        """Interpreta o corpo JSON da requisição"""
+        try:
+            data = json.loads(body.decode('utf-8')) if body else {}
+        except (UnicodeDecodeError, json.JSONDecodeError):
+            raise HTTPError(400, 'JSON inválido')
+        if not isinstance(data, dict):
+            raise HTTPError(400, 'JSON deve ser um objeto')
+        return data
+
+    async def run_in_executor(self, function, *args):
+        """Executa trabalho de CPU fora do loop de eventos"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, function, *args)
+
+    async def handle_chat(self, body: bytes, connection_session: str) -> Dict[str, Any]:
+        """POST /chat {"message": "...", "session_id": "..."}"""
+        data = self.parse_json(body)
+        message = data.get('message')
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "campo 'message' obrigatório")
+
+        session_id = str(data.get('session_id') or connection_session)
+        session = self.ai_system.get_session(session_id)
+
+        result = await self.run_in_executor(self.ai_system.handle_message, message.strip(), session)
+        result['session_id'] = session_id
+        return result
+
+    async def handle_learn(self, body: bytes, connection_session: str) -> Dict[str, Any]:
+        """POST /learn {"question": "...", "response": "...", "category": "..."}"""
+        data = self.parse_json(body)
+        question = data.get('question')
+        response = data.get('response')
+        category = data.get('category', 'geral')
+        if not isinstance(question, str) or not isinstance(response, str):
+            raise HTTPError(400, "campos 'question' e 'response' obrigatórios")
+
+        learned = await self.run_in_executor(self.ai_system.dynamic_learning,
+                                             question.strip(), response.strip(), str(category))
+        return {'learned': bool(learned), 'total_patterns': len(self.ai_system.training_patterns)}
+
+    async def handle_stats(self, body: bytes, connection_session: str) -> Dict[str, Any]:
+        """GET /stats"""
+        stats = await self.run_in_executor(self.ai_system.get_detailed_stats)
+        stats['server'] = self.get_server_stats()
+        return stats
+
+    async def handle_health(self, body: bytes, connection_session: str) -> Dict[str, Any]:
+        """GET /health (respondido no próprio loop, sem passar pelo executor)"""
+        return {
+            'status': 'ok',
+            'patterns': len(self.ai_system.training_patterns),
+            'open_connections': self.open_connections,
+            'uptime': time.time() - self.started_at
+        }
+
+    async def handle_metrics(self, body: bytes, connection_session: str) -> str:
+        """GET /metrics (formato texto do Prometheus, sem passar pelo executor)"""
+        return self.ai_system.metrics.render()
+
+    def get_server_stats(self) -> Dict[str, Any]:
+        """Estatísticas de conexões e latência por requisição"""
+        stats = {
+            'open_connections': self.open_connections,
+            'total_connections': self.total_connections,
+            'total_requests': self.total_requests
+        }
+
+        if self.latencies:
+            latencies_ms = np.array(self.latencies) * 1000
+            stats['latency_ms'] = {
+                'p50': float(np.percentile(latencies_ms, 50)),
+                'p95': float(np.percentile(latencies_ms, 95)),
+                'p99': float(np.percentile(latencies_ms, 99)),
+                'max': float(latencies_ms.max())
+            }
+
+        return stats
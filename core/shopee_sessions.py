@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+SHOPEE SESSIONS - Estado de Conversa por Cliente
+Separa o contexto de cada conversa do modelo treinado compartilhado,
+permitindo que uma única instância atenda vários clientes ao mesmo tempo
+"""
+
+import time
+import threading
+import numpy as np
+from collections import defaultdict, deque, OrderedDict
+from datetime import datetime
+from typing import List, Dict, Optional, Any
+
+
+class ConversationSession:
+    """
+    Estado leve de uma conversa
+    Histórico de interações, memória de contexto neural e estatísticas da sessão
+    """
+
+    def __init__(self, session_id: str, embedding_dim: int = 150,
+                 context_window: int = 10, history_size: int = 20):
+        self.session_id = session_id
+        self.embedding_dim = embedding_dim
+
+        # Histórico de interações (usado por context_similarity)
+        self.conversation_context = deque(maxlen=history_size)
+
+        # Memória de contexto neural com soma corrente dos embeddings
+        self.context_memory = deque(maxlen=context_window)
+        self.context_sum = np.zeros(embedding_dim)
+
+        # Estatísticas da sessão
+        self.session_stats = defaultdict(int)
+        self.performance_metrics = defaultdict(float)
+
+        self.created_at = time.time()
+        self.last_active = self.created_at
+
+    def touch(self):
+        """Marca a sessão como ativa agora"""
+        self.last_active = time.time()
+
+    def remember_embedding(self, embedding: np.ndarray):
+        """Adiciona um embedding à memória de contexto mantendo a soma corrente"""
+        if len(self.context_memory) == self.context_memory.maxlen:
+            self.context_sum -= self.context_memory[0]
+        self.context_memory.append(embedding)
+        self.context_sum += embedding
+
+    def context_vector(self) -> Optional[np.ndarray]:
+        """Vetor médio da memória de contexto, ou None se vazia"""
+        if not self.context_memory:
+            return None
+        return self.context_sum / len(self.context_memory)
+
+    def recent_categories(self, count: int = 3) -> List[str]:
+        """Categorias das interações mais recentes"""
+        history = self.conversation_context
+        start = max(len(history) - count, 0)
+        return [history[i].get('category', '') for i in range(start, len(history))]
+
+    def record_interaction(self, user_input: str, response: str, confidence: float,
+                           category: str, processing_time: float):
+        """Registra uma interação no histórico e nas estatísticas da sessão"""
+        self.conversation_context.append({
+            'user_input': user_input,
+            'response': response,
+            'confidence': confidence,
+            'category': category,
+            'timestamp': datetime.now().isoformat(),
+            'processing_time': processing_time
+        })
+
+        self.session_stats['total_queries'] += 1
+        self.session_stats[f'category_{category}'] += 1
+
+        if confidence > 0.6:
+            self.session_stats['successful_responses'] += 1
+
+    def reset(self):
+        """Limpa o contexto da conversa"""
+        self.conversation_context.clear()
+        self.context_memory.clear()
+        self.context_sum = np.zeros(self.embedding_dim)
+
+
+class SessionManager:
+    """
+    Gerenciador de sessões com expiração por inatividade e limite de quantidade
+    As sessões menos recentemente usadas são removidas primeiro
+    """
+
+    def __init__(self, embedding_dim: int = 150, context_window: int = 10,
+                 max_sessions: int = 10000, idle_ttl: float = 1800.0):
+        self.embedding_dim = embedding_dim
+        self.context_window = context_window
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+
+        self.sessions: "OrderedDict[str, ConversationSession]" = OrderedDict()
+        self.evicted_sessions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self.sessions
+
+    def get(self, session_id: str) -> ConversationSession:
+        """Retorna a sessão existente ou cria uma nova"""
+        with self.lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = ConversationSession(session_id, self.embedding_dim, self.context_window)
+                self.sessions[session_id] = session
+            else:
+                self.sessions.move_to_end(session_id)
+            session.touch()
+
+            self._evict_locked(session.last_active)
+            return session
+
+    def remove(self, session_id: str) -> bool:
+        """Remove uma sessão explicitamente"""
+        with self.lock:
+            return self.sessions.pop(session_id, None) is not None
+
+    def evict_expired(self) -> int:
+        """Remove sessões inativas há mais de idle_ttl segundos"""
+        with self.lock:
+            return self._evict_locked(time.time())
+
+    def _evict_locked(self, now: float) -> int:
+        """Remove do início da fila (menos recentes) enquanto expiradas ou acima do limite"""
+        evicted = 0
+        while self.sessions:
+            oldest_id, oldest = next(iter(self.sessions.items()))
+            expired = now - oldest.last_active > self.idle_ttl
+            if not expired and len(self.sessions) <= self.max_sessions:
+                break
+            del self.sessions[oldest_id]
+            evicted += 1
+
+        self.evicted_sessions += evicted
+        return evicted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estatísticas do gerenciador de sessões"""
+        return {
+            'active_sessions': len(self.sessions),
+            'evicted_sessions': self.evicted_sessions,
+            'max_sessions': self.max_sessions,
+            'idle_ttl': self.idle_ttl
+        }
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+SHOPEE SHARED INDEX - Índice em Memória Compartilhada
+O processo pai carrega o índice uma única vez e o publica em um segmento
+de multiprocessing.shared_memory; os workers do servidor (pré-fork) se
+anexam a ele somente leitura, sem copiar embeddings, pesos ou vocabulário
+"""
+
+import gc
+import os
+import signal
+import socket
+import logging
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+
+from shopee_index_storage import plan_layout, write_arrays, view_arrays
+
+
+class SharedIndex:
+    """Segmento de memória compartilhada com os arrays planos do índice"""
+
+    def __init__(self, shm: shared_memory.SharedMemory, layout: Dict[str, Dict[str, Any]],
+                 owner: bool = False):
+        self.shm = shm
+        self.layout = layout
+        self.owner = owner
+        self.arrays = view_arrays(shm.buf, layout, readonly=True)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def size(self) -> int:
+        return self.shm.size
+
+    @classmethod
+    def create(cls, arrays: Dict[str, np.ndarray]) -> "SharedIndex":
+        """Cria o segmento e copia os arrays para ele (processo pai)"""
+        layout, total_size = plan_layout(arrays)
+        shm = shared_memory.SharedMemory(create=True, size=total_size)
+        write_arrays(shm.buf, arrays, layout)
+        return cls(shm, layout, owner=True)
+
+    @classmethod
+    def attach(cls, name: str, layout: Dict[str, Dict[str, Any]]) -> "SharedIndex":
+        """Anexa a um segmento existente (workers)"""
+        return cls(shared_memory.SharedMemory(name=name), layout)
+
+    def close(self):
+        """Libera as visões e o mapeamento; o dono também remove o segmento"""
+        self.arrays = {}
+        try:
+            self.shm.close()
+        except BufferError:
+            # Ainda há visões vivas em uso; o mapeamento some com o processo
+            pass
+        if self.owner:
+            self.shm.unlink()
+
+
+def attach_shared_ai(name: str, layout: Dict[str, Dict[str, Any]]):
+    """Cria um ShopeeNeuralAI somente leitura sobre o índice compartilhado"""
+    from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+    shared = SharedIndex.attach(name, layout)
+    ai_system = ShopeeNeuralAI()
+    ai_system.attach_index_arrays(shared.arrays)
+
+    # Aprendizado alteraria só a cópia local deste worker
+    ai_system.dynamic_learning_enabled = False
+    return ai_system, shared
+
+
+def worker_main(name: str, layout: Dict[str, Dict[str, Any]], sock: socket.socket,
+                worker_id: int, idle_timeout: float):
+    """Ponto de entrada de cada worker do servidor"""
+    from shopee_server import ShopeeChatServer
+
+    ai_system, shared = attach_shared_ai(name, layout)
+    logger = logging.getLogger('ShopeeNeuralAI.server')
+    logger.info(f"👷 Worker {worker_id} (pid {os.getpid()}) anexado ao índice compartilhado: "
+                f"{len(ai_system.training_patterns)} padrões")
+
+    server = ShopeeChatServer(ai_system, sock=sock, idle_timeout=idle_timeout)
+    try:
+        server.run()
+    finally:
+        # As visões precisam sumir antes de fechar o mapeamento
+        del server, ai_system
+        gc.collect()
+        shared.close()
+
+
+class PreforkServer:
+    """
+    Servidor pré-fork: o pai publica o índice e abre o socket,
+    N workers aceitam conexões no mesmo socket
+    """
+
+    def __init__(self, ai_system, host: str = '127.0.0.1', port: int = 8080,
+                 workers: Optional[int] = None, idle_timeout: float = 75.0, backlog: int = 4096):
+        self.ai_system = ai_system
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.idle_timeout = idle_timeout
+        self.backlog = backlog
+
+        self.shared: Optional[SharedIndex] = None
+        self.sock: Optional[socket.socket] = None
+        self.processes: List[multiprocessing.Process] = []
+        self.logger = logging.getLogger('ShopeeNeuralAI.server')
+
+        # 'spawn' evita herdar (e copiar aos poucos) o heap do processo pai
+        self.context = multiprocessing.get_context('spawn')
+
+    def start(self):
+        """Publica o índice, abre o socket e inicia os workers"""
+        self.shared = SharedIndex.create(self.ai_system.export_index_arrays())
+        self.logger.info(f"🧠 Índice em memória compartilhada: {self.shared.size / 1024 / 1024:.1f} MB "
+                         f"({self.shared.name})")
+
+        self.sock = socket.create_server((self.host, self.port), backlog=self.backlog)
+        self.sock.setblocking(False)
+
+        for worker_id in range(self.workers):
+            process = self.context.Process(
+                target=worker_main,
+                args=(self.shared.name, self.shared.layout, self.sock, worker_id, self.idle_timeout),
+                name=f"shopee-worker-{worker_id}",
+                daemon=True
+            )
+            process.start()
+            self.processes.append(process)
+
+        self.logger.info(f"🌐 {self.workers} workers ouvindo em http://{self.host}:{self.port}")
+
+    def stop(self):
+        """Encerra os workers e remove o segmento compartilhado"""
+        for process in self.processes:
+            if process.is_alive():
+                process.terminate()
+        for process in self.processes:
+            process.join(timeout=5)
+        self.processes = []
+
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+        if self.shared is not None:
+            self.shared.close()
+            self.shared = None
+
+    def run(self):
+        """Executa até Ctrl+C ou até todos os workers terminarem"""
+        self.start()
+        try:
+            for process in self.processes:
+                process.join()
+        except KeyboardInterrupt:
+            self.logger.info("👋 Servidor encerrado")
+        finally:
+            # Um segundo Ctrl+C não deve impedir a remoção do segmento
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            self.stop()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+SHOPEE SNAPSHOT - Formato Binário do Modelo
+Arquivo versionado com cabeçalho, metadados em JSON e arrays brutos
+alinhados, aberto via np.memmap sem desserializar objetos Python
+(ao contrário do pickle, a leitura não executa código)
+
+Layout do arquivo:
+    [cabeçalho 24 bytes][metadados JSON][padding até 64][região de dados]
+    cabeçalho = MAGIC (8) + versão (uint32) + reservado (uint32) + tamanho do JSON (uint64)
+"""
+
+import os
+import json
+import struct
+import pickle
+import mmap
+from datetime import datetime
+from typing import Dict, Tuple, Any
+
+import numpy as np
+
+from shopee_index_storage import ARRAY_ALIGNMENT, plan_layout, view_arrays
+
+MAGIC = b'SHPSNAP\x00'
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct('<8sIIQ')
+
+# Versão do modelo gravada nos metadados
+MODEL_VERSION = '3.1_hashed_ngrams'
+
+
+class SnapshotError(ValueError):
+    """Arquivo de snapshot inválido, truncado ou de versão desconhecida"""
+
+
+def data_offset(metadata_size: int) -> int:
+    """Início (alinhado) da região de dados"""
+    end = HEADER.size + metadata_size
+    return (end + ARRAY_ALIGNMENT - 1) // ARRAY_ALIGNMENT * ARRAY_ALIGNMENT
+
+
+def json_default(value: Any) -> Any:
+    """Converte tipos NumPy nos metadados"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"Tipo não serializável: {type(value).__name__}")
+
+
+def write_snapshot(path: str, arrays: Dict[str, np.ndarray], metadata: Dict[str, Any]):
+    """
+    Grava o snapshot em um arquivo temporário e o troca atomicamente
+    Um snapshot antigo ainda mapeado continua válido até ser fechado
+    """
+    layout, data_size = plan_layout(arrays)
+    metadata = dict(metadata, layout=layout, data_size=data_size)
+    metadata_bytes = json.dumps(metadata, ensure_ascii=False, default=json_default).encode('utf-8')
+    start = data_offset(len(metadata_bytes))
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, SNAPSHOT_VERSION, 0, len(metadata_bytes)))
+        f.write(metadata_bytes)
+        f.write(b'\x00' * (start - f.tell()))
+
+        for name, array in arrays.items():
+            f.write(b'\x00' * (start + layout[name]['offset'] - f.tell()))
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.write(b'\x00' * (start + data_size - f.tell()))
+
+    os.replace(temp_path, path)
+
+
+def read_metadata(path: str) -> Tuple[Dict[str, Any], int]:
+    """Lê e valida cabeçalho e metadados; retorna (metadados, início dos dados)"""
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise SnapshotError(f"snapshot truncado: {path}")
+
+        magic, version, _, metadata_size = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise SnapshotError(f"não é um snapshot do modelo: {path}")
+        if version != SNAPSHOT_VERSION:
+            raise SnapshotError(f"versão de snapshot não suportada: {version}")
+
+        metadata_bytes = f.read(metadata_size)
+        if len(metadata_bytes) < metadata_size:
+            raise SnapshotError(f"snapshot truncado: {path}")
+
+    try:
+        metadata = json.loads(metadata_bytes.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SnapshotError(f"metadados inválidos: {e}")
+
+    start = data_offset(metadata_size)
+    if os.path.getsize(path) < start + metadata['data_size']:
+        raise SnapshotError(f"snapshot truncado: {path}")
+
+    return metadata, start
+
+
+def read_snapshot(path: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Abre o snapshot via memmap (somente leitura)
+    Os arrays são visões do arquivo; as páginas são carregadas sob demanda
+    """
+    metadata, start = read_metadata(path)
+    data = np.memmap(path, dtype=np.uint8, mode='r', offset=start, shape=(metadata['data_size'],))
+    return view_arrays(data, metadata['layout']), metadata
+
+
+def maps_file(array: np.ndarray) -> bool:
+    """Verdadeiro se o array é uma visão (direta ou não) de um arquivo mapeado"""
+    while isinstance(array, np.ndarray):
+        if isinstance(array, np.memmap):
+            return True
+        array = array.base
+    return isinstance(array, mmap.mmap)
+
+
+def convert_legacy_pickle(pickle_path: str, snapshot_path: str) -> Dict[str, Any]:
+    """
+    Converte um modelo '2.0_advanced' salvo com pickle para o snapshot
+    Use apenas com arquivos confiáveis: o pickle ainda é desserializado aqui
+    """
+    from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+    with open(pickle_path, 'rb') as f:
+        model_data = pickle.load(f)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.restore_model_data(model_data)
+    ai_system.model_file = snapshot_path
+    # Métricas (.json e .prom) ao lado do snapshot, não nos caminhos padrão
+    ai_system.metrics_file = os.path.splitext(snapshot_path)[0] + '_metrics.json'
+    if not ai_system.save_model():
+        raise SnapshotError(f"falha ao gravar snapshot: {snapshot_path}")
+
+    return {
+        'patterns': len(ai_system.training_patterns),
+        'vocabulary_size': len(ai_system.processor.word_vectors),
+        'source_version': model_data.get('version', 'legacy'),
+        'converted_at': datetime.now().isoformat()
+    }
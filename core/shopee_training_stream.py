@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+SHOPEE TRAINING STREAM - Leitura de Treinamento em Fluxo
+Lê padrões de arquivos JSONL ou JSON (lista), opcionalmente comprimidos
+com gzip/lzma, ou dos segmentos de uma base (shopee_dataset_store),
+registro a registro; registros inválidos são contados e ignorados, e
+vários arquivos são combinados em uma única passada
+"""
+
+import io
+import os
+import glob
+import gzip
+import json
+import lzma
+import logging
+from pathlib import Path
+from typing import List, Dict, Tuple, Optional, Any, Iterable, Iterator, Set
+
+# Registros por lote no pipeline de carga
+DEFAULT_CHUNK_SIZE = 1024
+
+# Bytes lidos por vez ao percorrer uma lista JSON
+READ_SIZE = 64 * 1024
+
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.xz': lzma.open,
+    '.lzma': lzma.open
+}
+
+logger = logging.getLogger('ShopeeNeuralAI')
+
+
+class LoadStats:
+    """Contagem de registros lidos, aceitos e ignorados por arquivo"""
+
+    def __init__(self):
+        self.loaded = 0
+        self.skipped = 0
+        self.failed_sources: List[str] = []
+        self.per_source: Dict[str, Dict[str, int]] = {}
+
+    def source(self, name: str) -> Dict[str, int]:
+        return self.per_source.setdefault(name, {'loaded': 0, 'skipped': 0})
+
+    def accept(self, name: str):
+        self.loaded += 1
+        self.source(name)['loaded'] += 1
+
+    def skip(self, name: str):
+        self.skipped += 1
+        self.source(name)['skipped'] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'loaded': self.loaded,
+            'skipped': self.skipped,
+            'failed_sources': list(self.failed_sources),
+            'sources': {name: dict(counts) for name, counts in self.per_source.items()}
+        }
+
+
+def expand_sources(sources: Iterable[str]) -> List[str]:
+    """Expande padrões glob (ex.: dados/training/*.json) mantendo a ordem"""
+    paths = []
+    for source in sources:
+        source = str(source)
+        matches = sorted(glob.glob(source)) if glob.has_magic(source) else [source]
+        paths.extend(path for path in matches if path not in paths)
+    return paths
+
+
+def source_format(path: str) -> str:
+    """'jsonl' ou 'json' pela extensão (ignorando a de compressão)"""
+    suffixes = [suffix.lower() for suffix in Path(path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSED_OPENERS:
+        suffixes = suffixes[:-1]
+    return 'jsonl' if suffixes and suffixes[-1] in ('.jsonl', '.ndjson') else 'json'
+
+
+def open_source(path: str) -> io.TextIOBase:
+    """Abre o arquivo em modo texto, descomprimindo conforme a extensão"""
+    opener = COMPRESSED_OPENERS.get(Path(path).suffix.lower())
+    if opener is not None:
+        return opener(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_jsonl(stream: io.TextIOBase) -> Iterator[Optional[Any]]:
+    """Um valor por linha não vazia; None para linhas inválidas"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def iter_json_array(stream: io.TextIOBase) -> Iterator[Optional[Any]]:
+    """
+    Elementos de uma lista JSON lidos em blocos (sem carregar o arquivo todo)
+    Um elemento malformado é devolvido como None e encerra a leitura,
+    pois não há como localizar o próximo com segurança
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    eof = False
+    started = False
+
+    while True:
+        # Pular espaços, vírgulas e a abertura da lista
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ','
+                                          or (not started and buffer[position] == '[')):
+            started = started or buffer[position] == '['
+            position += 1
+
+        if position < len(buffer):
+            if not started:
+                yield None
+                return
+            if buffer[position] == ']':
+                return
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    yield None
+                    return
+            else:
+                # Número no fim do bloco pode estar incompleto
+                if end < len(buffer) or eof:
+                    yield value
+                    position = end
+                    continue
+        elif eof:
+            return
+
+        chunk = stream.read(READ_SIZE)
+        eof = not chunk
+        buffer = buffer[position:] + chunk
+        position = 0
+
+
+def normalize_record(record: Any) -> Optional[Dict[str, Any]]:
+    """Padrão de treinamento válido, ou None"""
+    if not isinstance(record, dict):
+        return None
+
+    question = record.get('question')
+    response = record.get('response')
+    if not isinstance(question, str) or not question.strip():
+        return None
+    if not isinstance(response, str) or not response.strip():
+        return None
+
+    confidence = record.get('confidence', 0.8)
+    category = record.get('category', 'geral')
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)):
+        return None
+    if not isinstance(category, str) or not category:
+        return None
+
+    return {'question': question, 'response': response,
+            'confidence': float(confidence), 'category': category}
+
+
+def source_segments(path: str) -> List[Tuple[str, Set[str]]]:
+    """
+    Arquivos a ler para uma fonte: o próprio arquivo, ou os segmentos vigentes
+    quando a fonte é o diretório de uma base em segmentos (com as categorias
+    mascaradas em cada segmento)
+    """
+    if os.path.isdir(path):
+        from shopee_dataset_store import DatasetStore
+        store = DatasetStore(path, auto_compact=False)
+        if store.exists():
+            return store.live_segments()
+    return [(path, set())]
+
+
+def iter_training_records(sources: Iterable[str], stats: Optional[LoadStats] = None
+                          ) -> Iterator[Dict[str, Any]]:
+    """Padrões válidos de todos os arquivos, na ordem; inválidos vão para stats"""
+    stats = stats if stats is not None else LoadStats()
+
+    for source in expand_sources(sources):
+        for path, masked in source_segments(source):
+            reader = iter_jsonl if source_format(path) == 'jsonl' else iter_json_array
+            try:
+                with open_source(path) as stream:
+                    for record in reader(stream):
+                        pattern = normalize_record(record)
+                        if pattern is None:
+                            stats.skip(path)
+                            continue
+                        # Categoria substituída em segmento mais novo
+                        if pattern['category'] in masked:
+                            continue
+                        stats.accept(path)
+                        yield pattern
+            except (OSError, EOFError, UnicodeDecodeError, lzma.LZMAError) as e:
+                logger.error(f"Erro ao ler {path}: {e}")
+                stats.failed_sources.append(path)
+
+
+def chunked(items: Iterable[Any], size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[Any]]:
+    """Agrupa os itens em listas de até `size` elementos"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+SHOPEE VOCABULARY - Vetores de Palavras com Memória Limitada
+O vocabulário de treinamento fica em uma matriz contígua; palavras
+desconhecidas das consultas (erros de digitação, números de pedido, CPFs)
+são calculadas sob demanda e mantidas apenas em um LRU de tamanho fixo
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import List, Dict, Iterable, Iterator, Optional
+
+import numpy as np
+
+# Palavras desconhecidas mantidas em cache (LRU)
+DEFAULT_CACHE_SIZE = 4096
+
+# Capacidade mínima ao crescer a matriz do vocabulário
+MIN_CAPACITY = 256
+
+# Precisão dos vetores guardados (metade da memória de float64)
+DEFAULT_DTYPE = np.float32
+
+
+def smart_embeddings(words: List[str], embedding_dim: int) -> np.ndarray:
+    """
+    Embeddings de palavras (hash md5 + características linguísticas)
+    calculados para todas as palavras de uma vez; linha i = words[i]
+    """
+    count = len(words)
+    if count == 0:
+        return np.zeros((0, embedding_dim))
+
+    # Hash-based initialization, expandido para a dimensão desejada
+    digests = b''.join(hashlib.md5(word.encode()).digest() for word in words)
+    hash_numbers = np.frombuffer(digests, dtype=np.uint8).reshape(count, -1) / 255.0
+    repeats = embedding_dim // hash_numbers.shape[1] + 1
+    embeddings = np.tile(hash_numbers, repeats)[:, :embedding_dim].copy()
+
+    # Características linguísticas
+    text = np.array(words)
+    lengths = np.char.str_len(text).astype(np.float64)
+    linguistic_features = np.column_stack([
+        lengths / 20.0,  # Comprimento normalizado
+        np.char.count(text, 'a') / lengths,  # Densidade de vogais
+        np.char.count(text, 'e') / lengths,
+        np.char.count(text, 'i') / lengths,
+        np.char.count(text, 'o') / lengths,
+        np.char.count(text, 'u') / lengths,
+        np.char.endswith(text, 'ão'),  # Padrões morfológicos
+        np.char.startswith(text, 'des'),
+        np.char.find(text, 'shop') >= 0,  # Relevância para Shopee
+        [any(map(str.isdigit, word)) for word in words]  # Contém números
+    ]).astype(np.float64)
+
+    # Mesclar características e normalizar
+    embeddings[:, :linguistic_features.shape[1]] += linguistic_features
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True) + 1e-8
+    return embeddings
+
+
+class WordVectorStore(MutableMapping):
+    """
+    Vetores de palavras: vocabulário de treinamento congelado em matriz
+    + LRU limitado para palavras vistas só em consultas
+    Iteração e len() cobrem apenas o vocabulário de treinamento
+    Vetores guardados em `dtype` (o da matriz dada, se houver); palavras
+    calculadas sob demanda são arredondadas para ele antes de usadas
+    """
+
+    def __init__(self, embedding_dim: int = 150, max_cached: int = DEFAULT_CACHE_SIZE,
+                 words: Optional[List[str]] = None, matrix: Optional[np.ndarray] = None,
+                 dtype=DEFAULT_DTYPE):
+        self.embedding_dim = embedding_dim
+        self.max_cached = max_cached
+        self.dtype = matrix.dtype if matrix is not None else np.dtype(dtype)
+
+        # Vocabulário de treinamento (matriz pode ser somente leitura até crescer)
+        words = words or []
+        self.rows: Dict[str, int] = {word: row for row, word in enumerate(words)}
+        self.words: List[str] = list(words)
+        self.matrix = matrix if matrix is not None else np.zeros((0, embedding_dim), dtype=self.dtype)
+        self.size = len(self.words)
+
+        # Palavras desconhecidas recentes
+        self.cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_mapping(cls, vectors, embedding_dim: int = 150, max_cached: int = DEFAULT_CACHE_SIZE,
+                     dtype=DEFAULT_DTYPE) -> "WordVectorStore":
+        """Cria o vocabulário a partir de um dicionário palavra -> vetor"""
+        words = list(vectors.keys())
+        matrix = np.zeros((len(words), embedding_dim), dtype=dtype)
+        for row, word in enumerate(words):
+            matrix[row] = vectors[word]
+        return cls(embedding_dim, max_cached, words, matrix)
+
+    def _reserve(self, count: int):
+        """Garante espaço na matriz para mais `count` palavras"""
+        needed = self.size + count
+        if needed <= self.matrix.shape[0] and self.matrix.flags.writeable:
+            return
+        capacity = max(MIN_CAPACITY, self.matrix.shape[0] * 2, needed)
+        matrix = np.zeros((capacity, self.embedding_dim), dtype=self.dtype)
+        matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = matrix
+
+    def _append(self, words: List[str], vectors: np.ndarray):
+        """Acrescenta palavras novas ao vocabulário congelado"""
+        self._reserve(len(words))
+        self.matrix[self.size:self.size + len(words)] = vectors
+        for word in words:
+            self.rows[word] = self.size
+            self.words.append(word)
+            self.size += 1
+
+    def add_training_words(self, words: Iterable[str]) -> int:
+        """Incorpora ao vocabulário congelado as palavras ainda desconhecidas (uma passada)"""
+        with self.lock:
+            new_words = [word for word in dict.fromkeys(words) if word not in self.rows]
+            if new_words:
+                vectors = np.zeros((len(new_words), self.embedding_dim), dtype=self.dtype)
+                missing = []
+                for i, word in enumerate(new_words):
+                    cached = self.cache.pop(word, None)
+                    if cached is None:
+                        missing.append(i)
+                    else:
+                        vectors[i] = cached
+                if missing:
+                    vectors[missing] = smart_embeddings([new_words[i] for i in missing], self.embedding_dim)
+                self._append(new_words, vectors)
+            return len(new_words)
+
+    def add_vectors(self, words: List[str], vectors: np.ndarray) -> int:
+        """Incorpora vetores prontos das palavras ainda desconhecidas; retorna quantas"""
+        with self.lock:
+            rows = [row for row, word in enumerate(words) if word not in self.rows]
+            if rows:
+                new_words = [words[row] for row in rows]
+                for word in new_words:
+                    self.cache.pop(word, None)
+                self._append(new_words, np.asarray(vectors)[rows])
+            return len(rows)
+
+    def vectors(self, words: List[str]) -> np.ndarray:
+        """Matriz (len(words) x dim) com os vetores; desconhecidas calculadas em lote"""
+        result = np.zeros((len(words), self.embedding_dim))
+        pending: Dict[str, List[int]] = {}
+
+        with self.lock:
+            for i, word in enumerate(words):
+                row = self.rows.get(word)
+                if row is not None:
+                    result[i] = self.matrix[row]
+                    continue
+                cached = self.cache.get(word)
+                if cached is not None:
+                    self.cache.move_to_end(word)
+                    self.cache_hits += 1
+                    result[i] = cached
+                else:
+                    pending.setdefault(word, []).append(i)
+
+            if pending:
+                missing = list(pending)
+                computed = smart_embeddings(missing, self.embedding_dim).astype(self.dtype)
+                self.cache_misses += len(missing)
+                for word, vector in zip(missing, computed):
+                    result[pending[word]] = vector
+                    self._remember(word, vector)
+
+        return result
+
+    def _remember(self, word: str, vector: np.ndarray):
+        """Guarda uma palavra desconhecida no LRU, descartando as mais antigas"""
+        if self.max_cached <= 0:
+            return
+        self.cache[word] = vector
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+
+    def __getitem__(self, word: str) -> np.ndarray:
+        row = self.rows.get(word)
+        if row is not None:
+            return self.matrix[row]
+        return self.vectors([word])[0]
+
+    def __setitem__(self, word: str, vector: np.ndarray):
+        with self.lock:
+            row = self.rows.get(word)
+            if row is None:
+                self.cache.pop(word, None)
+                self._append([word], np.asarray(vector).reshape(1, -1))
+            else:
+                self._reserve(0)
+                self.matrix[row] = vector
+
+    def __delitem__(self, word: str):
+        with self.lock:
+            del self.cache[word]
+
+    def __contains__(self, word: object) -> bool:
+        return word in self.rows or word in self.cache
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes da matriz do vocabulário (capacidade reservada incluída)"""
+        return int(self.matrix.nbytes)
+
+    def export_matrix(self) -> np.ndarray:
+        """Linhas ocupadas da matriz do vocabulário congelado"""
+        return self.matrix[:self.size]
+
+    def get_stats(self) -> Dict[str, int]:
+        """Estatísticas do vocabulário e do LRU"""
+        return {
+            'training_words': self.size,
+            'cached_words': len(self.cache),
+            'max_cached': self.max_cached,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses
+        }
@@ -4,95 +4,68 @@ Script para adicionar padrões de produtos defeituosos
 Máxima cobertura para situações de defeitos e problemas
 """
 
+import sys
 import json
-import os
+import argparse
+from pathlib import Path
 
-def add_produtos_defeituosos_patterns():
-    """Adiciona padrões específicos para produtos defeituosos"""
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_dataset_store import open_store
+
+STORE_DIR = project_root / "dados" / "base"
+BASE_FILE = project_root / "dados" / "shopee_complete_training.json"
+DEFEITUOSOS_FILE = project_root / "dados" / "training" / "shopee_produtos_defeituosos.json"
+CATEGORY = 'produto_defeituoso'
+
+def add_produtos_defeituosos_patterns(store_dir=STORE_DIR, source_file=DEFEITUOSOS_FILE, replace=True):
+    """Adiciona padrões específicos para produtos defeituosos à base em segmentos"""
     
     print("🚫 ADICIONANDO PADRÕES DE PRODUTOS DEFEITUOSOS")
     print("=" * 65)
     
-    # Carregar dados atuais
-    current_file = 'e:/MENSAGENS/shopee_complete_training.json'
-    defeituosos_file = 'e:/MENSAGENS/shopee_produtos_defeituosos.json'
-    
     try:
-        # Carregar dados existentes
-        with open(current_file, 'r', encoding='utf-8') as f:
-            current_data = json.load(f)
-        print(f"✅ {len(current_data)} padrões atuais carregados")
+        # Base em segmentos (criada a partir do dataset completo na primeira vez)
+        store = open_store(str(store_dir), [str(BASE_FILE)])
+        print(f"✅ {len(store)} padrões atuais na base")
         
-        # Carregar novos padrões de produtos defeituosos
-        with open(defeituosos_file, 'r', encoding='utf-8') as f:
+        with open(source_file, 'r', encoding='utf-8') as f:
             defeituosos_patterns = json.load(f)
         print(f"✅ {len(defeituosos_patterns)} padrões de produtos defeituosos carregados")
         
-        # Verificar se já existem padrões de produto_defeituoso
-        existing_defeituosos = sum(1 for item in current_data 
-                                 if item.get('category') == 'produto_defeituoso')
-        
-        if existing_defeituosos > 0:
-            print(f"⚠️ Já existem {existing_defeituosos} padrões de produto_defeituoso")
-            response = input("Deseja substituir? (s/n): ").lower()
-            if response != 's':
-                print("❌ Operação cancelada")
-                return False
-            
-            # Remover padrões antigos de produto defeituoso
-            current_data = [item for item in current_data 
-                          if item.get('category') != 'produto_defeituoso']
-            print(f"🔄 Padrões antigos de produto_defeituoso removidos")
-        
-        # Combinar dados
-        combined_data = current_data + defeituosos_patterns
-        
-        # Estatísticas
-        total_patterns = len(combined_data)
-        new_count = len(defeituosos_patterns)
+        # Só os registros novos são gravados; a troca da categoria é atômica
+        if replace:
+            result = store.replace_category(CATEGORY, defeituosos_patterns)
+            print(f"🔄 {result['removed']} padrões antigos de {CATEGORY} substituídos")
+        else:
+            result = store.add(defeituosos_patterns)
         
         print(f"\n📊 ESTATÍSTICAS DA ADIÇÃO:")
-        print(f"Padrões anteriores: {len(current_data)}")
-        print(f"Novos padrões de produtos defeituosos: {new_count}")
-        print(f"Total final: {total_patterns}")
-        
-        # Contar por categoria
-        categories = {}
-        for item in combined_data:
-            category = item.get('category', 'sem_categoria')
-            categories[category] = categories.get(category, 0) + 1
+        print(f"Novos padrões de produtos defeituosos: {result['added']}")
+        print(f"Duplicados ignorados: {result['duplicates']} | inválidos: {result['invalid']}")
+        print(f"Total final: {len(store)}")
         
         print(f"\n🏷️ TOP 10 CATEGORIAS:")
-        sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
+        sorted_categories = sorted(store.categories().items(), key=lambda x: x[1], reverse=True)
         for i, (category, count) in enumerate(sorted_categories[:10], 1):
-            emoji = "🆕" if category == "produto_defeituoso" else "📁"
+            emoji = "🆕" if category == CATEGORY else "📁"
             print(f"  {i:2d}. {emoji} {category}: {count} padrões")
         
-        # Backup
-        backup_file = current_file.replace('.json', '_backup_defeituosos.json')
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(current_data, f, indent=2, ensure_ascii=False)
-        print(f"📋 Backup criado: {os.path.basename(backup_file)}")
-        
-        # Salvar dados combinados
-        with open(current_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"💾 Dados atualizados salvos: {total_patterns} padrões totais")
-        
-        return True, new_count, total_patterns
+        store.wait_compaction()
+        return True, result['added'], len(store)
         
     except Exception as e:
         print(f"❌ Erro: {e}")
         return False, 0, 0
 
-def show_defeituosos_examples():
+def show_defeituosos_examples(source_file=DEFEITUOSOS_FILE):
     """Mostra exemplos dos novos padrões de produtos defeituosos"""
     print(f"\n🆕 EXEMPLOS DOS PADRÕES DE PRODUTOS DEFEITUOSOS:")
     print("-" * 65)
     
     try:
-        with open('e:/MENSAGENS/shopee_produtos_defeituosos.json', 'r', encoding='utf-8') as f:
+        with open(source_file, 'r', encoding='utf-8') as f:
             patterns = json.load(f)
         
         # Categorizar por tipo de defeito
@@ -186,13 +159,19 @@ def show_coverage_analysis():
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Adiciona padrões de produtos defeituosos à base de treinamento")
+    parser.add_argument('--base', default=str(STORE_DIR), help="Diretório da base em segmentos")
+    parser.add_argument('--origem', default=str(DEFEITUOSOS_FILE), help="JSON com os padrões de produtos defeituosos")
+    parser.add_argument('--adicionar', action='store_true',
+                        help="Acrescenta sem substituir os padrões existentes da categoria")
+    args = parser.parse_args()
     
     # Mostrar exemplos e análise primeiro
-    show_defeituosos_examples()
+    show_defeituosos_examples(args.origem)
     show_coverage_analysis()
     
     # Adicionar padrões
-    success, new_count, total_count = add_produtos_defeituosos_patterns()
+    success, new_count, total_count = add_produtos_defeituosos_patterns(args.base, args.origem, replace=not args.adicionar)
     
     if success:
         print(f"\n🎉 ADIÇÃO DE PRODUTOS DEFEITUOSOS CONCLUÍDA!")
@@ -200,8 +179,8 @@ def main():
         print(f"📊 Total de padrões disponíveis: {total_count}")
         
         print(f"\n🚀 PRÓXIMOS PASSOS:")
-        print("1. Remova o cache: rm e:/MENSAGENS/shopee_neural_model.pkl")
-        print("2. Execute: python shopee_neural_ai_advanced.py")
+        print("1. Remova o cache: rm e:/MENSAGENS/shopee_neural_model.snap")
+        print(f"2. Execute: python shopee_ai_launcher.py --dados {args.base}")
         print("3. Teste os novos padrões de produtos defeituosos")
         
         print(f"\n🧪 FRASES PARA TESTAR:")
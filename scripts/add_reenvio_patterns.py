@@ -4,95 +4,68 @@ Script para adicionar padrões de reenvio/segunda entrega
 Corrige a situação onde cliente pede novo produto sem devolução
 """
 
+import sys
 import json
-import os
+import argparse
+from pathlib import Path
 
-def add_reenvio_patterns():
-    """Adiciona padrões específicos para reenvio de produtos"""
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_dataset_store import open_store
+
+STORE_DIR = project_root / "dados" / "base"
+BASE_FILE = project_root / "dados" / "shopee_complete_training.json"
+REENVIO_FILE = project_root / "dados" / "training" / "shopee_reenvio_produtos.json"
+CATEGORY = 'reenvio_produto'
+
+def add_reenvio_patterns(store_dir=STORE_DIR, source_file=REENVIO_FILE, replace=True):
+    """Adiciona padrões específicos para reenvio de produtos à base em segmentos"""
     
     print("📦 ADICIONANDO PADRÕES DE REENVIO/SEGUNDA ENTREGA")
     print("=" * 60)
     
-    # Carregar dados atuais
-    current_file = 'e:/MENSAGENS/shopee_complete_training.json'
-    reenvio_file = 'e:/MENSAGENS/shopee_reenvio_produtos.json'
-    
     try:
-        # Carregar dados existentes
-        with open(current_file, 'r', encoding='utf-8') as f:
-            current_data = json.load(f)
-        print(f"✅ {len(current_data)} padrões atuais carregados")
+        # Base em segmentos (criada a partir do dataset completo na primeira vez)
+        store = open_store(str(store_dir), [str(BASE_FILE)])
+        print(f"✅ {len(store)} padrões atuais na base")
         
-        # Carregar novos padrões de reenvio
-        with open(reenvio_file, 'r', encoding='utf-8') as f:
+        with open(source_file, 'r', encoding='utf-8') as f:
             reenvio_patterns = json.load(f)
         print(f"✅ {len(reenvio_patterns)} padrões de reenvio carregados")
         
-        # Verificar se já existem padrões de reenvio_produto
-        existing_reenvio = sum(1 for item in current_data 
-                             if item.get('category') == 'reenvio_produto')
-        
-        if existing_reenvio > 0:
-            print(f"⚠️ Já existem {existing_reenvio} padrões de reenvio_produto")
-            response = input("Deseja substituir? (s/n): ").lower()
-            if response != 's':
-                print("❌ Operação cancelada")
-                return False
-            
-            # Remover padrões antigos de reenvio
-            current_data = [item for item in current_data 
-                          if item.get('category') != 'reenvio_produto']
-            print(f"🔄 Padrões antigos de reenvio_produto removidos")
-        
-        # Combinar dados
-        combined_data = current_data + reenvio_patterns
-        
-        # Estatísticas
-        total_patterns = len(combined_data)
-        new_count = len(reenvio_patterns)
+        # Só os registros novos são gravados; a troca da categoria é atômica
+        if replace:
+            result = store.replace_category(CATEGORY, reenvio_patterns)
+            print(f"🔄 {result['removed']} padrões antigos de {CATEGORY} substituídos")
+        else:
+            result = store.add(reenvio_patterns)
         
         print(f"\n📊 ESTATÍSTICAS DA ADIÇÃO:")
-        print(f"Padrões anteriores: {len(current_data)}")
-        print(f"Novos padrões de reenvio: {new_count}")
-        print(f"Total final: {total_patterns}")
-        
-        # Contar por categoria
-        categories = {}
-        for item in combined_data:
-            category = item.get('category', 'sem_categoria')
-            categories[category] = categories.get(category, 0) + 1
+        print(f"Novos padrões de reenvio: {result['added']}")
+        print(f"Duplicados ignorados: {result['duplicates']} | inválidos: {result['invalid']}")
+        print(f"Total final: {len(store)}")
         
         print(f"\n🏷️ TOP 10 CATEGORIAS:")
-        sorted_categories = sorted(categories.items(), key=lambda x: x[1], reverse=True)
+        sorted_categories = sorted(store.categories().items(), key=lambda x: x[1], reverse=True)
         for i, (category, count) in enumerate(sorted_categories[:10], 1):
-            emoji = "🆕" if category == "reenvio_produto" else "📁"
+            emoji = "🆕" if category == CATEGORY else "📁"
             print(f"  {i:2d}. {emoji} {category}: {count} padrões")
         
-        # Backup
-        backup_file = current_file.replace('.json', '_backup_reenvio.json')
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(current_data, f, indent=2, ensure_ascii=False)
-        print(f"📋 Backup criado: {os.path.basename(backup_file)}")
-        
-        # Salvar dados combinados
-        with open(current_file, 'w', encoding='utf-8') as f:
-            json.dump(combined_data, f, indent=2, ensure_ascii=False)
-        
-        print(f"💾 Dados atualizados salvos: {total_patterns} padrões totais")
-        
-        return True, new_count, total_patterns
+        store.wait_compaction()
+        return True, result['added'], len(store)
         
     except Exception as e:
         print(f"❌ Erro: {e}")
         return False, 0, 0
 
-def show_reenvio_examples():
+def show_reenvio_examples(source_file=REENVIO_FILE):
     """Mostra exemplos dos novos padrões de reenvio"""
     print(f"\n🆕 EXEMPLOS DOS PADRÕES DE REENVIO/SEGUNDA ENTREGA:")
     print("-" * 65)
     
     try:
-        with open('e:/MENSAGENS/shopee_reenvio_produtos.json', 'r', encoding='utf-8') as f:
+        with open(source_file, 'r', encoding='utf-8') as f:
             patterns = json.load(f)
         
         # Categorizar por tipo de reenvio
@@ -168,15 +141,21 @@ def show_problem_solution():
 
 def main():
     """Função principal"""
+    parser = argparse.ArgumentParser(description="Adiciona padrões de reenvio à base de treinamento")
+    parser.add_argument('--base', default=str(STORE_DIR), help="Diretório da base em segmentos")
+    parser.add_argument('--origem', default=str(REENVIO_FILE), help="JSON com os padrões de reenvio")
+    parser.add_argument('--adicionar', action='store_true',
+                        help="Acrescenta sem substituir os padrões existentes da categoria")
+    args = parser.parse_args()
     
     # Mostrar problema e solução
     show_problem_solution()
     
     # Mostrar exemplos
-    show_reenvio_examples()
+    show_reenvio_examples(args.origem)
     
     # Adicionar padrões
-    success, new_count, total_count = add_reenvio_patterns()
+    success, new_count, total_count = add_reenvio_patterns(args.base, args.origem, replace=not args.adicionar)
     
     if success:
         print(f"\n🎉 ADIÇÃO DE PADRÕES DE REENVIO CONCLUÍDA!")
@@ -184,8 +163,8 @@ def main():
         print(f"📊 Total de padrões disponíveis: {total_count}")
         
         print(f"\n🚀 PRÓXIMOS PASSOS:")
-        print("1. Remova o cache: rm e:/MENSAGENS/shopee_neural_model.pkl")
-        print("2. Execute: python shopee_neural_ai_advanced.py")
+        print("1. Remova o cache: rm e:/MENSAGENS/shopee_neural_model.snap")
+        print(f"2. Execute: python shopee_ai_launcher.py --dados {args.base}")
         print("3. Teste o caso específico que estava dando erro")
         
         print(f"\n🧪 TESTE A SITUAÇÃO CORRIGIDA:")
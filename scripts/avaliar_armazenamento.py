@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Avalia o armazenamento dos embeddings do índice contra float64
+Mostra concordância do vencedor (com e sem rerank em float no int8),
+maior erro de cosseno, memória dos embeddings e tempo por consulta
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Precisão e memória dos modos de armazenamento")
+    parser.add_argument('--dados', default=str(project_root / "dados" / "shopee_complete_training.json"))
+    parser.add_argument('--modos', default='float64,float32,int8', help="Modos de armazenamento")
+    parser.add_argument('--rerank', type=int, default=8, help="Padrões com cosseno recalculado em float (int8)")
+    parser.add_argument('--consultas', type=int, default=0,
+                        help="Quantas perguntas do corpus usar como consulta (0 = todas)")
+    args = parser.parse_args()
+
+    print("🗜️ AVALIAÇÃO DO ARMAZENAMENTO DE EMBEDDINGS")
+    print("=" * 60)
+
+    ai_system = ShopeeNeuralAI()
+    logging.getLogger('ShopeeNeuralAI').setLevel(logging.WARNING)
+    if not ai_system.load_advanced_training_data(args.dados):
+        print("❌ Falha ao carregar dados de treinamento")
+        return False
+    ai_system.quantized_rerank = args.rerank
+
+    with open(args.dados, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+    if args.consultas:
+        questions = questions[:args.consultas]
+
+    print(f"📊 {len(ai_system.training_patterns)} padrões | {len(questions)} consultas")
+    print(f"\n{'modo':>8} {'vencedor':>9} {'rerank':>8} {'erro cos':>10} {'memória':>10} {'busca':>10}")
+
+    storages = tuple(args.modos.split(','))
+    for storage, result in ai_system.evaluate_embedding_storage(questions, storages).items():
+        print(f"{storage:>8} {result['agreement']:>9.1%} {result['reranked_agreement']:>8.1%} "
+              f"{result['max_cosine_error']:>10.1e} {result['embedding_bytes'] / 1024:>7.0f} KB "
+              f"{result['search_ms']:>8.3f}ms")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
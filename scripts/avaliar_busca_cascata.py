@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Avalia a busca em cascata contra a busca exaustiva
+Mostra recall@1, recall dos top-k, fração de padrões pontuados por
+completo e tempo por consulta para cada número de candidatos (cascade_k)
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Recall da busca em cascata vs exaustiva")
+    parser.add_argument('--dados', default=str(project_root / "dados" / "shopee_complete_training.json"))
+    parser.add_argument('--ks', default='4,8,16,32,64', help="Valores de cascade_k")
+    parser.add_argument('--top', type=int, default=5, help="Tamanho da lista comparada (recall@top)")
+    parser.add_argument('--consultas', type=int, default=0,
+                        help="Quantas perguntas do corpus usar como consulta (0 = todas)")
+    args = parser.parse_args()
+
+    print("🪜 AVALIAÇÃO DA BUSCA EM CASCATA")
+    print("=" * 60)
+
+    ai_system = ShopeeNeuralAI()
+    logging.getLogger('ShopeeNeuralAI').setLevel(logging.WARNING)
+    if not ai_system.load_advanced_training_data(args.dados):
+        print("❌ Falha ao carregar dados de treinamento")
+        return False
+
+    with open(args.dados, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+    if args.consultas:
+        questions = questions[:args.consultas]
+
+    print(f"📊 {len(ai_system.training_patterns)} padrões | {len(questions)} consultas")
+    print(f"\n{'k':>6} {'recall@1':>9} {f'recall@{args.top}':>10} {'pontuados':>10} {'cascata':>10} {'exaustiva':>10}")
+
+    ks = tuple(int(value) for value in args.ks.split(','))
+    for k, result in ai_system.evaluate_cascade_search(questions, ks, args.top).items():
+        print(f"{k:>6} {result['recall_at_1']:>9.3f} {result[f'recall_at_{args.top}']:>10.3f} "
+              f"{result['candidate_fraction']:>9.1%} {result['cascade_ms']:>8.3f}ms "
+              f"{result['exhaustive_ms']:>8.3f}ms")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
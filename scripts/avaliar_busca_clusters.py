@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Avalia a busca podada por clusters contra a busca exaustiva
+Mostra recall, fração de padrões pontuados e tempo por consulta
+para cada número de clusters visitados (cluster_probe)
+"""
+
+import sys
+import json
+import logging
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Recall da busca por clusters vs exaustiva")
+    parser.add_argument('--dados', default=str(project_root / "dados" / "shopee_complete_training.json"))
+    parser.add_argument('--probes', default='1,2,4,8,16,32', help="Valores de cluster_probe")
+    parser.add_argument('--consultas', type=int, default=0,
+                        help="Quantas perguntas do corpus usar como consulta (0 = todas)")
+    args = parser.parse_args()
+
+    print("🧭 AVALIAÇÃO DA BUSCA POR CLUSTERS")
+    print("=" * 60)
+
+    ai_system = ShopeeNeuralAI()
+    logging.getLogger('ShopeeNeuralAI').setLevel(logging.WARNING)
+    if not ai_system.load_advanced_training_data(args.dados):
+        print("❌ Falha ao carregar dados de treinamento")
+        return False
+
+    with open(args.dados, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+    if args.consultas:
+        questions = questions[:args.consultas]
+
+    cluster_index = ai_system.ensure_cluster_index()
+    print(f"📊 {len(ai_system.training_patterns)} padrões | {cluster_index.num_clusters} clusters | "
+          f"{len(questions)} consultas")
+    print(f"\n{'probe':>6} {'recall@1':>9} {'categoria':>10} {'pontuados':>10} {'clusters':>10} {'exaustiva':>10}")
+
+    probes = tuple(int(value) for value in args.probes.split(','))
+    for probe, result in ai_system.evaluate_cluster_search(questions, probes).items():
+        print(f"{probe:>6} {result['recall_at_1']:>9.3f} {result['category_recall']:>10.3f} "
+              f"{result['candidate_fraction']:>9.1%} {result['cluster_ms']:>8.3f}ms "
+              f"{result['exhaustive_ms']:>8.3f}ms")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
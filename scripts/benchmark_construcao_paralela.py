@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark da construção do índice: serial contra o pool de processos
+Mede o carregamento a frio (sem cache de embeddings) com cada número de
+processos, confere que o índice é idêntico ao serial e mostra o ganho
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+def build(sources, workers: int):
+    """Carrega o índice a frio e retorna (sistema, segundos)"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    start_time = time.perf_counter()
+    if not ai_system.load_training_stream(sources, workers=workers):
+        raise RuntimeError("Falha ao carregar dados de treinamento")
+    return ai_system, time.perf_counter() - start_time
+
+def same_index(serial, parallel) -> bool:
+    """Embeddings e vocabulário idênticos ao build serial"""
+    return (np.array_equal(parallel.pattern_index.embeddings, serial.pattern_index.embeddings)
+            and parallel.processor.word_vectors.words == serial.processor.word_vectors.words)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Tempo de construção do índice: serial vs paralelo")
+    parser.add_argument('--dados', nargs='+',
+                        default=[str(project_root / "dados" / "shopee_complete_training.json"),
+                                 str(project_root / "dados" / "training" / "*.json")])
+    parser.add_argument('--processos', default='2,4', help="Números de processos a comparar com o serial")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções por configuração (vale a menor)")
+    args = parser.parse_args()
+
+    print("👷 BENCHMARK DA CONSTRUÇÃO PARALELA DO ÍNDICE")
+    print("=" * 60)
+    logging.getLogger('ShopeeNeuralAI').setLevel(logging.WARNING)
+
+    cores = os.cpu_count() or 1
+    serial, serial_time = None, float('inf')
+    for _ in range(args.repeticoes):
+        ai_system, elapsed = build(args.dados, workers=1)
+        serial, serial_time = ai_system, min(serial_time, elapsed)
+    print(f"📊 {len(serial.training_patterns)} padrões | {cores} núcleo(s)")
+    print(f"\n{'processos':>10} {'tempo':>9} {'ganho':>7} {'idêntico':>9}")
+    print(f"{1:>10} {serial_time:>8.2f}s {1.0:>6.2f}x {'sim':>9}")
+
+    identical = True
+    for workers in (int(value) for value in args.processos.split(',')):
+        best = float('inf')
+        for _ in range(args.repeticoes):
+            parallel, elapsed = build(args.dados, workers=workers)
+            best = min(best, elapsed)
+        same = same_index(serial, parallel)
+        identical = identical and same
+        print(f"{workers:>10} {best:>8.2f}s {serial_time / best:>6.2f}x {'sim' if same else 'NÃO':>9}")
+
+    return identical
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
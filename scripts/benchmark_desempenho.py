@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latência por etapa do Shopee Neural AI
+Mede preprocessamento, entidades, embedding, pontuação e busca completa
+no corpus real (dados/training/) e em corpora sintéticos de 10k a 1M padrões;
+a primeira execução grava a baseline e as seguintes apontam regressões
+"""
+
+import sys
+import logging
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_benchmark import (DEFAULT_SCALES, REGRESSION_TOLERANCE, load_templates, run_benchmark,
+                              find_regressions, load_baseline, save_baseline, format_report)
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Benchmark de latência por etapa")
+    parser.add_argument('--dados', default=str(project_root / "dados" / "training"),
+                        help="Diretório com os JSON de treinamento usados como modelo")
+    parser.add_argument('--escalas', default=','.join(str(scale) for scale in DEFAULT_SCALES),
+                        help="Tamanhos dos corpora sintéticos (vazio = só o corpus real)")
+    parser.add_argument('--consultas', type=int, default=200,
+                        help="Quantas perguntas reais usar como consulta (0 = todas)")
+    parser.add_argument('--baseline', default=str(project_root / "logs" / "benchmark_baseline.json"))
+    parser.add_argument('--atualizar-baseline', action='store_true',
+                        help="Grava o resultado como nova baseline")
+    parser.add_argument('--tolerancia', type=float, default=REGRESSION_TOLERANCE,
+                        help="Aumento relativo de p50/p95 considerado regressão")
+    args = parser.parse_args()
+
+    print("⏱️ BENCHMARK DE LATÊNCIA POR ETAPA")
+    print("=" * 60)
+    logging.getLogger('ShopeeNeuralAI').setLevel(logging.WARNING)
+
+    templates = load_templates(Path(args.dados))
+    if not templates:
+        print(f"❌ Nenhum padrão encontrado em {args.dados}")
+        return False
+
+    queries = [item['question'] for item in templates]
+    if args.consultas:
+        queries = queries[:args.consultas]
+    scales = [int(value) for value in args.escalas.split(',') if value.strip()]
+
+    report = run_benchmark(templates, queries, scales)
+    print()
+    for line in format_report(report):
+        print(line)
+
+    baseline = load_baseline(Path(args.baseline))
+    if baseline is None or args.atualizar_baseline:
+        save_baseline(Path(args.baseline), report)
+        print(f"\n💾 Baseline gravada: {args.baseline}")
+        return True
+
+    regressions = find_regressions(report, baseline, args.tolerancia)
+    if not regressions:
+        print(f"\n✅ Sem regressões em relação à baseline de {baseline['metadata']['created_at']}")
+        return True
+
+    print(f"\n⚠️ {len(regressions)} regressões (tolerância {args.tolerancia:.0%}):")
+    for regression in regressions:
+        print(f"   {regression['corpus']:>10} {regression['stage']:>11} {regression['metric']}: "
+              f"{regression['baseline']:.3f}ms → {regression['current']:.3f}ms "
+              f"(+{regression['change']:.0%})")
+    return False
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark do extrator de entidades
+Compara as buscas regex originais com o extrator compilado de varredura única
+sobre todo o corpus de treinamento e confere se os resultados são idênticos
+"""
+
+import sys
+import re
+import json
+import time
+from pathlib import Path
+from typing import List, Dict
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_entity_extractor import CompiledEntityExtractor
+
+def extract_entities_regex(text: str) -> Dict[str, List[str]]:
+    """Implementação original de extract_entities (uma regex por regra)"""
+    entities = {
+        'enderecos': [],
+        'numeros': [],
+        'locais': [],
+        'servicos': [],
+        'problemas': [],
+        'intencoes': [],
+        'acoes': []
+    }
+
+    # Padrões para endereços
+    if re.search(r'\b(endereço|endereco|casa|apartamento|numero|cep|rua|avenida)\b', text):
+        entities['enderecos'].append('endereco_mencionado')
+
+    # Padrões para números
+    numeros = re.findall(r'\b\d+\b', text)
+    entities['numeros'].extend(numeros)
+
+    # Padrões para locais
+    locais_patterns = r'\b(casa|trabalho|faculdade|hotel|empresa|estado|cidade)\b'
+    locais = re.findall(locais_patterns, text)
+    entities['locais'].extend(locais)
+
+    # Padrões para serviços Shopee
+    servicos_patterns = r'\b(pedido|entrega|pagamento|pix|reembolso|devolucao|cupom)\b'
+    servicos = re.findall(servicos_patterns, text)
+    entities['servicos'].extend(servicos)
+
+    # Detecção de intenções específicas
+    if re.search(r'\b(cancelar|cancela|não quero|desistir|parar)\b', text):
+        entities['intencoes'].append('cancelamento')
+
+    if re.search(r'\b(alterar|mudar|corrigir|atualizar|erro)\b', text) and not re.search(r'\b(defeito|quebrado|não funciona)\b', text):
+        entities['intencoes'].append('alteracao')
+
+    if re.search(r'\b(devolver|trocar|reembolso)\b', text):
+        entities['intencoes'].append('devolucao')
+
+    # Detecção de produtos defeituosos (alta prioridade)
+    if re.search(r'\b(defeito|defeituoso|quebrado|não funciona|não liga|estragado|danificado|com problema)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    if re.search(r'\b(veio|chegou)\b.*\b(quebrado|defeito|estragado|com problema|usado|sujo)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    if re.search(r'\b(produto|celular|notebook|tv|fone|mouse|teclado)\b.*\b(não funciona|não liga|quebrado|defeito)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    # Detecção de reenvio/segunda entrega (situação específica)
+    if re.search(r'\b(não quero devolver|sem devolver|não devolver)\b.*\b(mandar|enviar|novo|outro)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    if re.search(r'\b(pode mandar|pode enviar|reenvia|reenviar|segunda entrega|segunda via)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    if re.search(r'\b(substituir|substituto|trocar por outro|produto de reposição)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    # Detecção de ações
+    acoes_patterns = r'\b(quero|preciso|como|onde|quando|posso)\b'
+    acoes = re.findall(acoes_patterns, text)
+    entities['acoes'].extend(acoes)
+
+    return entities
+
+def load_corpus_texts() -> List[str]:
+    """Carrega as perguntas de treinamento já normalizadas como em advanced_preprocess"""
+    files = [project_root / "dados" / "shopee_complete_training.json"]
+    files.extend(sorted((project_root / "dados" / "training").glob("*.json")))
+
+    texts = []
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for item in json.load(f):
+                text = item['question'].lower().strip()
+                texts.append(re.sub(r'[^\w\s\-\.]', ' ', text))
+    return texts
+
+def time_per_call(function, texts: List[str], repeats: int) -> float:
+    """Tempo médio por chamada em microssegundos"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for text in texts:
+            function(text)
+    elapsed = time.perf_counter() - start
+    return elapsed / (repeats * len(texts)) * 1e6
+
+def main():
+    """Executa a comparação de equivalência e desempenho"""
+    print("⏱️ MICRO-BENCHMARK: EXTRAÇÃO DE ENTIDADES")
+    print("=" * 55)
+
+    texts = load_corpus_texts()
+    extractor = CompiledEntityExtractor()
+    print(f"📚 {len(texts)} textos do corpus de treinamento")
+
+    mismatches = [text for text in texts if extractor.extract(text) != extract_entities_regex(text)]
+    if mismatches:
+        print(f"❌ {len(mismatches)} textos com resultado divergente:")
+        for text in mismatches[:5]:
+            print(f"  • \"{text}\"")
+        return False
+    print("✅ Resultados idênticos em todo o corpus")
+
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    regex_us = time_per_call(extract_entities_regex, texts, repeats)
+    compiled_us = time_per_call(extractor.extract, texts, repeats)
+
+    print(f"\n📊 CUSTO POR CHAMADA ({repeats} repetições):")
+    print(f"  🐢 Regex original:      {regex_us:8.2f} µs")
+    print(f"  ⚡ Extrator compilado:  {compiled_us:8.2f} µs")
+    print(f"  🚀 Aceleração:          {regex_us / compiled_us:8.2f}x")
+    return True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Benchmark do servidor pré-fork: vazão com 1 processo contra N workers
+Sobe o launcher (--server --workers N) para cada configuração, roda o
+cliente de carga e compara req/s e latência com o servidor de um processo
+"""
+
+import os
+import re
+import sys
+import time
+import signal
+import argparse
+import subprocess
+import urllib.request
+from pathlib import Path
+from typing import Dict, Optional
+
+project_root = Path(__file__).parent.parent
+LAUNCHER = project_root / "shopee_ai_launcher.py"
+LOAD_CLIENT = project_root / "scripts" / "cliente_carga_servidor.py"
+
+def wait_health(port: int, timeout: float) -> bool:
+    """Aguarda o /health responder"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.2)
+    return False
+
+def stop_server(server: subprocess.Popen):
+    """Ctrl+C no servidor (remove o segmento compartilhado); força se não encerrar"""
+    server.send_signal(signal.SIGINT if os.name != 'nt' else signal.SIGTERM)
+    try:
+        server.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        server.kill()
+        server.wait()
+
+def measure(workers: int, port: int, args) -> Optional[Dict[str, float]]:
+    """Sobe o servidor com N workers e retorna vazão e latências do cliente de carga"""
+    server = subprocess.Popen([sys.executable, str(LAUNCHER), '--server', '--port', str(port),
+                               '--workers', str(workers)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_health(port, args.espera):
+            print(f"❌ Servidor com {workers} worker(s) não respondeu")
+            return None
+        client = subprocess.run([sys.executable, str(LOAD_CLIENT), '--port', str(port), '--idle', '0',
+                                 '--clients', str(args.clientes), '--requests', str(args.requisicoes)],
+                                capture_output=True, text=True, encoding='utf-8')
+    finally:
+        stop_server(server)
+
+    throughput = re.search(r"Vazão: ([\d.]+) req/s", client.stdout)
+    latency = re.search(r"Latência cliente\s+p50=([\d.]+)ms p95=([\d.]+)ms", client.stdout)
+    if client.returncode != 0 or not throughput or not latency:
+        print(f"❌ Cliente de carga falhou com {workers} worker(s)")
+        return None
+    return {'throughput': float(throughput.group(1)),
+            'p50_ms': float(latency.group(1)), 'p95_ms': float(latency.group(2))}
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Vazão do servidor: 1 processo vs workers pré-fork")
+    parser.add_argument('--workers', default='2,4', help="Números de workers a comparar com 1 processo")
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--clientes', type=int, default=50, help="Clientes ativos simultâneos")
+    parser.add_argument('--requisicoes', type=int, default=40, help="Requisições por cliente")
+    parser.add_argument('--espera', type=float, default=120.0, help="Segundos aguardando o servidor subir")
+    args = parser.parse_args()
+
+    print("👷 BENCHMARK DO SERVIDOR PRÉ-FORK")
+    print("=" * 60)
+    cores = os.cpu_count() or 1
+    print(f"🖥️ {cores} núcleo(s) | {args.clientes} clientes x {args.requisicoes} requisições")
+
+    baseline = measure(1, args.port, args)
+    if baseline is None:
+        return False
+    print(f"\n{'workers':>8} {'vazão':>12} {'ganho':>7} {'p50':>10} {'p95':>10}")
+    print(f"{1:>8} {baseline['throughput']:>8.1f} r/s {1.0:>6.2f}x "
+          f"{baseline['p50_ms']:>8.2f}ms {baseline['p95_ms']:>8.2f}ms")
+
+    for workers in (int(value) for value in args.workers.split(',')):
+        result = measure(workers, args.port, args)
+        if result is None:
+            return False
+        print(f"{workers:>8} {result['throughput']:>8.1f} r/s {result['throughput'] / baseline['throughput']:>6.2f}x "
+              f"{result['p50_ms']:>8.2f}ms {result['p95_ms']:>8.2f}ms")
+
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Cliente de carga para o servidor HTTP do Shopee Neural AI
+Abre conexões ociosas, envia conversas simultâneas via keep-alive
+e reporta a latência por requisição
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from typing import List, Dict, Tuple
+
+MENSAGENS = [
+    "olá",
+    "meu produto veio quebrado",
+    "não quero devolver pode mandar novamente?",
+    "quero cancelar o pedido",
+    "preciso alterar endereço",
+    "como pagar com pix",
+    "onde está meu pedido"
+]
+
+async def send_request(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, host: str,
+                       method: str, path: str, payload: Dict = None) -> Tuple[int, Dict, Dict[str, str]]:
+    """Envia uma requisição HTTP/1.1 keep-alive e lê a resposta"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8') if payload is not None else b''
+    request = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+               f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n")
+    writer.write(request.encode('latin-1') + body)
+    await writer.drain()
+
+    status_line = await reader.readline()
+    status = int(status_line.split(b' ')[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    content = await reader.readexactly(int(headers.get('content-length', '0')))
+    return status, json.loads(content.decode('utf-8')), headers
+
+async def idle_connection(host: str, port: int, ready: asyncio.Event, connections: List):
+    """Mantém uma conexão aberta sem enviar nada"""
+    reader, writer = await asyncio.open_connection(host, port)
+    connections.append(writer)
+    await ready.wait()
+
+async def active_client(host: str, port: int, client_id: int, requests: int,
+                        latencies: List[float], server_latencies: List[float], errors: List[str]):
+    """Cliente que conversa usando uma única conexão keep-alive"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for i in range(requests):
+            message = MENSAGENS[(client_id + i) % len(MENSAGENS)]
+            start_time = time.perf_counter()
+            status, data, headers = await send_request(
+                reader, writer, host, 'POST', '/chat',
+                {'message': message, 'session_id': f"cliente-{client_id}"})
+            latencies.append(time.perf_counter() - start_time)
+
+            if status != 200:
+                errors.append(f"{status}: {data}")
+            elif 'x-processing-time' in headers:
+                server_latencies.append(float(headers['x-processing-time'].rstrip('ms')) / 1000)
+    finally:
+        writer.close()
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil simples (valores em segundos, retorno em ms)"""
+    ordered = sorted(values)
+    index = min(int(fraction * len(ordered)), len(ordered) - 1)
+    return ordered[index] * 1000
+
+async def run_load(args) -> bool:
+    """Executa o teste de carga"""
+    print("📡 CLIENTE DE CARGA - SHOPEE NEURAL AI SERVER")
+    print("=" * 55)
+
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    status, health, _ = await send_request(reader, writer, args.host, 'GET', '/health')
+    writer.close()
+    print(f"🩺 Health: {status} | {health.get('patterns', 0)} padrões")
+
+    # Conexões ociosas (simulam clientes parados no chat)
+    ready = asyncio.Event()
+    idle_writers = []
+    idle_tasks = [asyncio.create_task(idle_connection(args.host, args.port, ready, idle_writers))
+                  for _ in range(args.idle)]
+    while len(idle_writers) < args.idle:
+        await asyncio.sleep(0.05)
+    print(f"💤 {len(idle_writers)} conexões ociosas abertas")
+
+    # Clientes ativos simultâneos
+    latencies: List[float] = []
+    server_latencies: List[float] = []
+    errors: List[str] = []
+    start_time = time.perf_counter()
+    await asyncio.gather(*[
+        active_client(args.host, args.port, client_id, args.requests,
+                      latencies, server_latencies, errors)
+        for client_id in range(args.clients)
+    ])
+    elapsed = time.perf_counter() - start_time
+
+    ready.set()
+    for idle_writer in idle_writers:
+        idle_writer.close()
+    await asyncio.gather(*idle_tasks, return_exceptions=True)
+
+    print(f"\n📊 RESULTADOS ({len(latencies)} requisições em {elapsed:.2f}s):")
+    print(f"  ⚡ Vazão: {len(latencies) / elapsed:.1f} req/s")
+    print(f"  ⏱️ Latência cliente  p50={percentile(latencies, 0.50):.2f}ms "
+          f"p95={percentile(latencies, 0.95):.2f}ms p99={percentile(latencies, 0.99):.2f}ms")
+    if server_latencies:
+        print(f"  🖥️ Latência servidor p50={percentile(server_latencies, 0.50):.2f}ms "
+              f"p95={percentile(server_latencies, 0.95):.2f}ms p99={percentile(server_latencies, 0.99):.2f}ms")
+    print(f"  ❌ Erros: {len(errors)}")
+    for error in errors[:5]:
+        print(f"    • {error}")
+
+    return not errors
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Cliente de carga do servidor Shopee Neural AI")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--idle', type=int, default=1000, help="Conexões ociosas mantidas abertas")
+    parser.add_argument('--clients', type=int, default=50, help="Clientes ativos simultâneos")
+    parser.add_argument('--requests', type=int, default=20, help="Requisições por cliente ativo")
+    args = parser.parse_args()
+
+    success = asyncio.run(run_load(args))
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Converte o modelo salvo em pickle (versão 2.0_advanced) para o
+snapshot binário carregado via memmap
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_snapshot import convert_legacy_pickle
+
+def main():
+    """Função principal"""
+    parser = argparse.ArgumentParser(description="Converte modelo pickle para snapshot binário")
+    parser.add_argument('pickle_path', nargs='?', default='e:/MENSAGENS/shopee_neural_model.pkl')
+    parser.add_argument('snapshot_path', nargs='?', default='e:/MENSAGENS/shopee_neural_model.snap')
+    args = parser.parse_args()
+
+    print("🔄 CONVERSÃO DE MODELO PICKLE → SNAPSHOT")
+    print("=" * 50)
+    print("⚠️ Converta apenas arquivos confiáveis (o pickle executa código ao ser lido)")
+
+    if not Path(args.pickle_path).exists():
+        print(f"❌ Arquivo não encontrado: {args.pickle_path}")
+        return False
+
+    try:
+        result = convert_legacy_pickle(args.pickle_path, args.snapshot_path)
+    except Exception as e:
+        print(f"❌ Erro na conversão: {e}")
+        return False
+
+    print(f"✅ Snapshot gravado: {args.snapshot_path}")
+    print(f"📊 {result['patterns']} padrões | vocabulário: {result['vocabulary_size']} palavras")
+    print(f"🏷️ Versão de origem: {result['source_version']}")
+    return True
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
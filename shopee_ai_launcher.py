@@ -6,6 +6,7 @@ Sistema de IA Neural para atendimento Shopee
 
 import sys
 import os
+import argparse
 from pathlib import Path
 
 # Adicionar pasta core ao path
@@ -13,8 +14,35 @@ project_root = Path(__file__).parent
 core_path = project_root / "core"
 sys.path.insert(0, str(core_path))
 
+def parse_args():
+    """Interpreta os argumentos de linha de comando"""
+    parser = argparse.ArgumentParser(description="Shopee Neural AI Advanced")
+    parser.add_argument('--server', action='store_true',
+                        help="Inicia o servidor HTTP em vez do chat no terminal")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço do servidor HTTP")
+    parser.add_argument('--port', type=int, default=8080, help="Porta do servidor HTTP")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Processos do servidor (índice em memória compartilhada se > 1)")
+    parser.add_argument('--dados', nargs='+',
+                        help="Arquivos de treinamento (JSON/JSONL, .gz/.xz, globs como 'dados/training/*.json') "
+                             "ou diretório da base em segmentos; padrão: dados/base se existir, senão "
+                             "dados/shopee_complete_training.json")
+    parser.add_argument('--processos-indice', type=int, default=1,
+                        help="Processos na construção do índice (0 = todos os núcleos)")
+    return parser.parse_args()
+
+def default_training_sources():
+    """Base em segmentos (scripts/add_*.py) se já criada, senão o dataset completo"""
+    store_dir = project_root / "dados" / "base"
+    if (store_dir / "manifest.json").exists():
+        return [str(store_dir)]
+    return [str(project_root / "dados" / "shopee_complete_training.json")]
+
 def main():
     """Função principal do launcher"""
+    args = parse_args()
+    args.dados = args.dados or default_training_sources()
+    
     print("🤖 SHOPEE NEURAL AI ADVANCED")
     print("=" * 40)
     print("🚀 Iniciando sistema neural...")
@@ -25,21 +53,32 @@ def main():
         # Criar instância do sistema
         ai_system = ShopeeNeuralAI()
         
-        # Carregar dados de treinamento
-        training_file = project_root / "dados" / "shopee_complete_training.json"
-        
-        if not training_file.exists():
-            print(f"❌ Arquivo de treinamento não encontrado: {training_file}")
-            return False
-        
-        print(f"📊 Carregando dados de: {training_file}")
-        success = ai_system.load_advanced_training_data(str(training_file))
+        # Carregar dados de treinamento (várias fontes combinadas em uma passada)
+        print(f"📊 Carregando dados de: {', '.join(args.dados)}")
+        success = ai_system.load_training_stream(args.dados, workers=args.processos_indice)
         
         if not success:
             print("❌ Falha ao carregar dados de treinamento")
             return False
         
-        print("✅ Sistema carregado com sucesso!")
+        load_stats = ai_system.training_load_stats
+        print(f"✅ Sistema carregado com sucesso! ({load_stats.loaded} padrões, "
+              f"{load_stats.skipped} registros inválidos ignorados)")
+        
+        if args.server:
+            from shopee_server import ShopeeChatServer
+            from shopee_shared_index import PreforkServer
+            
+            print(f"🌐 Servidor HTTP em http://{args.host}:{args.port}")
+            print("📡 Endpoints: POST /chat, POST /learn, GET /stats, GET /health, GET /metrics")
+            print("⛔ Ctrl+C para encerrar")
+            if args.workers > 1:
+                print(f"👷 {args.workers} workers (aprendizado dinâmico desativado)")
+                PreforkServer(ai_system, host=args.host, port=args.port, workers=args.workers).run()
+            else:
+                ShopeeChatServer(ai_system, host=args.host, port=args.port).run()
+            return True
+        
         print("💬 Digite 'sair' para encerrar")
         print("-" * 40)
         
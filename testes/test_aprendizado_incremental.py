@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Teste do aprendizado dinâmico incremental
+O índice crescido padrão a padrão deve coincidir com um índice reconstruído
+"""
+
+import sys
+import time
+import threading
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_pattern_index import PatternIndex, ROW_ARRAYS
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_aprendizado_incremental():
+    """Aprende centenas de padrões e compara com a reconstrução completa"""
+    print("📚 TESTE DO APRENDIZADO INCREMENTAL")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    initial = len(ai_system.training_patterns)
+
+    words = ["produto", "pedido", "entrega", "pix", "boleto", "cupom", "frete", "loja",
+             "celular", "notebook", "tênis", "reembolso", "vendedor", "cartão"]
+    questions = [f"{words[i % len(words)]} {words[(i * 7) % len(words)]} pergunta {i}"
+                 for i in range(500)]
+
+    start_time = time.perf_counter()
+    learned = sum(bool(ai_system.dynamic_learning(question, f"resposta {i}", f"nova_{i % 5}"))
+                  for i, question in enumerate(questions))
+    elapsed = time.perf_counter() - start_time
+    print(f"✅ {learned} padrões aprendidos em {elapsed * 1000:.0f} ms")
+
+    # Pergunta idêntica é recusada pelo teste de duplicidade
+    assert not ai_system.dynamic_learning(questions[-1], "outra resposta", "nova_0")
+
+    index = ai_system.pattern_index
+    assert index.size == len(ai_system.training_patterns) == initial + learned
+    assert index.capacity >= index.size
+
+    # Mesmo conteúdo que um índice reconstruído do zero
+    rebuilt = PatternIndex(index.embedding_dim)
+    rebuilt.build(ai_system.training_patterns)
+    for name in ROW_ARRAYS:
+        assert np.allclose(getattr(index, name), getattr(rebuilt, name)), name
+    assert index.categories == rebuilt.categories
+    exported, expected = index.export_arrays(), rebuilt.export_arrays()
+    for name in ('token_terms_blob', 'token_postings_offsets', 'token_postings', 'sentiment_table'):
+        assert np.array_equal(exported[name], expected[name]), name
+
+    # Centroide corrente = média dos embeddings da categoria
+    for category in ("nova_0", "pedidos"):
+        members = [p['embedding'] for p in ai_system.training_patterns if p['category'] == category]
+        assert np.allclose(index.centroid(category), np.mean(members, axis=0), atol=1e-5)
+
+    # Reotimização completa (em segundo plano durante o aprendizado) segue consistente
+    ai_system.optimize_semantic_clusters()
+    assert ai_system.cluster_distances.shape == (index.size,)
+
+def test_somas_por_categoria_no_snapshot():
+    """Carregar arrays exportados não decodifica a matriz; índice antigo calcula as somas sob demanda"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    source = ai_system.pattern_index
+    arrays = {name: np.array(array) for name, array in ai_system.export_index_arrays().items()}
+    for array in arrays.values():
+        array.flags.writeable = False
+
+    recomputed = []
+    class CountingIndex(PatternIndex):
+        def _recompute_category_sums(self):
+            recomputed.append(self.size)
+            super()._recompute_category_sums()
+
+    loaded = CountingIndex(source.embedding_dim)
+    loaded.load_arrays(arrays)
+    category = source.categories[0]
+    assert np.allclose(loaded.centroid(category), source.centroid(category))
+    pattern = dict(ai_system.training_patterns[0], category=category)
+    loaded.add(pattern)
+    assert not recomputed
+    assert loaded.category_counts[0] == source.category_counts[0] + 1
+
+    legacy = CountingIndex(source.embedding_dim)
+    legacy.load_arrays({name: array for name, array in arrays.items()
+                        if name not in ('category_sums', 'category_counts')})
+    assert not recomputed
+    assert np.allclose(legacy.centroids(), source.centroids())
+    assert recomputed == [source.size]
+    print("✅ Somas por categoria adotadas do snapshot (sem ler a matriz de embeddings)")
+
+def test_reotimizacao_concorrente():
+    """Reotimização em segundo plano durante o aprendizado nunca reconstrói o índice"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    index = ai_system.pattern_index
+    builds = []
+    build = index.build
+    index.build = lambda patterns: builds.append(len(patterns)) or build(patterns)
+
+    # Reotimizador exatamente entre o append em training_patterns e o add no índice
+    add = index.add
+    def add_after_optimizer(pattern):
+        ai_system.recompute_semantic_clusters()
+        add(pattern)
+    index.add = add_after_optimizer
+    assert ai_system.dynamic_learning("como ativo o cashback relâmpago", "Resposta.", 'cashback')
+    index.add = add
+    assert index.size == len(ai_system.training_patterns)
+
+    # Reotimizador em laço numa thread enquanto a requisição aprende
+    stop = threading.Event()
+    def optimizer():
+        while not stop.is_set():
+            ai_system.recompute_semantic_clusters()
+    thread = threading.Thread(target=optimizer)
+    thread.start()
+    try:
+        for i in range(60):
+            ai_system.dynamic_learning(f"pergunta concorrente {i} sobre frete {i * 7}", "r", f"nova_{i % 3}")
+            ai_system.ensure_pattern_index()
+    finally:
+        stop.set()
+        thread.join()
+
+    assert index.size == len(ai_system.training_patterns)
+    assert not builds
+    print("✅ Aprendizado e reotimização concorrentes sem reconstrução do índice")
+
+if __name__ == "__main__":
+    test_aprendizado_incremental()
+    test_reotimizacao_concorrente()
+    test_somas_por_categoria_no_snapshot()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Teste do armazenamento compacto de embeddings
+float32 e int8 (escala por linha) contra a referência em float64: mesmo
+vencedor nos cenários dos testes, erro de cosseno pequeno e memória menor
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_pattern_index import PatternIndex
+from shopee_quantization import quantize_rows, decode_rows, quantized_products
+from shopee_vocabulary import WordVectorStore
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+# Mensagens dos cenários de testes/ (reenvio, defeitos, cancelamento, dados)
+SCENARIOS = [
+    "olá",
+    "meu produto veio quebrado",
+    "não quero devolver pode mandar novamente?",
+    "produto veio defeituoso",
+    "quero cancelar o pedido",
+    "pode enviar outro produto",
+    "preciso alterar endereço",
+    "sem devolver manda novo",
+    "não quero mais o produto",
+    "meu produto veio com defeito",
+    "celular chegou quebrado",
+    "notebook não liga",
+    "produto chegou danificado",
+    "onde está meu pedido? quero rastrear a entrega",
+    "paguei com pix e não caiu"
+]
+
+def load_system() -> ShopeeNeuralAI:
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    return ai_system
+
+def test_quantizacao_por_linha():
+    """Erro de cada componente até meia escala; produto em blocos igual ao direto"""
+    print("🗜️ TESTE DO ARMAZENAMENTO QUANTIZADO")
+    print("=" * 50)
+
+    rng = np.random.default_rng(3)
+    matrix = rng.standard_normal((2500, 150)) * rng.uniform(0.01, 5, size=(2500, 1))
+    matrix[7] = 0.0
+    codes, scales = quantize_rows(matrix)
+    assert codes.dtype == np.int8 and scales.dtype == np.float32
+    assert np.abs(codes).max() <= 127
+    error = np.abs(decode_rows(codes, scales) - matrix)
+    assert (error <= scales[:, None] * 0.5 + 1e-6).all()
+    assert not decode_rows(codes, scales)[7].any()
+
+    query = rng.standard_normal(150).astype(np.float32)
+    expected = codes.astype(np.float32) @ query
+    assert np.allclose(quantized_products(codes, query, block=256), expected, rtol=1e-5, atol=1e-3)
+    batch = quantized_products(codes, np.vstack([query, -query]), block=300)
+    assert np.allclose(batch[0], expected, rtol=1e-5, atol=1e-3)
+    assert np.allclose(batch[1], -expected, rtol=1e-5, atol=1e-3)
+    print("✅ Erro de quantização limitado a meia escala por linha")
+
+def test_precisao_e_memoria_contra_float64():
+    """Mesmo vencedor em float32 e int8 nos cenários e no corpus; 2x e ~8x menos memória"""
+    ai_system = load_system()
+    data = json.loads(TRAINING_FILE.read_text(encoding='utf-8'))
+    messages = SCENARIOS + [item['question'] for item in data]
+
+    results = ai_system.evaluate_embedding_storage(messages)
+    reference = results['float64']
+    for storage, result in results.items():
+        print(f"📊 {storage:>7}: vencedor {result['agreement']:.1%} "
+              f"(rerank {result['reranked_agreement']:.1%}) | erro cosseno {result['max_cosine_error']:.1e} | "
+              f"{result['embedding_bytes'] / 1024:.0f} KB | {result['search_ms']:.3f}ms")
+
+    assert results['float32']['agreement'] == 1.0
+    assert results['float32']['max_cosine_error'] < 1e-6
+    assert results['int8']['max_cosine_error'] < 0.01
+    assert results['int8']['reranked_agreement'] == 1.0
+    assert reference['embedding_bytes'] == 2 * results['float32']['embedding_bytes']
+    assert reference['embedding_bytes'] > 7 * results['int8']['embedding_bytes']
+
+    # Índice em uso não foi trocado pela avaliação
+    assert ai_system.pattern_index.storage == 'float32'
+
+def test_busca_com_indice_int8():
+    """Busca, top-k e exportação com o índice em int8"""
+    ai_system = load_system()
+    expected = [ai_system.advanced_similarity_search(message)[2] for message in SCENARIOS]
+    float_bytes = ai_system.pattern_index.embedding_nbytes
+
+    ai_system.set_embedding_storage('int8')
+    index = ai_system.pattern_index
+    assert index.embeddings.dtype == np.int8
+    int8_bytes = index.embedding_nbytes
+    assert int8_bytes < float_bytes / 3
+    for message, category in zip(SCENARIOS, expected):
+        ai_system.default_session.reset()
+        assert ai_system.advanced_similarity_search(message)[2] == category, message
+
+    # Aprendizado dinâmico quantiza a linha nova
+    assert ai_system.dynamic_learning("como funciona o cashback relâmpago", "Resposta.", 'cashback_relampago')
+    ai_system.ensure_pattern_index()
+    assert index.embeddings.dtype == np.int8 and index.size == len(ai_system.training_patterns)
+    assert abs(np.linalg.norm(index.row_embeddings(np.array([index.size - 1]))[0]) - 1.0) < 0.01
+
+    # Arrays exportados carregam códigos e escalas; padrões congelados decodificam a linha
+    attached = ShopeeNeuralAI()
+    attached.attach_index_arrays(ai_system.export_index_arrays())
+    assert attached.pattern_index.storage == 'int8'
+    lazy = attached.training_patterns[3]
+    assert np.allclose(lazy['embedding'], index.row_embeddings(np.array([3]))[0])
+    assert np.allclose(attached.pattern_float_embedding(3), ai_system.training_patterns[3]['embedding'])
+    matches = attached.top_matches(SCENARIOS[1], top_k=3)
+    assert matches[0]['category'] == expected[1]
+
+    # Índice gravado sem escalas (embeddings em float) continua carregando
+    arrays = ai_system.export_index_arrays()
+    ai_system.set_embedding_storage('float32')
+    legacy = ai_system.export_index_arrays()
+    del legacy['embedding_scales']
+    restored = PatternIndex(ai_system.processor.embedding_dim)
+    restored.load_arrays(legacy)
+    assert restored.storage == 'float32' and (restored.embedding_scales == 1).all()
+    assert arrays['embeddings'].dtype == np.int8
+    print(f"✅ Índice int8: {int8_bytes / 1024:.0f} KB (float32: {float_bytes / 1024:.0f} KB)")
+
+def test_vetores_de_palavras_float32():
+    """Vocabulário em float32; palavra desconhecida tem o mesmo vetor antes e depois de aprendida"""
+    store = WordVectorStore(150)
+    unknown = store.vectors(['xyzzy'])[0]
+    store.add_training_words(['xyzzy', 'pedido'])
+    assert store.matrix.dtype == np.float32
+    assert np.array_equal(store.vectors(['xyzzy'])[0], unknown)
+
+    reference = WordVectorStore(150, dtype=np.float64)
+    reference.add_training_words(['pedido'])
+    assert store.nbytes * 2 == reference.nbytes
+    assert np.abs(store['pedido'] - reference['pedido']).max() < 1e-6
+    print("✅ Vetores de palavras em float32")
+
+if __name__ == "__main__":
+    test_quantizacao_por_linha()
+    test_precisao_e_memoria_contra_float64()
+    test_busca_com_indice_int8()
+    test_vetores_de_palavras_float32()
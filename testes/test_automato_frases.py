@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Teste do autômato de frases (Aho–Corasick)
+Uma passada encontra as mesmas frases que as buscas por substring e a
+intenção primária segue a mesma ordem de prioridade
+"""
+
+import sys
+import json
+import random
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_phrase_automaton import PhraseAutomaton
+from shopee_category_terms import (STRONG_INDICATORS, INTENT_PHRASES, build_phrase_automaton,
+                                   match_phrases, query_features)
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def reference_intent(processed_input):
+    """detect_primary_intent com as buscas sequenciais por substring (referência)"""
+    intencoes = processed_input['entities']['intencoes']
+    text = ' '.join(processed_input['tokens'])
+    if 'reenvio_produto' in intencoes:
+        return 'reenvio_produto'
+    if any(p in text for p in ['não quero devolver', 'sem devolver', 'pode mandar novamente', 'pode enviar outro']):
+        return 'reenvio_produto'
+    if 'produto_defeituoso' in intencoes:
+        return 'produto_defeituoso'
+    if any(w in text for w in ['defeito', 'defeituoso', 'quebrado', 'não funciona', 'não liga', 'estragado', 'danificado',
+                               'veio quebrado', 'chegou quebrado', 'produto ruim', 'má qualidade', 'não presta']):
+        return 'produto_defeituoso'
+    if any(w in text for w in ['cancelar', 'cancela', 'não quero', 'desistir', 'parar', 'anular']):
+        return 'cancelamento'
+    if any(w in text for w in ['alterar', 'mudar', 'corrigir', 'atualizar']) and 'dados' in text:
+        return 'alteracao_dados'
+    if any(w in text for w in ['endereço', 'endereco', 'casa', 'apartamento']):
+        return 'alteracao_endereco'
+    if any(w in text for w in ['devolver', 'trocar', 'reembolso']):
+        return 'devolucao'
+    if any(w in text for w in ['pedido', 'compra', 'onde', 'status']):
+        return 'consulta_pedido'
+    if any(w in text for w in ['pagar', 'pagamento', 'pix', 'cartão']):
+        return 'pagamento'
+    return 'geral'
+
+def test_automato_igual_a_busca_por_substring():
+    """Frases sobrepostas, prefixos e sufixos comuns: mesmo resultado que `in`"""
+    print("🔤 TESTE DO AUTÔMATO DE FRASES")
+    print("=" * 50)
+
+    rng = random.Random(7)
+    alphabet = 'aãb '
+    for _ in range(2000):
+        phrases = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+                   for _ in range(rng.randint(1, 12))]
+        automaton = PhraseAutomaton((phrase, i) for i, phrase in enumerate(phrases))
+        text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        assert automaton.search(text) == {i for i, phrase in enumerate(phrases) if phrase in text}
+
+    # Frase com vários rótulos e frase vazia (ignorada)
+    automaton = PhraseAutomaton([('pix', 'a'), ('pix', 'b'), ('', 'c')])
+    assert automaton.search('paguei no pix') == {'a', 'b'}
+    assert automaton.phrase_count == 2
+    print("✅ Autômato equivalente à busca por substring")
+
+def test_intencao_e_indicadores_iguais_a_referencia():
+    """Intenção primária e relevância por indicadores idênticas nas perguntas do treinamento"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    processor = ai_system.processor
+    data = json.loads(TRAINING_FILE.read_text(encoding='utf-8'))
+    questions = [item['question'] for item in data] + [
+        "vou preparar a casa", "não quero devolver pode mandar outro", "quero alterar meus dados",
+        "paguei com cartão e nada", "produto veio quebrado", "olá"
+    ]
+
+    intents = set()
+    for question in questions:
+        processed = processor.advanced_preprocess(question)
+        intent = ai_system.detect_primary_intent(processed)
+        assert intent == reference_intent(processed), question
+        intents.add(intent)
+
+        text = ' '.join(processed['tokens'])
+        features = query_features(processed, intent)
+        for category, indicators in STRONG_INDICATORS.items():
+            expected_indicators = sum(1 for indicator in indicators if indicator in text)
+            found = sum(1 for label in features['phrases'] if label[:2] == ('indicador', category))
+            assert found == expected_indicators, (question, category)
+
+    assert len(intents) >= 6
+    print(f"✅ {len(questions)} mensagens, {len(intents)} intenções idênticas à referência")
+
+def test_custo_independe_do_numero_de_frases():
+    """Mais frases aumentam o autômato, não a passada pelo texto"""
+    rng = random.Random(0)
+    extra = {f"grupo_{i}": [''.join(rng.choice('abcdefghijlmnoprstuv') for _ in range(rng.randint(5, 12)))
+                            for _ in range(20)]
+             for i in range(100)}
+    automaton = build_phrase_automaton(dict(INTENT_PHRASES, **extra))
+    assert automaton.phrase_count > 2000
+
+    text = "meu pedido chegou quebrado, pode mandar outro?"
+    found = automaton.search(text)
+    assert {label for label in found if label[0] == 'indicador'} == \
+           {label for label in match_phrases(text) if label[0] == 'indicador'}
+    assert ('frase', 'defeito') in found and ('frase', 'pedido') in found
+    print(f"✅ {automaton.phrase_count} frases em {len(automaton.transitions)} estados")
+
+if __name__ == "__main__":
+    test_automato_igual_a_busca_por_substring()
+    test_intencao_e_indicadores_iguais_a_referencia()
+    test_custo_independe_do_numero_de_frases()
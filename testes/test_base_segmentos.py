@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Teste da base de treinamento em segmentos
+Adições gravam só os registros novos, substituição de categoria é atômica,
+duplicados são ignorados e a compactação preserva os padrões vigentes
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_dataset_store import DatasetStore, open_store
+from shopee_training_stream import LoadStats, iter_training_records
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+REENVIO_FILE = project_root / "dados" / "training" / "shopee_reenvio_produtos.json"
+
+def segment_files(store):
+    return {path.name: path.stat().st_mtime_ns for path in Path(store.segments_dir).iterdir()}
+
+def test_substituir_categoria_grava_so_o_novo():
+    """Substituir uma categoria grava só os registros dela e não toca nos outros segmentos"""
+    print("🗂️ TESTE DA BASE EM SEGMENTOS")
+    print("=" * 50)
+
+    data = json.loads(TRAINING_FILE.read_text(encoding='utf-8'))
+    reenvio = json.loads(REENVIO_FILE.read_text(encoding='utf-8'))
+    unique_questions = len({item['question'] for item in data})
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = open_store(str(Path(temp_dir) / "base"), [str(TRAINING_FILE)])
+        assert len(store) == unique_questions
+        before = segment_files(store)
+
+        result = store.replace_category('reenvio_produto', reenvio)
+        assert result['added'] == len(reenvio)
+        assert result['removed'] == store.categories()['reenvio_produto'] == len(reenvio)
+        assert len(store) == unique_questions
+
+        # Segmentos antigos intactos; só um segmento novo com os registros da categoria
+        after = segment_files(store)
+        assert {name: after[name] for name in before} == before
+        new_segment = [Path(store.segments_dir) / name for name in after
+                       if name not in before and name.endswith('.jsonl')]
+        assert len(new_segment) == 1
+        lines = new_segment[0].read_text(encoding='utf-8').splitlines()
+        assert len(lines) == len(reenvio)
+        print(f"✅ {len(reenvio)} registros gravados ({new_segment[0].stat().st_size} bytes)")
+
+        # O carregador lê os segmentos diretamente, sem os registros mascarados
+        stats = LoadStats()
+        records = list(iter_training_records([store.directory], stats))
+        assert records == list(store.iter_records())
+        assert len(records) == stats.loaded == unique_questions
+        assert sum(1 for r in records if r['category'] == 'reenvio_produto') == len(reenvio)
+
+        # Reabrir a base lê o mesmo manifesto
+        assert DatasetStore(store.directory).categories() == store.categories()
+
+def test_duplicados_e_invalidos():
+    """Perguntas já existentes (mesmo md5) e registros inválidos não são gravados"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DatasetStore(str(Path(temp_dir) / "base"))
+        first = store.add([
+            {"question": "meu cupom sumiu", "response": "Verifique a validade.", "category": "cupons"},
+            {"question": "meu cupom sumiu", "response": "Outra resposta.", "category": "cupons"},
+            {"question": "", "response": "sem pergunta"},
+            "texto solto"
+        ])
+        assert first == {'added': 1, 'duplicates': 1, 'invalid': 2}
+
+        second = store.add([{"question": "meu cupom sumiu", "response": "Repetida."},
+                            {"question": "como uso moedas", "response": "No checkout.", "category": "coins"}])
+        assert second == {'added': 1, 'duplicates': 1, 'invalid': 0}
+        assert store.categories() == {'cupons': 1, 'coins': 1}
+
+        # Substituir pode regravar perguntas da própria categoria; outras categorias são recusadas
+        replaced = store.replace_category('cupons', [
+            {"question": "meu cupom sumiu", "response": "Nova resposta.", "category": "cupons"},
+            {"question": "como uso moedas", "response": "x", "category": "cupons"},
+            {"question": "frete grátis", "response": "y", "category": "frete"}
+        ])
+        assert replaced == {'added': 1, 'removed': 1, 'duplicates': 1, 'invalid': 1}
+        assert [r['response'] for r in store.iter_records()] == ["No checkout.", "Nova resposta."]
+
+def test_indices_lidos_uma_vez():
+    """Deduplicação lê os índices dos segmentos só na primeira escrita"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DatasetStore(str(Path(temp_dir) / "base"), auto_compact=False)
+        for i in range(5):
+            store.add([{"question": f"pergunta {i}", "response": "r", "category": "geral"}])
+
+        reopened = DatasetStore(store.directory, auto_compact=False)
+        reads = []
+        read_index = reopened.read_index
+        reopened.read_index = lambda entry: reads.append(entry['file']) or read_index(entry)
+
+        assert reopened.add([{"question": "pergunta 1", "response": "x"}])['duplicates'] == 1
+        assert len(reads) == 5
+        for i in range(5, 10):
+            result = reopened.add([{"question": f"pergunta {i}", "response": "r", "category": "geral"},
+                                   {"question": f"pergunta {i - 5}", "response": "x"}])
+            assert result == {'added': 1, 'duplicates': 1, 'invalid': 0}
+        reopened.replace_category('geral', [{"question": "pergunta 0", "response": "nova", "category": "geral"}])
+        assert reopened.add([{"question": "pergunta 3", "response": "r"}])['added'] == 1
+        assert len(reads) == 5
+        print("✅ Índices lidos uma vez; hashes mantidos a cada escrita")
+
+def test_compactacao():
+    """Compactação junta os segmentos; mascarados e órfãos saem após o prazo de leitura"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = DatasetStore(str(Path(temp_dir) / "base"), auto_compact=False)
+        for i in range(16):
+            store.add([{"question": f"pergunta {i}", "response": f"resposta {i}",
+                        "category": "par" if i % 2 == 0 else "impar"}])
+        store.replace_category('par', [{"question": "pergunta nova", "response": "r", "category": "par"}])
+        expected = list(store.iter_records())
+        segments = len(store.manifest['segments'])
+        assert segments == 9 and store.needs_compaction()
+
+        # Escrita interrompida antes da troca do manifesto: segmento órfão
+        orphan = Path(store.segments_dir) / "999999.jsonl"
+        orphan.write_text('{"question": "perdida", "response": "x"}\n', encoding='utf-8')
+        assert "perdida" not in [r['question'] for r in iter_training_records([store.directory])]
+
+        store.auto_compact = True
+        store.maybe_compact()
+        store.wait_compaction()
+        assert len(store.manifest['segments']) == 1
+        assert list(store.iter_records()) == expected
+
+        # Dentro do prazo de leitura os segmentos antigos ficam (leitores do manifesto anterior)
+        retired = store.manifest['retired']
+        assert len(retired) == 17 and orphan.exists()
+        assert all((Path(store.segments_dir) / name).exists() for name in retired)
+
+        # Prazo vencido: retirados e órfão são apagados e saem do manifesto
+        store.segment_grace = 0
+        store.maybe_compact()
+        assert not orphan.exists()
+        assert store.manifest['retired'] == {}
+        assert sorted(path.name for path in Path(store.segments_dir).iterdir()) == \
+               sorted([store.manifest['segments'][0]['file'],
+                       store.manifest['segments'][0]['file'].replace('.jsonl', '.idx')])
+        assert DatasetStore(store.directory).categories() == {'impar': 8, 'par': 1}
+        print(f"✅ Compactação: {segments} segmentos → 1 ({len(expected)} padrões)")
+
+if __name__ == "__main__":
+    test_substituir_categoria_grava_so_o_novo()
+    test_duplicados_e_invalidos()
+    test_indices_lidos_uma_vez()
+    test_compactacao()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Teste do benchmark de latência por etapa
+Corpus sintético, relatório com percentis e detecção de regressões
+"""
+
+import sys
+import copy
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_benchmark import (STAGES, load_templates, synthetic_patterns, build_benchmark_system,
+                              run_benchmark, find_regressions, load_baseline, save_baseline)
+
+TRAINING_DIR = project_root / "dados" / "training"
+
+def test_corpus_sintetico():
+    """Padrões sintéticos são reprodutíveis e mantêm categorias e respostas reais"""
+    templates = load_templates(TRAINING_DIR)
+    assert templates
+
+    patterns = list(synthetic_patterns(templates, 1000))
+    assert patterns == list(synthetic_patterns(templates, 1000))
+    assert {p['category'] for p in patterns} == {t['category'] for t in templates}
+    assert {p['response'] for p in patterns} <= {t['response'] for t in templates}
+
+    ai_system = build_benchmark_system(iter(patterns), len(patterns))
+    assert ai_system.pattern_index.size == len(ai_system.training_patterns) == 1000
+    assert ai_system.training_patterns[5]['question'] == patterns[5]['question']
+
+    response, confidence, category = ai_system.advanced_similarity_search("meu produto veio com defeito")
+    print(f"✅ Corpus sintético: {category} ({confidence:.3f})")
+    assert category == 'produto_defeituoso'
+
+def test_relatorio_e_regressoes():
+    """Todas as etapas medidas; regressões só acima da tolerância"""
+    print("⏱️ TESTE DO BENCHMARK")
+    print("=" * 50)
+
+    templates = load_templates(TRAINING_DIR)
+    queries = [item['question'] for item in templates][:20]
+    report = run_benchmark(templates, queries, scales=[500], log=lambda message: None)
+
+    assert set(report['results']) == {'real', '500'}
+    assert set(STAGES) <= set(report['results']['real'])
+    for stage in ('scoring', 'search'):
+        result = report['results']['500'][stage]
+        assert result['calls'] == len(queries)
+        assert 0 < result['p50_ms'] <= result['p95_ms'] <= result['p99_ms']
+        assert result['throughput'] > 0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        baseline_file = Path(temp_dir) / "baseline.json"
+        assert load_baseline(baseline_file) is None
+        save_baseline(baseline_file, report)
+        baseline = load_baseline(baseline_file)
+
+    assert find_regressions(report, baseline) == []
+
+    # Busca 3x mais lenta que a baseline
+    slower = copy.deepcopy(report)
+    for metric in ('p50_ms', 'p95_ms'):
+        slower['results']['500']['search'][metric] = baseline['results']['500']['search'][metric] * 3 + 1
+    regressions = find_regressions(slower, baseline)
+    assert {(r['corpus'], r['stage']) for r in regressions} == {('500', 'search')}
+    print(f"✅ {len(regressions)} regressões detectadas na busca mais lenta")
+
+if __name__ == "__main__":
+    test_corpus_sintetico()
+    test_relatorio_e_regressoes()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Teste da busca em cascata (cosseno top-k + reordenação completa)
+Scores dos candidatos iguais aos da busca exaustiva, recall por k e
+lista top-k com o detalhe de cada termo
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+MESSAGES = [
+    "meu produto chegou todo quebrado",
+    "quero cancelar a compra urgente",
+    "como faço para pagar no pix?",
+    "não quero devolver, manda outro"
+]
+
+def test_cascata_contra_exaustiva():
+    """Candidatos pontuados como na exaustiva; com k = todos os padrões o resultado é exato"""
+    print("🪜 TESTE DA BUSCA EM CASCATA")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    size = ai_system.pattern_index.size
+
+    for message in MESSAGES:
+        processed = ai_system.processor.advanced_preprocess(message)
+        embedding = ai_system.processor.create_advanced_embedding(processed)
+        intent = ai_system.detect_primary_intent(processed)
+        scores = ai_system.score_all_patterns(processed, embedding, intent)
+
+        pattern_ids, cascade_scores = ai_system.score_cascade_candidates(processed, embedding, intent, k=16)
+        assert pattern_ids.size == 16 and np.all(np.diff(pattern_ids) > 0)
+        assert np.array_equal(cascade_scores, scores[pattern_ids])
+
+        # Os candidatos são os 16 maiores cossenos
+        cosine = ai_system.pattern_index.cosine_scores(embedding.reshape(1, -1))[0]
+        assert cosine[pattern_ids].min() >= np.sort(cosine)[-16]
+
+        pattern_ids, cascade_scores = ai_system.score_cascade_candidates(processed, embedding, intent, k=size + 10)
+        assert np.array_equal(pattern_ids, np.arange(size))
+        assert np.array_equal(cascade_scores, scores)
+
+    with open(TRAINING_FILE, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)] + MESSAGES
+    results = ai_system.evaluate_cascade_search(questions, (4, 32, size))
+    for k, result in results.items():
+        print(f"🔎 k={k}: recall@1={result['recall_at_1']:.3f} recall@5={result['recall_at_5']:.3f} "
+              f"pontuados={result['candidate_fraction']:.1%}")
+    assert results[size]['recall_at_1'] == results[size]['recall_at_5'] == 1.0
+    assert results[32]['recall_at_5'] >= results[4]['recall_at_5']
+    assert results[32]['recall_at_1'] >= 0.95
+    assert results[32]['candidate_fraction'] < 0.2
+
+def test_top_k_com_detalhes():
+    """Lista ordenada por score, detalhes só dos itens retornados, modo cascade responde"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    exhaustive = ai_system.top_matches(MESSAGES[0], top_k=5)
+    assert len(exhaustive) == 5
+    assert [m['score'] for m in exhaustive] == sorted((m['score'] for m in exhaustive), reverse=True)
+    for match in exhaustive:
+        details = match['scoring_details']
+        assert set(details) >= {'cosine', 'semantic', 'context', 'category_boost', 'intent_boost', 'final_score'}
+        assert abs(details['final_score'] - match['score']) < 1e-5
+
+    ai_system.search_mode = 'cascade'
+    ai_system.cascade_k = 64
+    cascade = ai_system.top_matches(MESSAGES[0], top_k=5)
+    assert cascade[0]['pattern_id'] == exhaustive[0]['pattern_id']
+
+    response, confidence, category = ai_system.advanced_similarity_search(MESSAGES[0])
+    assert category == exhaustive[0]['category'] and confidence == exhaustive[0]['score']
+    print(f"✅ Top-5: {[m['category'] for m in cascade]}")
+
+if __name__ == "__main__":
+    test_cascata_contra_exaustiva()
+    test_top_k_com_detalhes()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Teste da busca podada por clusters
+Compara a busca por clusters com a busca exaustiva
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_cluster_index import MAX_CLUSTER_SIZE
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_busca_clusters():
+    """Recall contra a busca exaustiva e cobertura dos padrões novos"""
+    print("🧭 TESTE DA BUSCA POR CLUSTERS")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    cluster_index = ai_system.ensure_cluster_index()
+    index = ai_system.pattern_index
+
+    # Todo padrão pertence a exatamente um cluster da sua categoria
+    assert sorted(cluster_index.member_ids.tolist()) == list(range(index.size))
+    sizes = np.bincount(index.category_ids)
+    for category_id, size in enumerate(sizes):
+        clusters = int(np.sum(cluster_index.cluster_categories == category_id))
+        assert clusters == 1 or size > MAX_CLUSTER_SIZE
+
+    with open(TRAINING_FILE, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+
+    results = ai_system.evaluate_cluster_search(questions, (1, 8, cluster_index.num_clusters))
+    for probe, result in results.items():
+        print(f"🔎 probe={probe}: recall@1={result['recall_at_1']:.3f} "
+              f"pontuados={result['candidate_fraction']:.1%}")
+
+    # Visitando todos os clusters a busca é exata
+    assert results[cluster_index.num_clusters]['recall_at_1'] == 1.0
+    assert results[8]['candidate_fraction'] < 0.5
+    assert results[8]['recall_at_1'] >= results[1]['recall_at_1']
+    assert results[8]['recall_at_1'] >= 0.8
+
+    # Modo de busca por clusters responde normalmente
+    ai_system.search_mode = 'clusters'
+    response, confidence, category = ai_system.advanced_similarity_search("meu produto veio quebrado")
+    print(f"✅ Modo clusters: {category} ({confidence:.3f})")
+    assert confidence > 0
+
+    # Padrão aprendido depois da construção entra na cauda sempre pontuada
+    assert ai_system.dynamic_learning("vocês entregam em fernando de noronha?",
+                                      "Sim, entregamos em todo o Brasil.", "entrega_ilhas")
+    processed = ai_system.processor.advanced_preprocess("vocês entregam em fernando de noronha?")
+    embedding = ai_system.processor.create_advanced_embedding(processed)
+    intent = ai_system.detect_primary_intent(processed)
+    pattern_ids, _ = ai_system.score_cluster_candidates(processed, embedding, intent, probe=1)
+    assert index.size - 1 in pattern_ids.tolist()
+
+if __name__ == "__main__":
+    test_busca_clusters()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Teste da busca em lote (search_many)
+Verifica se o lote coincide com as buscas individuais sob o mesmo contexto
+"""
+
+import sys
+import copy
+import time
+import random
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_search_many_equivale_individual():
+    """Compara search_many com advanced_similarity_search mensagem a mensagem"""
+    print("📦 TESTE DA BUSCA EM LOTE")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    messages = [
+        "olá",
+        "meu produto veio quebrado",
+        "não quero devolver pode mandar novamente?",
+        "quero cancelar o pedido",
+        "preciso alterar endereço",
+        "como pagar com pix",
+        "onde está meu pedido 12345",
+        "notebook não liga"
+    ] * 4
+
+    # Sessão com contexto prévio
+    session = ai_system.get_session("cliente-lote")
+    ai_system.handle_message("olá", session)
+    ai_system.handle_message("meu pedido não chegou", session)
+
+    # Buscas individuais, cada uma sobre uma cópia do mesmo contexto
+    random.seed(7)
+    start_time = time.perf_counter()
+    individual = [ai_system.advanced_similarity_search(message, copy.deepcopy(session))
+                  for message in messages]
+    individual_time = time.perf_counter() - start_time
+
+    # Mesmas mensagens em lote
+    random.seed(7)
+    start_time = time.perf_counter()
+    batch = ai_system.search_many(messages, session)
+    batch_time = time.perf_counter() - start_time
+
+    assert len(batch) == len(messages)
+    for message, (_, single_score, single_category), (_, batch_score, batch_category) in zip(
+            messages, individual, batch):
+        status = "✅" if single_category == batch_category else "❌"
+        print(f"{status} \"{message}\" → {batch_category} ({batch_score:.4f} vs {single_score:.4f})")
+        assert single_category == batch_category
+        assert abs(single_score - batch_score) < 1e-6
+
+    print(f"\n⏱️ Individual: {individual_time * 1000:.1f} ms | Lote: {batch_time * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    test_search_many_equivale_individual()
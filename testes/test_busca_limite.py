@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Teste da busca por limite superior (branch-and-bound)
+Mesmo padrão vencedor e mesmo score da busca exaustiva, pontuando só
+uma fração dos padrões
+"""
+
+import sys
+import json
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_bound_search import branch_and_bound
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_branch_and_bound_generico():
+    """Limites válidos (com empates) devolvem o argmax exato"""
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        size = int(rng.integers(1, 500))
+        scores = np.round(rng.random(size), 2)          # muitos empates
+        bounds = scores + rng.random(size) * rng.choice([0.0, 0.05, 1.0])
+        pattern_ids, found = branch_and_bound(bounds, lambda ids: scores[ids], batch=8)
+        assert np.all(np.diff(pattern_ids) > 0)
+        assert np.array_equal(found, scores[pattern_ids])
+        assert int(pattern_ids[int(np.argmax(found))]) == int(np.argmax(scores))
+
+def test_busca_limite_igual_a_exaustiva():
+    """Argmax idêntico em todas as perguntas do treinamento, com e sem contexto"""
+    print("✂️ TESTE DA BUSCA POR LIMITE")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    with open(TRAINING_FILE, 'r', encoding='utf-8') as f:
+        questions = [item['question'] for item in json.load(f)]
+    questions += ["olá", "xyz abc", "quero cancelar e pagar com pix"]
+
+    result = ai_system.evaluate_bound_search(questions)
+    print(f"✅ argmax={result['argmax_agreement']:.3f} podados={result['pruned_fraction']:.1%}")
+    assert result['argmax_agreement'] == 1.0
+    assert result['pruned_fraction'] > 0.5
+
+    # Com histórico na sessão (termo de contexto ativo)
+    session = ai_system.get_session('limite')
+    session.record_interaction("cadê meu pedido", "ok", 0.9, 'pedidos', 0.01)
+    for question in questions[::10]:
+        processed = ai_system.processor.advanced_preprocess(question)
+        embedding = ai_system.processor.create_advanced_embedding(processed, session.context_vector())
+        intent = ai_system.detect_primary_intent(processed)
+        scores = ai_system.score_all_patterns(processed, embedding, intent, session)
+        pattern_ids, bound_scores = ai_system.score_bounded_candidates(processed, embedding, intent, session)
+        assert np.array_equal(bound_scores, scores[pattern_ids])
+        assert int(pattern_ids[int(np.argmax(bound_scores))]) == int(np.argmax(scores))
+
+    # Modo de busca responde como a exaustiva e conta os padrões podados
+    message = "meu produto veio quebrado"
+    expected = ai_system.run_similarity_search(message, ai_system.get_session('a'), update_metrics=False)[0]
+    pruned_before = ai_system.bound_pruned_counter.labels().value
+    ai_system.search_mode = 'bound'
+    found = ai_system.run_similarity_search(message, ai_system.get_session('b'), update_metrics=False)[0]
+    assert found[1:] == expected[1:]
+    assert ai_system.bound_pruned_counter.labels().value > pruned_before
+    assert 'shopee_bound_patterns_pruned_total' in ai_system.metrics.render()
+    print(f"✅ Modo bound: {found[2]} ({found[1]:.3f})")
+
+if __name__ == "__main__":
+    test_branch_and_bound_generico()
+    test_busca_limite_igual_a_exaustiva()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Teste do cache incremental de embeddings
+Uma recarga do JSON de treinamento só processa perguntas novas
+"""
+
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def load_counting(training_file: Path, cache_file: Path):
+    """Carrega o JSON contando quantas perguntas geraram embedding novo"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = str(cache_file)
+
+    calls = []
+    create_embedding = ai_system.processor.create_advanced_embedding
+    def counting_create(processed, context_vector=None):
+        calls.append(processed['original'])
+        return create_embedding(processed, context_vector)
+    ai_system.processor.create_advanced_embedding = counting_create
+
+    assert ai_system.load_advanced_training_data(str(training_file))
+    ai_system.processor.create_advanced_embedding = create_embedding
+    return ai_system, len(calls)
+
+def test_recarga_processa_so_o_que_mudou():
+    """Primeira carga processa tudo; recargas só as perguntas novas"""
+    print("♻️ TESTE DO CACHE DE EMBEDDINGS")
+    print("=" * 50)
+
+    with open(TRAINING_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        training_file = directory / "treino.json"
+        cache_file = directory / "cache.bin"
+        training_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+        first, first_calls = load_counting(training_file, cache_file)
+        print(f"📊 Primeira carga: {first_calls} embeddings calculados")
+        assert first_calls == len(data)
+        assert cache_file.exists()
+        saved_at = cache_file.stat().st_mtime_ns
+
+        second, second_calls = load_counting(training_file, cache_file)
+        print(f"📊 Recarga sem mudanças: {second_calls} embeddings calculados")
+        assert second_calls == 0
+
+        # Com perguntas repetidas no JSON o cache continua atual (não é regravado)
+        assert len({item['question'] for item in data}) < len(data)
+        assert cache_file.stat().st_mtime_ns == saved_at
+
+        # Vocabulário salvo incorporado ao do processador
+        assert set(second.processor.word_vectors) == set(first.processor.word_vectors)
+        assert np.array_equal(second.processor.attention_weights, first.processor.attention_weights)
+
+        # Perguntas repetidas no JSON compartilham a entrada da primeira ocorrência
+        cached_embeddings = {}
+        for pattern in first.training_patterns:
+            cached_embeddings.setdefault(pattern['hash'], pattern['embedding'])
+        for before, after in zip(first.training_patterns, second.training_patterns):
+            assert np.allclose(cached_embeddings[before['hash']], after['embedding'])
+            assert before['processed'] == after['processed']
+
+        # Mesmas respostas com o estado restaurado do cache
+        for message in ["meu produto veio quebrado", "como pagar com pix"]:
+            expected = first.advanced_similarity_search(message)
+            actual = second.advanced_similarity_search(message)
+            assert expected[2] == actual[2]
+
+        # Alguns padrões novos e uma pergunta alterada
+        data.append({'question': 'vocês entregam em fernando de noronha?',
+                     'response': 'Sim, entregamos em todo o Brasil.', 'category': 'entrega'})
+        data.append({'question': 'posso pagar com boleto parcelado?',
+                     'response': 'O boleto é à vista.', 'category': 'pagamento'})
+        data[0] = dict(data[0], question=data[0]['question'] + ' por favor')
+        training_file.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+
+        third, third_calls = load_counting(training_file, cache_file)
+        print(f"📊 Recarga com 3 mudanças: {third_calls} embeddings calculados")
+        assert third_calls == 3
+        assert len(third.training_patterns) == len(data)
+
+if __name__ == "__main__":
+    test_recarga_processa_so_o_que_mudou()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Teste do cache de respostas
+Mensagens repetidas no mesmo contexto reaproveitam o resultado da busca
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_response_cache import ResponseCache
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def count_searches(ai_system: ShopeeNeuralAI):
+    """Conta quantas buscas completas foram executadas"""
+    calls = []
+    run_search = ai_system.search_match
+    def counting_search(*args, **kwargs):
+        calls.append(args[0])
+        return run_search(*args, **kwargs)
+    ai_system.search_match = counting_search
+    return calls
+
+def test_cache_de_respostas():
+    """Acertos, chave com contexto, TTL, LRU e invalidação"""
+    print("⚡ TESTE DO CACHE DE RESPOSTAS")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    calls = count_searches(ai_system)
+
+    # Mesma mensagem (com outra grafia) em sessões novas: uma única busca
+    first = ai_system.advanced_similarity_search("onde está meu pedido", ai_system.get_session('a'))
+    second = ai_system.advanced_similarity_search("  Onde está  MEU pedido ", ai_system.get_session('b'))
+    assert first == second
+    assert len(calls) == 1
+    assert ai_system.get_session('b').context_memory, "acerto também alimenta o contexto"
+
+    # Categorias recentes diferentes mudam a chave
+    session = ai_system.get_session('c')
+    ai_system.handle_message("quero cancelar o pedido", session)
+    ai_system.advanced_similarity_search("onde está meu pedido", session)
+    assert len(calls) == 3
+
+    stats = ai_system.get_detailed_stats()['response_cache']
+    print(f"📊 {stats['hits']} acertos, {stats['misses']} faltas")
+    assert stats['hits'] == 1 and stats['misses'] == 3
+
+    # Aprendizado dinâmico invalida os resultados
+    assert ai_system.dynamic_learning("meu cupom de frete não aparece no carrinho",
+                                      "Verifique o valor mínimo do cupom.", "cupons")
+    ai_system.advanced_similarity_search("onde está meu pedido", ai_system.get_session('d'))
+    assert len(calls) == 4
+
+    # Outro modo de busca não reaproveita o resultado do modo anterior
+    ai_system.search_mode = 'cascade'
+    ai_system.advanced_similarity_search("onde está meu pedido", ai_system.get_session('e'))
+    assert len(calls) == 5
+    ai_system.search_mode = 'exhaustive'
+
+    # Rerank do int8 também muda o padrão escolhido
+    ai_system.quantized_rerank = 0
+    ai_system.advanced_similarity_search("onde está meu pedido", ai_system.get_session('f'))
+    assert len(calls) == 6
+    ai_system.quantized_rerank = 8
+
+    # Acerto grava no contexto o embedding calculado com o contexto desta sessão
+    session = ai_system.get_session('g')
+    ai_system.advanced_similarity_search("meu produto veio quebrado", session)
+    context = session.context_vector()
+    searches = len(calls)
+    ai_system.advanced_similarity_search("onde está meu pedido", session)
+    assert len(calls) == searches, "contexto de categorias igual: acerto esperado"
+    processed = ai_system.processor.advanced_preprocess("onde está meu pedido")
+    expected = ai_system.processor.create_advanced_embedding(processed, context)
+    assert np.array_equal(session.context_memory[-1], expected)
+
+    # Resultado calculado antes de uma invalidação não volta ao cache
+    cache = ResponseCache()
+    generation = cache.generation
+    cache.invalidate()
+    cache.put(cache.make_key("olá"), "antigo", generation)
+    assert cache.get(cache.make_key("olá")) is None
+    cache.put(cache.make_key("olá"), "novo", cache.generation)
+    assert cache.get(cache.make_key("olá")) == "novo"
+
+    # TTL e LRU
+    cache = ResponseCache(max_entries=2, ttl=0.05)
+    for text in ("olá", "oi", "bom dia"):
+        cache.put(cache.make_key(text), text)
+    assert cache.get(cache.make_key("olá")) is None
+    assert cache.get(cache.make_key("bom dia")) == "bom dia"
+    time.sleep(0.1)
+    assert cache.get(cache.make_key("bom dia")) is None
+    assert cache.get_stats()['expirations'] == 1
+    print("✅ Chave com contexto, TTL, LRU e invalidação funcionando")
+
+def test_personalizacao_sorteada_a_cada_acerto():
+    """O cache guarda o padrão escolhido; a frase de empatia/urgência é sorteada a cada resposta"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    calls = count_searches(ai_system)
+
+    message = "urgente!!! meu produto chegou quebrado, péssimo, estou revoltado"
+    responses = set()
+    for i in range(30):
+        response, _, category = ai_system.advanced_similarity_search(message, ai_system.get_session(f's{i}'))
+        responses.add(response)
+    assert ai_system.response_cache.hits == 29
+    assert len(responses) > 1, "prefixo sorteado não pode ficar congelado no cache"
+    print(f"🎲 {len(responses)} variações da resposta servidas pelo cache")
+
+def test_preaquecimento_pelo_historico():
+    """Consultas frequentes salvas no modelo são pré-calculadas na próxima carga"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_system = ShopeeNeuralAI()
+        ai_system.embedding_cache_file = None
+        ai_system.model_file = str(Path(temp_dir) / "modelo.snap")
+        ai_system.metrics_file = str(Path(temp_dir) / "metricas.json")
+        assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+        for _ in range(3):
+            ai_system.advanced_similarity_search("como pagar com pix", ai_system.get_session('x'))
+        ai_system.advanced_similarity_search("olá", ai_system.get_session('y'))
+        assert ai_system.save_model()
+
+        loaded = ShopeeNeuralAI()
+        loaded.model_file = ai_system.model_file
+        loaded.metrics_file = ai_system.metrics_file
+        assert loaded.load_model()
+        total_interactions = loaded.performance_metrics['total_interactions']
+        assert loaded.prewarm_response_cache() == 2
+        assert loaded.performance_metrics['total_interactions'] == total_interactions
+
+        calls = count_searches(loaded)
+        expected = ai_system.advanced_similarity_search("como pagar com pix", ai_system.get_session('z'))
+        assert loaded.advanced_similarity_search("como pagar com pix", loaded.get_session('z')) == expected
+        assert not calls
+        print("🔥 Pré-aquecimento a partir do histórico salvo")
+
+if __name__ == "__main__":
+    test_cache_de_respostas()
+    test_personalizacao_sorteada_a_cada_acerto()
+    test_preaquecimento_pelo_historico()
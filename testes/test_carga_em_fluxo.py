@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Teste da carga de treinamento em fluxo
+JSONL e listas JSON (com gzip/lzma), registros inválidos ignorados e
+vários arquivos combinados em uma única passada
+"""
+
+import sys
+import io
+import gzip
+import json
+import lzma
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_training_stream import (LoadStats, iter_json_array, iter_training_records,
+                                    chunked, source_format)
+
+TRAINING_DIR = project_root / "dados" / "training"
+
+PATTERNS = [
+    {"question": "meu produto veio quebrado", "response": "Sinto muito!", "confidence": 0.9,
+     "category": "produto_defeituoso"},
+    {"question": "quero cancelar meu pedido", "response": "Posso ajudar.", "category": "cancelamento_pedido"},
+    {"question": "preciso mudar o endereço", "response": "Claro!", "confidence": 1,
+     "category": "alteracao_dados"}
+]
+
+def jsonl_text(lines):
+    return '\n'.join(lines) + '\n'
+
+def test_leitura_de_formatos():
+    """JSONL, lista JSON e versões comprimidas; inválidos contados por arquivo"""
+    print("📥 TESTE DA CARGA EM FLUXO")
+    print("=" * 50)
+
+    lines = [json.dumps(PATTERNS[0]), '{quebrado', json.dumps(PATTERNS[1]), '',
+             json.dumps({"question": "sem resposta"}), json.dumps(PATTERNS[2]),
+             json.dumps({"question": "x", "response": "y", "confidence": "alta"})]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp = Path(temp_dir)
+        (temp / "a.jsonl").write_text(jsonl_text(lines), encoding='utf-8')
+        with gzip.open(temp / "b.jsonl.gz", 'wt', encoding='utf-8') as f:
+            f.write(jsonl_text(lines))
+        with lzma.open(temp / "c.json.xz", 'wt', encoding='utf-8') as f:
+            json.dump(PATTERNS, f, ensure_ascii=False)
+
+        assert source_format(str(temp / "b.jsonl.gz")) == 'jsonl'
+        assert source_format(str(temp / "c.json.xz")) == 'json'
+
+        stats = LoadStats()
+        sources = [str(temp / "*.jsonl*"), str(temp / "c.json.xz"), str(temp / "inexistente.json")]
+        records = list(iter_training_records(sources, stats))
+
+    assert [r['question'] for r in records] == [p['question'] for p in PATTERNS] * 3
+    assert records[1]['confidence'] == 0.8 and records[1]['category'] == 'cancelamento_pedido'
+    assert stats.loaded == 9
+    assert stats.skipped == 6
+    assert [Path(name).name for name in stats.per_source] == ["a.jsonl", "b.jsonl.gz", "c.json.xz"]
+    assert [Path(name).name for name in stats.failed_sources] == ["inexistente.json"]
+    print(f"✅ {stats.loaded} padrões carregados, {stats.skipped} ignorados")
+
+def test_lista_json_incremental():
+    """Lista lida em blocos pequenos; elemento malformado encerra o arquivo"""
+    import shopee_training_stream
+    original = shopee_training_stream.READ_SIZE
+    shopee_training_stream.READ_SIZE = 7
+    try:
+        text = json.dumps(PATTERNS + [12345, "texto"], ensure_ascii=False, indent=2)
+        assert list(iter_json_array(io.StringIO(text))) == PATTERNS + [12345, "texto"]
+        assert list(iter_json_array(io.StringIO('[]'))) == []
+
+        broken = '[' + json.dumps(PATTERNS[0]) + ', {"question": }, ' + json.dumps(PATTERNS[1]) + ']'
+        assert list(iter_json_array(io.StringIO(broken))) == [PATTERNS[0], None]
+        assert list(iter_json_array(io.StringIO('{"question": "x"}'))) == [None]
+    finally:
+        shopee_training_stream.READ_SIZE = original
+
+    assert [len(chunk) for chunk in chunked(range(10), 4)] == [4, 4, 2]
+
+def test_combinar_arquivos_de_treinamento():
+    """dados/training/*.json carregados juntos equivalem a um JSONL com os mesmos padrões"""
+    files = sorted(TRAINING_DIR.glob("*.json"))
+    expected = [item for path in files for item in json.loads(path.read_text(encoding='utf-8'))]
+
+    merged = ShopeeNeuralAI()
+    merged.embedding_cache_file = None
+    assert merged.load_training_stream([str(TRAINING_DIR / "*.json")], chunk_size=64)
+    assert merged.training_load_stats.loaded == len(expected)
+    assert len(merged.training_patterns) == len(expected)
+    assert len(merged.training_load_stats.per_source) == len(files)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        jsonl_file = Path(temp_dir) / "treinamento.jsonl.gz"
+        with gzip.open(jsonl_file, 'wt', encoding='utf-8') as f:
+            for item in expected:
+                f.write(json.dumps(item, ensure_ascii=False) + '\n')
+
+        single = ShopeeNeuralAI()
+        single.embedding_cache_file = None
+        assert single.load_training_stream([str(jsonl_file)])
+
+    assert [p['question'] for p in single.training_patterns] == [p['question'] for p in merged.training_patterns]
+    assert (single.pattern_index.embeddings == merged.pattern_index.embeddings).all()
+
+    response, confidence, category = merged.advanced_similarity_search("meu produto veio com defeito")
+    print(f"✅ {len(files)} arquivos combinados: {len(expected)} padrões; busca -> {category}")
+    assert category == 'produto_defeituoso'
+
+    # Nenhum padrão válido: a carga falha
+    empty = ShopeeNeuralAI()
+    empty.embedding_cache_file = None
+    assert not empty.load_training_stream([str(TRAINING_DIR / "nada_*.json")])
+
+if __name__ == "__main__":
+    test_leitura_de_formatos()
+    test_lista_json_incremental()
+    test_combinar_arquivos_de_treinamento()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Teste dos embeddings determinísticos
+A mesma pergunta gera o mesmo embedding em qualquer processo,
+e n-gramas novos não ocupam memória
+"""
+
+import sys
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import AdvancedNeuralProcessor
+from shopee_ngram_encoder import HashedNgramEncoder
+
+MESSAGES = [
+    "meu produto veio quebrado e quero devolver",
+    "como pagar com pix no app da shopee",
+    "o entregador não encontrou o endereço rua das flores 123"
+]
+
+# Script executado em um processo novo (hash() do Python muda a cada processo)
+CHILD_SCRIPT = """
+import sys
+sys.path.insert(0, {core!r})
+from shopee_neural_ai_advanced import AdvancedNeuralProcessor
+processor = AdvancedNeuralProcessor()
+for message in {messages!r}:
+    embedding = processor.create_advanced_embedding(processor.advanced_preprocess(message))
+    print(embedding.tobytes().hex())
+"""
+
+def embed_all(processor: AdvancedNeuralProcessor):
+    return [processor.create_advanced_embedding(processor.advanced_preprocess(message))
+            for message in MESSAGES]
+
+def test_mesmo_embedding_entre_processos():
+    """Embeddings idênticos bit a bit em outro processo"""
+    print("🎯 TESTE DE EMBEDDINGS DETERMINÍSTICOS")
+    print("=" * 50)
+
+    local = embed_all(AdvancedNeuralProcessor())
+    assert all(np.array_equal(a, b) for a, b in zip(local, embed_all(AdvancedNeuralProcessor())))
+
+    script = CHILD_SCRIPT.format(core=str(project_root / "core"), messages=MESSAGES)
+    for run in range(2):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                                text=True, check=True).stdout.split()
+        remote = [np.frombuffer(bytes.fromhex(line), dtype=np.float64) for line in output]
+        assert len(remote) == len(local)
+        assert all(np.array_equal(a, b) for a, b in zip(local, remote))
+        print(f"✅ Processo {run + 1}: {len(remote)} embeddings idênticos")
+
+def test_ngramas_sem_estado():
+    """O codificador não guarda nada por n-grama"""
+    processor = AdvancedNeuralProcessor()
+    before = embed_all(processor)
+    for i in range(2000):
+        processor.process_ngrams({'bigrams': [f'pedido_{i}'], 'trigrams': [f'meu_pedido_{i}']})
+    assert not hasattr(processor, 'phrase_vectors')
+    assert all(np.array_equal(a, b) for a, b in zip(before, embed_all(processor)))
+
+    # Sinais e posições fixos; norma esperada de um vetor normal da mesma dimensão
+    encoder = HashedNgramEncoder(25)
+    vector = encoder.encode(['meu_produto'])
+    assert np.array_equal(vector, encoder.encode(['meu_produto']))
+    assert np.count_nonzero(vector) <= encoder.probes
+    assert np.allclose(np.abs(vector[vector != 0]) % encoder.scale, 0)
+    assert np.array_equal(encoder.encode(['a_b', 'c_d']), encoder.encode(['a_b']) + encoder.encode(['c_d']))
+    assert not encoder.encode([]).any()
+    print("✅ N-gramas codificados sem tabela de vetores")
+
+if __name__ == "__main__":
+    test_mesmo_embedding_entre_processos()
+    test_ngramas_sem_estado()
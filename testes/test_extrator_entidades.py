@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Teste de equivalência do extrator compilado de entidades
+CompiledEntityExtractor.extract deve devolver exatamente o mesmo que as
+regex originais de extract_entities, inclusive em frases de várias
+palavras, quebras de linha (regras sequenciais) e tokens como 1_2 e x1
+"""
+
+import re
+import sys
+import random
+from pathlib import Path
+from typing import List, Dict
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_entity_extractor import CompiledEntityExtractor, PHRASE_RULES
+
+def extract_entities_regex(text: str) -> Dict[str, List[str]]:
+    """Implementação original de extract_entities (uma regex por regra)"""
+    entities = {
+        'enderecos': [],
+        'numeros': [],
+        'locais': [],
+        'servicos': [],
+        'problemas': [],
+        'intencoes': [],
+        'acoes': []
+    }
+
+    if re.search(r'\b(endereço|endereco|casa|apartamento|numero|cep|rua|avenida)\b', text):
+        entities['enderecos'].append('endereco_mencionado')
+
+    entities['numeros'].extend(re.findall(r'\b\d+\b', text))
+    entities['locais'].extend(re.findall(r'\b(casa|trabalho|faculdade|hotel|empresa|estado|cidade)\b', text))
+    entities['servicos'].extend(re.findall(r'\b(pedido|entrega|pagamento|pix|reembolso|devolucao|cupom)\b', text))
+
+    if re.search(r'\b(cancelar|cancela|não quero|desistir|parar)\b', text):
+        entities['intencoes'].append('cancelamento')
+
+    if re.search(r'\b(alterar|mudar|corrigir|atualizar|erro)\b', text) and not re.search(r'\b(defeito|quebrado|não funciona)\b', text):
+        entities['intencoes'].append('alteracao')
+
+    if re.search(r'\b(devolver|trocar|reembolso)\b', text):
+        entities['intencoes'].append('devolucao')
+
+    if re.search(r'\b(defeito|defeituoso|quebrado|não funciona|não liga|estragado|danificado|com problema)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    if re.search(r'\b(veio|chegou)\b.*\b(quebrado|defeito|estragado|com problema|usado|sujo)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    if re.search(r'\b(produto|celular|notebook|tv|fone|mouse|teclado)\b.*\b(não funciona|não liga|quebrado|defeito)\b', text):
+        entities['intencoes'].append('produto_defeituoso')
+
+    if re.search(r'\b(não quero devolver|sem devolver|não devolver)\b.*\b(mandar|enviar|novo|outro)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    if re.search(r'\b(pode mandar|pode enviar|reenvia|reenviar|segunda entrega|segunda via)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    if re.search(r'\b(substituir|substituto|trocar por outro|produto de reposição)\b', text):
+        entities['intencoes'].append('reenvio_produto')
+
+    entities['acoes'].extend(re.findall(r'\b(quero|preciso|como|onde|quando|posso)\b', text))
+    return entities
+
+CASOS = [
+    "",
+    "meu produto veio quebrado",
+    "não quero devolver pode mandar novamente?",
+    "não quero devolver\nmandar outro",
+    "veio certinho\nmas está quebrado",
+    "chegou\n\nsujo e usado",
+    "celular não liga\ne o fone não funciona",
+    "não  quero devolver, mandar outro",
+    "trocar por outro produto de reposição",
+    "trocar  por outro",
+    "1_2 x1 12 3.5 10-20 cep 01310-100 rua 7",
+    "pedido_1 pedido1 pedidos pedido. pix!pix",
+    "quero quero alterar o erro do defeito",
+    "não quero\nnão quero devolver mandar",
+    "produto de reposição chegou quebrado",
+    "substituto\tsegunda via\r\nsegunda entrega",
+    "endereço endereco casa trabalho casa"
+]
+
+def test_casos_conhecidos():
+    """Frases de várias palavras, linhas e tokens alfanuméricos"""
+    print("🔎 TESTE DE EQUIVALÊNCIA DO EXTRATOR DE ENTIDADES")
+    print("=" * 50)
+
+    extractor = CompiledEntityExtractor()
+    for text in CASOS:
+        assert extractor.extract(text) == extract_entities_regex(text), repr(text)
+    print(f"✅ {len(CASOS)} casos idênticos às regex originais")
+
+def test_combinacoes_aleatorias():
+    """Frases sorteadas das regras com separadores variados, comparadas com as regex"""
+    rng = random.Random(7)
+    phrases = sorted({phrase for rule_phrases in PHRASE_RULES.values() for phrase in rule_phrases})
+    fillers = ["a", "meu", "1_2", "x1", "42", "não", "por", "de", "produtos", "pix2", "sem"]
+    separators = [" ", " ", " ", "  ", ", ", "\n", ". ", "-", "_", "\t"]
+    vocabulary = phrases + fillers + [word for phrase in phrases for word in phrase.split()]
+
+    extractor = CompiledEntityExtractor()
+    for _ in range(5000):
+        pieces = [rng.choice(vocabulary) for _ in range(rng.randint(1, 8))]
+        text = pieces[0]
+        for piece in pieces[1:]:
+            text += rng.choice(separators) + piece
+        assert extractor.extract(text) == extract_entities_regex(text), repr(text)
+    print("✅ 5000 combinações aleatórias idênticas às regex originais")
+
+if __name__ == "__main__":
+    test_casos_conhecidos()
+    test_combinacoes_aleatorias()
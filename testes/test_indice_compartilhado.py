@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Teste do índice em memória compartilhada
+Verifica se um sistema anexado ao segmento responde igual ao original
+"""
+
+import gc
+import sys
+import random
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_shared_index import SharedIndex, attach_shared_ai
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_indice_compartilhado_equivale_original():
+    """Compara respostas do sistema original e do anexado à memória compartilhada"""
+    print("🧠 TESTE DO ÍNDICE COMPARTILHADO")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    shared = SharedIndex.create(ai_system.export_index_arrays())
+    attached_shared = None
+    try:
+        attached, attached_shared = attach_shared_ai(shared.name, shared.layout)
+        print(f"📦 Segmento: {shared.size / 1024:.0f} KB | {len(attached.training_patterns)} padrões")
+        compare_systems(ai_system, attached)
+    finally:
+        # Libera as visões antes de fechar os mapeamentos
+        attached = None
+        gc.collect()
+        if attached_shared is not None:
+            attached_shared.close()
+        shared.close()
+
+def compare_systems(ai_system: ShopeeNeuralAI, attached: ShopeeNeuralAI):
+    """Compara padrões e respostas dos dois sistemas"""
+    assert len(attached.training_patterns) == len(ai_system.training_patterns)
+    assert not attached.pattern_index.embeddings.flags.writeable
+
+    # Padrões materializados sob demanda a partir dos arrays
+    for i in (0, len(ai_system.training_patterns) // 2, -1):
+        original, lazy = ai_system.training_patterns[i], attached.training_patterns[i]
+        assert lazy['question'] == original['question']
+        assert lazy['response'] == original['response']
+        assert lazy['category'] == original['category']
+        assert lazy['processed']['tokens'] == original['processed']['tokens']
+
+    messages = [
+        "olá",
+        "meu produto veio quebrado",
+        "não quero devolver pode mandar novamente?",
+        "quero cancelar o pedido",
+        "como pagar com pix",
+        "onde está meu pedido 12345",
+        "xyz abc"
+    ]
+
+    for seed, message in enumerate(messages):
+        results = []
+        for system in (ai_system, attached):
+            np.random.seed(seed)
+            random.seed(seed)
+            results.append(system.handle_message(message, system.get_session(f"s-{seed}")))
+
+        expected, actual = results
+        status = "✅" if expected['category'] == actual['category'] else "❌"
+        print(f"{status} \"{message}\" → {actual['category']} ({actual['confidence']:.4f})")
+        assert expected['response'] == actual['response']
+        assert abs(expected['confidence'] - actual['confidence']) < 1e-6
+
+    # Workers são somente leitura
+    assert not attached.dynamic_learning("pergunta nova", "resposta nova")
+
+if __name__ == "__main__":
+    test_indice_compartilhado_equivale_original()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Teste das matrizes esparsas de termos do índice
+Jaccard de tokens/entidades via scipy.sparse e sentimento via tabela de
+vetores distintos equivalem à similaridade semântica calculada padrão a padrão
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_pattern_index import PatternIndex, PENDING_LIMIT
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+MESSAGES = [
+    "meu produto veio quebrado e quero reembolso urgente",
+    "preciso mudar o endereço de entrega do pedido",
+    "obrigado, ótimo atendimento",
+    "não quero devolver pode mandar novamente?",
+    "xyzzy"
+]
+
+def reference_scores(ai_system, processed):
+    """Similaridade semântica padrão a padrão (implementação de referência)"""
+    return np.array([ai_system.semantic_similarity(processed, pattern['processed'])
+                     for pattern in ai_system.training_patterns])
+
+def test_semantica_esparsa_igual_a_referencia():
+    """Mesmos scores que semantic_similarity, com e sem padrões pendentes"""
+    print("🧮 TESTE DAS MATRIZES ESPARSAS")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    index = ai_system.pattern_index
+
+    assert isinstance(index.token_terms.matrix, sp.csc_matrix)
+    assert index.token_terms.matrix.shape == (index.size, len(index.token_terms.terms))
+    assert len(index.sentiment_table) < index.size
+    print(f"✅ {index.token_terms.matrix.nnz} tokens em matriz {index.token_terms.matrix.shape}, "
+          f"{len(index.sentiment_table)} sentimentos distintos")
+
+    # Padrões aprendidos ficam pendentes até a consolidação
+    for i in range(PENDING_LIMIT // 2):
+        assert ai_system.dynamic_learning(f"cupom {i} não aplicou no carrinho urgente",
+                                          f"resposta {i}", "cupons")
+    assert index.token_terms.pending_rows > 0
+
+    for message in MESSAGES:
+        processed = ai_system.processor.advanced_preprocess(message)
+        expected = reference_scores(ai_system, processed)
+        assert np.allclose(index.semantic_scores(processed), expected, atol=1e-12), message
+
+        ids = np.arange(0, index.size, 7)
+        assert np.allclose(index.semantic_scores(processed, ids), expected[ids], atol=1e-12)
+
+    # Consolidar não muda os scores
+    processed = ai_system.processor.advanced_preprocess(MESSAGES[0])
+    before = index.semantic_scores(processed)
+    index.token_terms.fold()
+    index.entity_terms.fold()
+    assert index.token_terms.pending_rows == 0
+    assert np.array_equal(index.semantic_scores(processed), before)
+
+    # Arrays exportados reabrem como a mesma matriz
+    reopened = PatternIndex(index.embedding_dim)
+    reopened.load_arrays(index.export_arrays())
+    assert np.array_equal(reopened.semantic_scores(processed), before)
+    print("✅ Scores idênticos à referência padrão a padrão")
+
+if __name__ == "__main__":
+    test_semantica_esparsa_igual_a_referencia()
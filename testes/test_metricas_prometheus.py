@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Teste das métricas em formato Prometheus
+Histogramas por etapa e categoria, contadores e medidores exportados em /metrics
+"""
+
+import sys
+import asyncio
+import tempfile
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_metrics import MetricsRegistry
+from shopee_server import ShopeeChatServer
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def parse_samples(text: str):
+    """Linhas de amostra do formato texto -> {série: valor}"""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            series, _, value = line.rpartition(' ')
+            samples[series] = float(value)
+    return samples
+
+def test_formato_de_exposicao():
+    """Histogramas cumulativos, rótulos escapados e medidores calculados na exportação"""
+    registry = MetricsRegistry()
+    histogram = registry.histogram('latencia_seconds', 'Latência', ('etapa',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.labels('a"b').observe(value)
+    counter = registry.counter('eventos_total', 'Eventos')
+    counter.inc()
+    counter.inc(2)
+    registry.gauge_function('tamanho', 'Tamanho', lambda: 42)
+    assert registry.counter('eventos_total', 'Eventos') is counter
+
+    text = registry.render()
+    samples = parse_samples(text)
+    assert '# TYPE latencia_seconds histogram' in text
+    assert samples['latencia_seconds_bucket{etapa="a\\"b",le="0.1"}'] == 2
+    assert samples['latencia_seconds_bucket{etapa="a\\"b",le="1"}'] == 3
+    assert samples['latencia_seconds_bucket{etapa="a\\"b",le="+Inf"}'] == 4
+    assert samples['latencia_seconds_count{etapa="a\\"b"}'] == 4
+    assert abs(samples['latencia_seconds_sum{etapa="a\\"b"}'] - 3.65) < 1e-9
+    assert samples['eventos_total'] == 3
+    assert samples['tamanho'] == 42
+
+def test_metricas_do_sistema():
+    """Buscas, fallbacks, cache e aprendizado aparecem nas métricas e em /metrics"""
+    print("📈 TESTE DAS MÉTRICAS PROMETHEUS")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    session = ai_system.get_session('metricas')
+    for message in ["meu produto veio quebrado", "meu produto veio quebrado", "xyzzy qwerty"]:
+        ai_system.advanced_similarity_search(message, ai_system.get_session(message))
+    ai_system.advanced_similarity_search("quero cancelar o pedido", session)
+    assert ai_system.dynamic_learning("meu cupom de frete sumiu do carrinho",
+                                      "Verifique a validade do cupom.", "cupons")
+
+    samples = parse_samples(ai_system.metrics.render())
+    assert samples['shopee_stage_duration_seconds_count{stage="scoring"}'] == 3
+    assert samples['shopee_search_duration_seconds_count{category="produto_defeituoso"}'] == 2
+    assert samples['shopee_response_cache_hits_total'] == 1
+    assert samples['shopee_response_cache_misses_total'] == 3
+    assert samples['shopee_learned_patterns_total'] == 1
+    assert samples['shopee_patterns'] == len(ai_system.training_patterns)
+    assert samples['shopee_vocabulary_words'] == len(ai_system.processor.word_vectors)
+    assert samples['shopee_sessions'] == len(ai_system.sessions)
+    fallbacks = samples.get('shopee_fallback_responses_total', 0)
+    assert fallbacks == samples.get('shopee_search_duration_seconds_count{category="fallback"}', 0)
+
+    # Endpoint HTTP
+    async def fetch_metrics():
+        server = ShopeeChatServer(ai_system, port=0)
+        await server.start()
+        port = server.server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(b"GET /metrics HTTP/1.1\r\nHost: x\r\nConnection: close\r\n\r\n")
+        raw = await reader.read()
+        writer.close()
+        server.server.close()
+        await server.server.wait_closed()
+        server.executor.shutdown(wait=False)
+        return raw.decode('utf-8')
+
+    raw = asyncio.run(fetch_metrics())
+    head, _, body = raw.partition('\r\n\r\n')
+    assert head.startswith('HTTP/1.1 200')
+    assert 'text/plain; version=0.0.4' in head
+    assert parse_samples(body)['shopee_learned_patterns_total'] == 1
+    print(f"✅ /metrics com {len(parse_samples(body))} séries")
+
+    # Arquivo .prom gravado junto das métricas JSON
+    with tempfile.TemporaryDirectory() as temp_dir:
+        ai_system.model_file = str(Path(temp_dir) / "modelo.snap")
+        ai_system.metrics_file = str(Path(temp_dir) / "metricas.json")
+        assert ai_system.save_model()
+        prom_text = (Path(temp_dir) / "metricas.prom").read_text(encoding='utf-8')
+        assert 'shopee_stage_duration_seconds_bucket' in prom_text
+
+if __name__ == "__main__":
+    test_formato_de_exposicao()
+    test_metricas_do_sistema()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Teste do motor de pontuação vetorizado
+Verifica se o score matricial coincide com o cálculo padrão a padrão
+"""
+
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def test_scores_vetorizados():
+    """Compara score_all_patterns com score_pattern_details padrão a padrão"""
+    print("🧮 TESTE DO MOTOR DE PONTUAÇÃO VETORIZADO")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    test_phrases = [
+        "olá",
+        "meu produto veio quebrado",
+        "não quero devolver pode mandar novamente?",
+        "quero cancelar o pedido",
+        "preciso alterar endereço",
+        "como pagar com pix"
+    ]
+
+    for phrase in test_phrases:
+        processed = ai_system.processor.advanced_preprocess(phrase)
+        embedding = ai_system.processor.create_advanced_embedding(processed)
+        primary_intent = ai_system.detect_primary_intent(processed)
+
+        scores = ai_system.score_all_patterns(processed, embedding, primary_intent)
+        expected = [
+            ai_system.score_pattern_details(processed, embedding, pattern, primary_intent)['final_score']
+            for pattern in ai_system.training_patterns
+        ]
+
+        max_diff = max(abs(a - b) for a, b in zip(scores, expected))
+        status = "✅" if max_diff < 1e-5 else "❌"
+        print(f"{status} \"{phrase}\" → diferença máxima: {max_diff:.2e}")
+
+        assert max_diff < 1e-5
+
+if __name__ == "__main__":
+    test_scores_vetorizados()
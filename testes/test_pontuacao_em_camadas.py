@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Teste da pontuação em camadas
+Termos por categoria (contexto, palavras-chave, intenção) calculados uma vez
+por consulta são idênticos aos calculados categoria a categoria
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_category_terms import CategoryTermTable, INTENT_CATEGORY_MAP
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+MESSAGES = [
+    "não quero devolver pode mandar outro",
+    "meu produto chegou quebrado e não funciona",
+    "quero cancelar o pedido, desistir da compra",
+    "preciso alterar dados e mudar endereço",
+    "onde está meu pedido? quero rastrear a entrega",
+    "olá"
+]
+
+def reference_terms(ai_system, processed, intent, session):
+    """Termos calculados categoria a categoria (implementação de referência)"""
+    categories = ai_system.pattern_index.categories
+    context = [ai_system.context_similarity({'category': c}, session) for c in categories]
+    relevance = [ai_system.category_relevance_boost(processed, c) for c in categories]
+    alignment = [ai_system.intent_alignment_boost(intent, c) for c in categories]
+    return np.array(context), np.array(relevance), np.array(alignment)
+
+def test_termos_por_categoria_iguais_a_referencia():
+    """Mesmos termos com e sem histórico, para todas as intenções"""
+    print("🧱 TESTE DA PONTUAÇÃO EM CAMADAS")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    session = ai_system.get_session('camadas')
+
+    for with_history in (False, True):
+        if with_history:
+            session.record_interaction("oi", "olá", 0.9, 'pedidos', 0.01)
+            session.record_interaction("pix", "ok", 0.9, 'pagamento', 0.01)
+        for message in MESSAGES:
+            processed = ai_system.processor.advanced_preprocess(message)
+            for intent in list(INTENT_CATEGORY_MAP) + ['desconhecida']:
+                terms = ai_system.category_term_scores(processed, intent, session)
+                for got, expected in zip(terms, reference_terms(ai_system, processed, intent, session)):
+                    assert np.array_equal(got, expected), (message, intent)
+
+    context = ai_system.category_term_scores(processed, 'geral', session)[0]
+    assert context[ai_system.pattern_index.category_lookup['pedidos']] == 0.8
+    print(f"✅ Termos idênticos para {len(ai_system.pattern_index.categories)} categorias")
+
+    # Detalhes de um padrão usam os mesmos termos de categoria
+    processed = ai_system.processor.advanced_preprocess(MESSAGES[1])
+    embedding = ai_system.processor.create_advanced_embedding(processed)
+    intent = ai_system.detect_primary_intent(processed)
+    scores = ai_system.score_all_patterns(processed, embedding, intent, session)
+    best = int(np.argmax(scores))
+    pattern = ai_system.training_patterns[best]
+    details = ai_system.score_pattern_details(processed, embedding, pattern, intent, session)
+    category_id = ai_system.pattern_index.category_lookup[pattern['category']]
+    context, relevance, alignment = ai_system.category_term_scores(processed, intent, session)
+    assert (details['context'], details['category_boost'], details['intent_boost']) == \
+           (context[category_id], relevance[category_id], alignment[category_id])
+    assert abs(details['final_score'] - scores[best]) < 1e-6
+
+def test_tabela_acompanha_novas_categorias():
+    """Categoria nova aprendida remonta a tabela com os ids do índice"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    processed = ai_system.processor.advanced_preprocess("quero cancelar")
+    ai_system.category_term_scores(processed, 'cancelamento')
+    table = ai_system.category_terms
+
+    assert ai_system.dynamic_learning("como funciona o cashback relâmpago", "Resposta.", 'cashback_relampago')
+    terms = ai_system.category_term_scores(processed, 'cancelamento')
+    assert ai_system.category_terms is not table
+    assert all(len(term) == ai_system.pattern_index.num_categories for term in terms)
+
+    # Categorias fora da tabela de palavras-chave não recebem boost
+    empty = CategoryTermTable(['saudacao', 'conta'])
+    features = ai_system.query_category_features(processed, 'alteracao_dados')
+    context, relevance, alignment = empty.scores(features)
+    assert not context.any() and not relevance.any()
+    assert alignment.tolist() == [0.0, 0.3]
+    print("✅ Tabela remontada ao surgir categoria nova")
+
+if __name__ == "__main__":
+    test_termos_por_categoria_iguais_a_referencia()
+    test_tabela_acompanha_novas_categorias()
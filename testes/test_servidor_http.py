@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Teste do servidor HTTP assíncrono
+Endpoints, reuso da conexão keep-alive e respostas de erro (400/404/405/413)
+"""
+
+import sys
+import json
+import asyncio
+from pathlib import Path
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_server import ShopeeChatServer, MAX_BODY_SIZE
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+async def read_response(reader: asyncio.StreamReader):
+    """Lê uma resposta HTTP: (status, cabeçalhos, corpo JSON)"""
+    status = int((await reader.readline()).split(b' ')[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    body = await reader.readexactly(int(headers['content-length']))
+    return status, headers, json.loads(body.decode('utf-8'))
+
+def request(method: str, path: str, payload=None, extra: str = '') -> bytes:
+    """Requisição HTTP/1.1 com corpo JSON opcional"""
+    body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+    head = f"{method} {path} HTTP/1.1\r\nHost: teste\r\nContent-Length: {len(body)}\r\n{extra}\r\n"
+    return head.encode('latin-1') + body
+
+async def exercise_server(ai_system: ShopeeNeuralAI):
+    """Sobe o servidor em porta efêmera e percorre os cenários"""
+    server = ShopeeChatServer(ai_system, port=0)
+    await server.start()
+    port = server.server.sockets[0].getsockname()[1]
+    try:
+        # Várias requisições na mesma conexão keep-alive
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(request('GET', '/health'))
+        status, headers, health = await read_response(reader)
+        assert status == 200 and headers['connection'] == 'keep-alive'
+        assert health['patterns'] == len(ai_system.training_patterns)
+
+        writer.write(request('POST', '/chat', {'message': 'meu produto veio quebrado', 'session_id': 'cliente'}))
+        status, headers, chat = await read_response(reader)
+        assert status == 200 and chat['session_id'] == 'cliente'
+        assert chat['category'] == 'produto_defeituoso' and chat['response']
+        assert 'x-processing-time' in headers
+
+        writer.write(request('POST', '/chat', {'message': '   '}))
+        assert (await read_response(reader))[0] == 400
+        writer.write(request('POST', '/chat', [1, 2]))
+        assert (await read_response(reader))[0] == 400
+        writer.write(request('GET', '/inexistente'))
+        assert (await read_response(reader))[0] == 404
+        writer.write(request('GET', '/chat'))
+        assert (await read_response(reader))[0] == 405
+
+        writer.write(request('GET', '/health', extra='Connection: close\r\n'))
+        status, headers, _ = await read_response(reader)
+        assert status == 200 and headers['connection'] == 'close'
+        assert await reader.read() == b''
+        writer.close()
+        assert server.total_connections == 1 and server.total_requests == 7
+
+        # Erros de enquadramento: resposta de erro e conexão encerrada
+        for head, expected in ((f"POST /chat HTTP/1.1\r\nContent-Length: {MAX_BODY_SIZE + 1}\r\n\r\n", 413),
+                               ("POST /chat HTTP/1.1\r\nContent-Length: -5\r\n\r\n", 400),
+                               ("POST /chat HTTP/1.1\r\nContent-Length: abc\r\n\r\n", 400),
+                               ("LINHA-INVALIDA\r\n\r\n", 400)):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(head.encode('latin-1'))
+            status, headers, error = await read_response(reader)
+            assert status == expected and headers['connection'] == 'close', head
+            assert error['error']
+            assert await reader.read() == b''
+            writer.close()
+    finally:
+        server.server.close()
+        await server.server.wait_closed()
+        server.executor.shutdown(wait=False)
+
+def test_servidor_http():
+    """Chat, health, keep-alive e erros de requisição"""
+    print("🌐 TESTE DO SERVIDOR HTTP")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+    asyncio.run(exercise_server(ai_system))
+    print("✅ Endpoints, keep-alive e respostas 400/404/405/413")
+
+if __name__ == "__main__":
+    test_servidor_http()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Teste das sessões de conversa
+Contexto de cada cliente isolado mesmo com mensagens intercaladas e
+remoção de sessões por inatividade e por limite de quantidade
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_sessions import SessionManager
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+CONVERSAS = {
+    'ana': ["meu produto veio quebrado", "quero outro sem devolver", "quando chega a reposição"],
+    'bruno': ["como pagar com pix", "quero cancelar o pedido", "preciso alterar endereço"]
+}
+
+def test_contexto_isolado_com_mensagens_intercaladas():
+    """Cada context_vector() é a média só dos embeddings da própria sessão"""
+    print("👥 TESTE DAS SESSÕES")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    processor = ai_system.processor
+
+    sessions = {name: ai_system.get_session(name) for name in CONVERSAS}
+    expected = {name: [] for name in CONVERSAS}
+    for turn in range(3):
+        for name, messages in CONVERSAS.items():
+            # Embedding esperado: contexto apenas das mensagens anteriores desta sessão
+            context = np.mean(expected[name], axis=0) if expected[name] else None
+            expected[name].append(processor.create_advanced_embedding(
+                processor.advanced_preprocess(messages[turn]), context))
+            ai_system.handle_message(messages[turn], sessions[name])
+
+    for name, session in sessions.items():
+        assert len(session.context_memory) == len(expected[name])
+        for stored, embedding in zip(session.context_memory, expected[name]):
+            assert np.allclose(stored, embedding)
+        assert np.allclose(session.context_vector(), np.mean(expected[name], axis=0))
+        assert [item['user_input'] for item in session.conversation_context] == CONVERSAS[name]
+    assert not np.allclose(sessions['ana'].context_vector(), sessions['bruno'].context_vector())
+    print("✅ Contexto de cada sessão independente das mensagens intercaladas")
+
+def test_remocao_por_inatividade_e_limite():
+    """Sessões ociosas além do TTL e as menos recentes acima do limite são removidas"""
+    manager = SessionManager(embedding_dim=8, max_sessions=3, idle_ttl=60.0)
+    for name in ("a", "b", "c"):
+        manager.get(name)
+
+    # Usar "a" a torna a mais recente; a quarta sessão remove "b" (menos recente)
+    manager.get("a")
+    manager.get("d")
+    assert list(manager.sessions) == ["c", "a", "d"]
+    assert manager.evicted_sessions == 1
+
+    # Inatividade: "c" parada há mais que o TTL sai na varredura
+    manager.sessions["c"].last_active = time.time() - 120
+    assert manager.evict_expired() == 1
+    assert "c" not in manager and len(manager) == 2
+
+    # Sessão expirada também sai quando outra é acessada
+    manager.sessions["a"].last_active = time.time() - 120
+    manager.get("d")
+    assert "a" not in manager
+    assert manager.get_stats()['evicted_sessions'] == 3
+    print("✅ Remoção por inatividade e por limite de sessões")
+
+if __name__ == "__main__":
+    test_contexto_isolado_com_mensagens_intercaladas()
+    test_remocao_por_inatividade_e_limite()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Teste do snapshot binário do modelo
+Salva, recarrega via memmap e converte um modelo pickle antigo
+"""
+
+import sys
+import pickle
+import random
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_snapshot import SnapshotError, read_snapshot, convert_legacy_pickle, maps_file
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+MESSAGES = [
+    "olá",
+    "meu produto veio quebrado",
+    "não quero devolver pode mandar novamente?",
+    "como pagar com pix",
+    "onde está meu pedido 12345"
+]
+
+def new_system(directory: Path, name: str) -> ShopeeNeuralAI:
+    """Sistema com arquivos de modelo em um diretório temporário"""
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    ai_system.model_file = str(directory / f"{name}.snap")
+    ai_system.legacy_model_file = str(directory / f"{name}.pkl")
+    ai_system.metrics_file = str(directory / f"{name}_metrics.json")
+    return ai_system
+
+def assert_same_answers(expected_system: ShopeeNeuralAI, actual_system: ShopeeNeuralAI):
+    """Compara as respostas dos dois sistemas sob a mesma semente"""
+    for seed, message in enumerate(MESSAGES):
+        results = []
+        for system in (expected_system, actual_system):
+            np.random.seed(seed)
+            random.seed(seed)
+            results.append(system.handle_message(message, system.get_session(f"s-{seed}")))
+
+        expected, actual = results
+        print(f"✅ \"{message}\" → {actual['category']} ({actual['confidence']:.4f})")
+        assert expected['response'] == actual['response']
+        assert abs(expected['confidence'] - actual['confidence']) < 1e-6
+
+def test_snapshot_salva_e_carrega():
+    """save_model → load_model preserva as respostas"""
+    print("💾 TESTE DO SNAPSHOT BINÁRIO")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        ai_system = new_system(directory, "modelo")
+        assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+        assert ai_system.save_model()
+
+        arrays, metadata = read_snapshot(ai_system.model_file)
+        assert metadata['patterns'] == len(ai_system.training_patterns)
+        assert not arrays['embeddings'].flags.writeable
+
+        loaded = new_system(directory, "modelo")
+        assert loaded.load_model()
+        assert len(loaded.training_patterns) == len(ai_system.training_patterns)
+        assert_same_answers(ai_system, loaded)
+
+        # Aprendizado continua possível sobre o modelo mapeado e pode ser salvo de novo
+        # (o mapeamento é liberado antes: no Windows o arquivo mapeado não pode ser trocado)
+        assert maps_file(loaded.pattern_index.embeddings)
+        assert loaded.dynamic_learning("vocês entregam em fernando de noronha?",
+                                       "Sim, entregamos em todo o Brasil.", "entrega")
+        assert loaded.save_model()
+        assert loaded.mapped_snapshot is None
+        assert not maps_file(loaded.pattern_index.embeddings)
+        assert not maps_file(loaded.processor.word_vectors.matrix)
+        reloaded = new_system(directory, "modelo")
+        assert reloaded.load_model()
+        assert len(reloaded.training_patterns) == len(ai_system.training_patterns) + 1
+
+        # Arquivo corrompido é recusado
+        corrupted = directory / "corrompido.snap"
+        corrupted.write_bytes(b"nao sou um snapshot")
+        try:
+            read_snapshot(str(corrupted))
+            assert False, "snapshot corrompido deveria falhar"
+        except SnapshotError:
+            pass
+
+def test_converte_pickle_antigo():
+    """Um modelo '2.0_advanced' em pickle é convertido sem mudar as respostas"""
+    print("\n🔄 TESTE DE CONVERSÃO DO PICKLE")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        directory = Path(temp_dir)
+        ai_system = new_system(directory, "antigo")
+        assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+
+        # Mesmo conteúdo que o save_model da versão 2.0_advanced gravava
+        model_data = {
+            'training_patterns': ai_system.training_patterns,
+            'processor_word_vectors': dict(ai_system.processor.word_vectors),
+            'processor_phrase_vectors': {'meu_produto': np.ones(25)},  # Ignorados na conversão
+            'semantic_clusters': dict(ai_system.semantic_clusters),
+            'performance_metrics': dict(ai_system.performance_metrics),
+            'conversation_context': [],
+            'neural_weights': {
+                'attention': ai_system.processor.attention_weights.tolist(),
+                'context': ai_system.processor.context_weights.tolist(),
+                'semantic': ai_system.processor.semantic_weights.tolist()
+            },
+            'saved_at': '2024-01-01T00:00:00',
+            'version': '2.0_advanced'
+        }
+        with open(ai_system.legacy_model_file, 'wb') as f:
+            pickle.dump(model_data, f)
+
+        # Sem snapshot, load_model não lê o pickle
+        assert not new_system(directory, "antigo").load_model()
+
+        result = convert_legacy_pickle(ai_system.legacy_model_file, ai_system.model_file)
+        assert result['patterns'] == len(ai_system.training_patterns)
+        # Métricas gravadas ao lado do snapshot convertido
+        assert (directory / "antigo_metrics.json").exists()
+        assert (directory / "antigo_metrics.prom").exists()
+
+        loaded = new_system(directory, "antigo")
+        assert loaded.load_model()
+        assert_same_answers(ai_system, loaded)
+
+if __name__ == "__main__":
+    test_snapshot_salva_e_carrega()
+    test_converte_pickle_antigo()
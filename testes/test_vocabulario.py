@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Teste do vocabulário com memória limitada
+Palavras desconhecidas das consultas não crescem o vocabulário
+"""
+
+import sys
+import random
+import hashlib
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / "core"))
+
+from shopee_neural_ai_advanced import ShopeeNeuralAI
+from shopee_vocabulary import smart_embeddings
+
+TRAINING_FILE = project_root / "dados" / "shopee_complete_training.json"
+
+def reference_embedding(word: str, embedding_dim: int = 150) -> np.ndarray:
+    """Cálculo palavra a palavra (versão original de generate_smart_embedding)"""
+    hash_numbers = [b / 255.0 for b in hashlib.md5(word.encode()).digest()]
+    embedding = np.array(hash_numbers * (embedding_dim // len(hash_numbers) + 1))[:embedding_dim]
+    embedding[:10] += np.array([
+        len(word) / 20.0,
+        word.count('a') / len(word),
+        word.count('e') / len(word),
+        word.count('i') / len(word),
+        word.count('o') / len(word),
+        word.count('u') / len(word),
+        1.0 if word.endswith('ão') else 0.0,
+        1.0 if word.startswith('des') else 0.0,
+        1.0 if 'shop' in word else 0.0,
+        1.0 if any(c.isdigit() for c in word) else 0.0
+    ])
+    return embedding / (np.linalg.norm(embedding) + 1e-8)
+
+def test_embeddings_vetorizados():
+    """O cálculo em lote coincide com o cálculo palavra a palavra"""
+    words = ["pedido", "devolução", "desligar", "shopee", "abc123", "x", "ão", "cpf12345678900"]
+    batch = smart_embeddings(words, 150)
+    for word, vector in zip(words, batch):
+        assert np.allclose(vector, reference_embedding(word), atol=1e-12), word
+
+def test_vocabulario_limitado():
+    """Consultas com milhares de palavras novas não aumentam o vocabulário"""
+    print("🔤 TESTE DO VOCABULÁRIO LIMITADO")
+    print("=" * 50)
+
+    ai_system = ShopeeNeuralAI()
+    ai_system.embedding_cache_file = None
+    assert ai_system.load_advanced_training_data(str(TRAINING_FILE))
+    vocabulary = ai_system.processor.word_vectors
+    vocabulary.max_cached = 500
+    training_words = len(vocabulary)
+    print(f"📚 Vocabulário de treinamento: {training_words} palavras")
+
+    rng = random.Random(5)
+    for i in range(300):
+        order = rng.randint(10 ** 8, 10 ** 9)
+        typo = ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(7))
+        ai_system.advanced_similarity_search(f"meu pedido {order} {typo} cpf {order * 7} não chegou",
+                                             ai_system.get_session(f"cliente-{i}"))
+
+    stats = vocabulary.get_stats()
+    print(f"🧠 LRU: {stats['cached_words']} palavras | misses: {stats['cache_misses']}")
+    assert len(vocabulary) == training_words
+    assert stats['cached_words'] <= 500
+    assert stats['cache_misses'] >= 900
+
+    # Palavras de padrões aprendidos entram no vocabulário de treinamento
+    assert ai_system.dynamic_learning("posso pagar com criptomoeda?",
+                                      "Não aceitamos criptomoedas.", "pagamento")
+    assert 'criptomoeda' in vocabulary.rows
+    assert len(vocabulary) > training_words
+
+if __name__ == "__main__":
+    test_embeddings_vetorizados()
+    test_vocabulario_limitado()